@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Keyword Matching Benchmark
+
+Compares the per-keyword `kw in text.lower()` loops the scripts used to
+run against the compiled KeywordMatcher, on saved Reddit posts in
+fixtures/research/reddit-posts.json. Every post is checked against all
+keyword sets in use: each research-scanner subreddit, discord-monitor's
+trend/strategy lists and content-pipeline's research/boost lists.
+
+Also verifies both strategies find exactly the same keywords.
+
+Usage:
+  python bench-keyword-matcher.py                  # 50 iterations
+  python bench-keyword-matcher.py --iterations 200
+  python bench-keyword-matcher.py --scale 10       # Repeat the corpus 10x
+"""
+
+import importlib.util
+import json
+import sys
+import time
+from pathlib import Path
+
+from keyword_matcher import KeywordMatcher
+
+SCRIPTS_DIR = Path(__file__).parent
+CORPUS_PATH = SCRIPTS_DIR / "fixtures" / "research" / "reddit-posts.json"
+
+
+def load_module(filename: str):
+    """Import a hyphenated sibling script for its keyword constants."""
+    spec = importlib.util.spec_from_file_location(filename.replace("-", "_")[:-3], SCRIPTS_DIR / filename)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def keyword_sets() -> dict[str, list[str]]:
+    sets = {}
+    try:
+        scanner = load_module("research-scanner.py")
+        for sub in scanner.DEFAULT_SUBREDDITS:
+            sets[f"reddit:{sub['name']}"] = sub["keywords"]
+    except Exception as e:
+        print(f"  (research-scanner keywords unavailable: {e})")
+    try:
+        monitor = load_module("discord-monitor.py")
+        sets["discord:trend"] = monitor.TREND_KEYWORDS
+        sets["discord:strategy"] = monitor.STRATEGY_KEYWORDS
+    except Exception as e:
+        print(f"  (discord-monitor keywords unavailable: {e})")
+    sets["pipeline:research"] = ["product", "trending", "viral", "best seller", "commission"]
+    sets["pipeline:trending"] = ["trending", "viral", "hot"]
+    sets["pipeline:health"] = ["turmeric", "collagen", "supplement", "health"]
+    sets["pipeline:chronic_illness"] = ["compression", "electrolyte", "eds", "pots"]
+    return sets
+
+
+def loop_matches(text: str, sets: dict[str, list[str]]) -> dict[str, set[str]]:
+    """The old approach: lowercase per set, one substring scan per keyword."""
+    hits = {}
+    for category, keywords in sets.items():
+        found = {kw.lower() for kw in keywords if kw.lower() in text.lower()}
+        if found:
+            hits[category] = found
+    return hits
+
+
+def bench(fn, texts: list[str], iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for text in texts:
+            fn(text)
+    return (time.perf_counter() - start) / (iterations * len(texts)) * 1_000_000
+
+
+def main():
+    iterations = 50
+    scale = 1
+    for flag in ("--iterations", "--scale"):
+        if flag in sys.argv:
+            idx = sys.argv.index(flag)
+            if idx + 1 < len(sys.argv):
+                value = int(sys.argv[idx + 1])
+                if flag == "--iterations":
+                    iterations = value
+                else:
+                    scale = value
+
+    posts = json.loads(CORPUS_PATH.read_text())
+    texts = [f"{p['title']} {p['selftext']}" for p in posts] * scale
+    sets = keyword_sets()
+    total_keywords = sum(len(v) for v in sets.values())
+
+    print(f"\n=== Keyword Matching Benchmark ({len(texts)} posts, {len(sets)} sets, "
+          f"{total_keywords} keywords, {iterations} iterations) ===\n")
+
+    start = time.perf_counter()
+    matcher = KeywordMatcher(sets)
+    compile_ms = (time.perf_counter() - start) * 1000
+
+    mismatches = sum(1 for t in texts if loop_matches(t, sets) != matcher.matches(t))
+
+    loop_us = bench(lambda t: loop_matches(t, sets), texts, iterations)
+    matcher_us = bench(matcher.matches, texts, iterations)
+    search_us = bench(matcher.search, texts, iterations)
+
+    print(f"  {'Strategy':<22s} {'us/post':>10s}")
+    print(f"  {'─'*22} {'─'*10}")
+    print(f"  {'per-keyword loops':<22s} {loop_us:>10.1f}")
+    print(f"  {'KeywordMatcher':<22s} {matcher_us:>10.1f}   ({loop_us / matcher_us:.1f}x)")
+    print(f"  {'KeywordMatcher.search':<22s} {search_us:>10.1f}   (any-hit only)")
+    print(f"\n  Compile time: {compile_ms:.2f} ms")
+    print(f"  Mismatched posts: {mismatches}/{len(texts)}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Posting Planner Benchmark
+
+Generates a synthetic queue (default 10k READY_TO_POST videos across 60
+brands) and 500 posting accounts with skewed performance, then compares
+posting-scheduler's old greedy round-robin with
+posting_planner.solve_assignment for one day of posts.
+
+Reports runtime and, per strategy:
+  posted        videos given a posting slot today
+  score         total expected performance (account score per post, up to the cap)
+  over cap      accounts over the daily cap (the greedy's overload)
+  brand dups    extra same-brand videos on one account in one day
+  window dups   extra videos on one account in the same window
+
+Then plans the same queue as a 7-day calendar (posting_planner.plan_calendar)
+and times the daily incremental run: 200 new videos placed around the
+existing plan, against re-planning the whole queue from scratch.
+
+Usage:
+  python bench-posting-planner.py                          # 10k videos x 500 accounts
+  python bench-posting-planner.py --videos 2000 --accounts 100
+"""
+
+import random
+import sys
+import time
+from collections import Counter
+
+from posting_planner import account_scores, plan_calendar, solve_assignment, video_brand
+
+DAILY_CAP = 2
+MAX_DAILY = 3
+HORIZON_DAYS = 7
+NEW_VIDEOS = 200
+WINDOWS = [
+    {"label": "Morning", "start": 8, "end": 10},
+    {"label": "Lunch", "start": 12, "end": 14},
+    {"label": "Evening", "start": 18, "end": 21},
+]
+
+
+def generate(num_videos: int, num_accounts: int, num_brands: int = 60, seed: int = 42):
+    rng = random.Random(seed)
+    brands = [f"Brand {i:02d}" for i in range(num_brands)]
+    # A few big brands dominate the queue, like real product mixes
+    weights = [1 / (i + 1) for i in range(num_brands)]
+    videos = []
+    for i in range(num_videos):
+        brand = rng.choices(brands, weights)[0] if rng.random() > 0.05 else ""
+        videos.append({"id": f"vid-{i}", "title": f"Video {i}", "product": {"brand": brand}})
+    accounts = [
+        {"id": f"acct-{i}", "display_name": f"Account {i}", "account_code": f"A{i:03d}", "is_active": True}
+        for i in range(num_accounts)
+    ]
+    performance = {
+        a["id"]: {"views": int(rng.paretovariate(1.2) * 1000), "avg_engagement": round(rng.uniform(0, 8), 1)}
+        for a in accounts
+    }
+    return videos, accounts, performance
+
+
+def greedy_schedule(accounts: list[dict], videos: list[dict], performance: dict) -> list[tuple[int, int, int]]:
+    """posting-scheduler's old calculate_schedule, for comparison (O(A^2) scoring included)."""
+    account_scores_old = {}
+    for acct in accounts:
+        perf = performance.get(acct["id"], {})
+        score = 1.0 + (perf.get("views", 0) / max(sum(p.get("views", 0) for p in performance.values()), 1)) \
+            + (perf.get("avg_engagement", 0) / 10)
+        account_scores_old[acct["id"]] = score
+    order = sorted(range(len(accounts)), key=lambda i: account_scores_old[accounts[i]["id"]], reverse=True)
+
+    count = Counter()
+    brands: dict[int, set] = {i: set() for i in order}
+    plan = []
+    acct_idx = 0
+    for vi, video in enumerate(videos):
+        brand = video_brand(video)
+        best = None
+        attempts = 0
+        while attempts < len(order):
+            cand = order[acct_idx % len(order)]
+            if count[cand] >= DAILY_CAP or (brand and brand in brands[cand] and attempts < len(order) - 1):
+                acct_idx += 1
+                attempts += 1
+                continue
+            best = cand
+            break
+        if best is None:
+            best = order[0]
+        count[best] += 1
+        if brand:
+            brands[best].add(brand)
+        plan.append((vi, best, len(plan) % len(WINDOWS)))
+        acct_idx += 1
+    return plan
+
+
+def evaluate(plan, videos, accounts, scores) -> dict:
+    per_account = Counter(a for _, a, _ in plan)
+    per_brand = Counter((a, video_brand(videos[v])) for v, a, _ in plan if video_brand(videos[v]))
+    per_window = Counter((a, w) for _, a, w in plan)
+    return {
+        "posted": len(plan),
+        "score": sum(scores[accounts[a]["id"]] * min(n, DAILY_CAP) for a, n in per_account.items()),
+        "over_cap": sum(1 for n in per_account.values() if n > DAILY_CAP),
+        "brand_dups": sum(n - 1 for n in per_brand.values() if n > 1),
+        "window_dups": sum(n - 1 for n in per_window.values() if n > 1),
+    }
+
+
+def main():
+    num_videos, num_accounts = 10_000, 500
+    for flag in ("--videos", "--accounts"):
+        if flag in sys.argv:
+            idx = sys.argv.index(flag)
+            if idx + 1 < len(sys.argv):
+                value = int(sys.argv[idx + 1])
+                num_videos, num_accounts = (value, num_accounts) if flag == "--videos" else (num_videos, value)
+
+    videos, accounts, performance = generate(num_videos, num_accounts)
+    scores = account_scores(accounts, performance)
+    print(f"\n=== Posting Planner Benchmark ({num_videos:,} videos, {num_accounts:,} accounts, "
+          f"cap {DAILY_CAP}/account/day) ===\n")
+
+    start = time.perf_counter()
+    old = greedy_schedule(accounts, videos, performance)
+    old_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    new = solve_assignment(videos, accounts, scores, WINDOWS, daily_cap=DAILY_CAP)
+    new_s = time.perf_counter() - start
+
+    print(f"  {'Strategy':<12s} {'time':>8s} {'posted':>8s} {'score':>9s} {'over cap':>9s} "
+          f"{'brand dups':>11s} {'window dups':>12s}")
+    print(f"  {'─'*12} {'─'*8} {'─'*8} {'─'*9} {'─'*9} {'─'*11} {'─'*12}")
+    for label, plan, secs in (("greedy", old, old_s), ("min-cost", new, new_s)):
+        r = evaluate(plan, videos, accounts, scores)
+        print(f"  {label:<12s} {secs:>7.2f}s {r['posted']:>8,d} {r['score']:>9.1f} {r['over_cap']:>9,d} "
+              f"{r['brand_dups']:>11,d} {r['window_dups']:>12,d}")
+    print(f"\n  Capacity today: {num_accounts * DAILY_CAP:,} posts; score counts each account's posts up to the cap\n")
+
+    day_windows = [WINDOWS] * HORIZON_DAYS
+    start = time.perf_counter()
+    calendar = plan_calendar(videos, accounts, scores, day_windows, DAILY_CAP, MAX_DAILY)
+    full_s = time.perf_counter() - start
+
+    new_videos = generate(NEW_VIDEOS, num_accounts, seed=7)[0]
+    for i, video in enumerate(new_videos):
+        video["id"] = f"new-{i}"
+    existing = [(a, d, w, video_brand(videos[v])) for v, a, d, w in calendar]
+    start = time.perf_counter()
+    added = plan_calendar(new_videos, accounts, scores, day_windows, DAILY_CAP, MAX_DAILY, existing=existing)
+    incremental_s = time.perf_counter() - start
+    start = time.perf_counter()
+    replanned = plan_calendar(videos + new_videos, accounts, scores, day_windows, DAILY_CAP, MAX_DAILY)
+    replan_s = time.perf_counter() - start
+
+    per_day = Counter((a, d) for _, a, d, _ in calendar)
+    print(f"  {HORIZON_DAYS}-day calendar ({DAILY_CAP}/account/day, up to {MAX_DAILY} for overflow):\n")
+    print(f"  {'Run':<28s} {'time':>8s} {'placed':>8s}")
+    print(f"  {'─'*28} {'─'*8} {'─'*8}")
+    print(f"  {'full plan':<28s} {full_s:>7.2f}s {len(calendar):>8,d}")
+    print(f"  {f'+{NEW_VIDEOS} videos, incremental':<28s} {incremental_s:>7.2f}s {len(added):>8,d}")
+    print(f"  {f'+{NEW_VIDEOS} videos, from scratch':<28s} {replan_s:>7.2f}s {len(replanned):>8,d}")
+    print(f"\n  Account-days at {MAX_DAILY} posts: {sum(1 for n in per_day.values() if n == MAX_DAILY):,}; "
+          f"over {MAX_DAILY}: {sum(1 for n in per_day.values() if n > MAX_DAILY):,}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Product Dedup Benchmark
+
+Generates synthetic research notes (default 100k lines) that mention a
+known set of products in many phrasings, runs them through the research
+index's mention extractor, then compares step2_select's old 30-character
+prefix dedup with product_dedup.dedup_products.
+
+Reports runtime and, against the known product behind every line:
+  splits        clusters per true product (1.0 is perfect)
+  false merges  clusters mixing two or more true products (0 is perfect)
+  linked        research mentions attached to a catalog product ID
+
+Usage:
+  python bench-product-dedup.py                # 100k lines
+  python bench-product-dedup.py --lines 20000
+"""
+
+import random
+import sys
+import time
+from collections import defaultdict
+
+from product_dedup import cluster_products, dedup_products, link_catalog
+from research_index import extract_mentions
+
+PRODUCTS = [
+    "Collagen Powder", "Collagen Gummies", "Turmeric Gummies", "Turmeric Tea",
+    "Compression Socks", "Compression Sleeves", "Electrolyte Mix", "Salt Tablets",
+    "Posture Corrector", "LED Face Mask", "Heated Eye Mask", "Magnetic Phone Mount",
+    "Mini Blender", "Pet Hair Remover", "Desk Organizer", "Joint Support Supplement",
+    "Cooling Towel", "Weighted Blanket", "Sunrise Alarm Clock", "Portable Neck Fan",
+]
+CATALOG = {name: f"prod-{i:03d}" for i, name in enumerate(PRODUCTS) if i % 2 == 0}
+
+TEMPLATES = [
+    "### [{p} is trending right now](https://reddit.com/r/TikTokShop/comments/{n})",
+    "> my {p} video went viral overnight",
+    "**Product links:** {p} https://shop.example.com/product/{n}",
+    "{p} - best seller this week!!",
+    "Anyone selling {p}? commission is 20%",
+    "> The {p} is going VIRAL on my fyp",
+    "{p} trending again",
+    "{p} (viral product)",
+]
+FILLER = [
+    "**r/TikTokShop** | Score: 120 | Comments: 48 | 5h ago",
+    "---",
+    "> Not sure if this is allowed here but I wanted to share my numbers.",
+    "**Relevance score:** 35",
+]
+
+
+def vary(name: str, rng: random.Random) -> str:
+    """Casing and small typos, like real notes."""
+    roll = rng.random()
+    if roll < 0.3:
+        name = name.lower()
+    elif roll < 0.4:
+        name = name.upper()
+    if rng.random() < 0.15 and len(name) > 6:
+        i = rng.randrange(1, len(name) - 1)
+        name = name[:i] + name[i + 1:]
+    return name
+
+
+def generate_notes(lines: int, seed: int = 42) -> tuple[str, list[str]]:
+    """Return (note text, true product per line; None for filler lines)."""
+    rng = random.Random(seed)
+    out, truth = [], []
+    for n in range(lines):
+        if rng.random() < 0.4:
+            out.append(rng.choice(FILLER))
+            truth.append(None)
+            continue
+        product = rng.choice(PRODUCTS)
+        out.append(rng.choice(TEMPLATES).format(p=vary(product, rng), n=n))
+        truth.append(product)
+    return "\n".join(out), truth
+
+
+def prefix_dedup(products: list[dict]) -> list[dict]:
+    """step2_select's old dedup, for comparison."""
+    seen_names = set()
+    unique = []
+    for p in sorted(products, key=lambda x: x["score"], reverse=True):
+        name_key = p["name"].lower()[:30]
+        if name_key not in seen_names:
+            seen_names.add(name_key)
+            unique.append(p)
+    return unique
+
+
+def evaluate(clusters: list, members_of) -> dict:
+    true_to_clusters = defaultdict(int)
+    false_merges = 0
+    for cluster in clusters:
+        truths = members_of(cluster)
+        if len(truths) > 1:
+            false_merges += 1
+        for t in truths:
+            true_to_clusters[t] += 1
+    splits = sum(true_to_clusters.values()) / max(1, len(true_to_clusters))
+    return {"clusters": len(clusters), "splits": splits, "false_merges": false_merges}
+
+
+def main():
+    lines = 100_000
+    if "--lines" in sys.argv:
+        idx = sys.argv.index("--lines")
+        if idx + 1 < len(sys.argv):
+            lines = int(sys.argv[idx + 1])
+
+    text, truth = generate_notes(lines)
+    start = time.perf_counter()
+    mentions = extract_mentions(text)
+    extract_s = time.perf_counter() - start
+
+    candidates = [
+        {"name": name, "source": "bench", "score": 0, "truth": truth[line_no - 1]}
+        for line_no, name in mentions
+        if truth[line_no - 1]
+    ]
+    candidates += [
+        {"id": pid, "name": name, "source": "flashflow_catalog", "score": 10, "truth": name}
+        for name, pid in CATALOG.items()
+    ]
+
+    print(f"\n=== Product Dedup Benchmark ({lines:,} note lines, {len(candidates):,} candidates, "
+          f"{len(PRODUCTS)} true products) ===\n")
+    print(f"  Mention extraction: {extract_s:.2f}s\n")
+
+    start = time.perf_counter()
+    old = prefix_dedup([dict(c) for c in candidates])
+    old_s = time.perf_counter() - start
+    old_eval = evaluate(old, lambda c: {c["truth"]})
+    # Prefix dedup drops members instead of grouping them, so count what each kept key swallowed
+    by_key = defaultdict(set)
+    for c in candidates:
+        by_key[c["name"].lower()[:30]].add(c["truth"])
+    old_eval["false_merges"] = sum(1 for truths in by_key.values() if len(truths) > 1)
+
+    start = time.perf_counter()
+    new = dedup_products(candidates)
+    new_s = time.perf_counter() - start
+    clusters = cluster_products(candidates)
+    new_eval = evaluate(clusters, lambda members: {candidates[i]["truth"] for i in members})
+    new_eval["clusters"] = len(new)
+    linked = len(link_catalog(candidates))
+
+    print(f"  {'Strategy':<16s} {'time':>8s} {'clusters':>9s} {'splits':>8s} {'false merges':>13s}")
+    print(f"  {'─'*16} {'─'*8} {'─'*9} {'─'*8} {'─'*13}")
+    print(f"  {'prefix[:30]':<16s} {old_s:>7.2f}s {old_eval['clusters']:>9,d} {old_eval['splits']:>8.1f} "
+          f"{old_eval['false_merges']:>13,d}")
+    print(f"  {'minhash/lsh':<16s} {new_s:>7.2f}s {new_eval['clusters']:>9,d} {new_eval['splits']:>8.1f} "
+          f"{new_eval['false_merges']:>13,d}")
+    print(f"\n  Research mentions linked to catalog IDs: {linked:,}/{len(candidates) - len(CATALOG):,}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+TikTok Extraction Benchmark
+
+Compares stats extraction strategies on saved TikTok pages in
+fixtures/tiktok/ (expected values in expected.json):
+
+  selector      Load the HTML into Chromium and run the DOM selectors
+                (what extraction_mode="dom" does after rendering)
+  regex         Scan the raw HTML for "playCount": N style fields
+  interception  Hydration JSON from the document, else the saved
+                /api/item/detail/ XHR (what extraction_mode="intercept" does)
+
+Reports mean latency per page and accuracy (exact field matches and
+fields within 5% of the true count, e.g. "98.7K" vs 98765).
+
+Usage:
+  python bench-tiktok-extraction.py                 # 200 iterations per strategy
+  python bench-tiktok-extraction.py --iterations 50
+  python bench-tiktok-extraction.py --no-browser    # Skip the selector strategy
+"""
+
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+from tiktok_extract import (
+    extract_stats_dom,
+    stats_from_hydration,
+    stats_from_item_detail,
+    stats_from_regex,
+)
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "tiktok"
+FIELDS = ["views", "likes", "comments", "shares", "saves"]
+
+
+def load_fixtures() -> list[dict]:
+    expected = json.loads((FIXTURES_DIR / "expected.json").read_text())
+    fixtures = []
+    for name, stats in expected.items():
+        path = FIXTURES_DIR / name
+        xhr_path = path.with_suffix(".item-detail.json")
+        fixtures.append({
+            "name": name,
+            "html": path.read_text(),
+            "xhr": json.loads(xhr_path.read_text()) if xhr_path.exists() else None,
+            "expected": stats,
+        })
+    return fixtures
+
+
+def score(found: dict | None, expected: dict) -> tuple[int, int]:
+    """Return (exact matches, matches within 5%) over the stat fields."""
+    if not found:
+        return 0, 0
+    exact = close = 0
+    for field in FIELDS:
+        got, want = found.get(field, 0), expected[field]
+        if got == want:
+            exact += 1
+        if want and abs(got - want) / want <= 0.05:
+            close += 1
+        elif not want and not got:
+            close += 1
+    return exact, close
+
+
+def interception(fixture: dict) -> dict | None:
+    return stats_from_hydration(fixture["html"]) or (
+        stats_from_item_detail(fixture["xhr"]) if fixture["xhr"] else None
+    )
+
+
+def regex(fixture: dict) -> dict | None:
+    return stats_from_regex(fixture["html"])
+
+
+def bench_sync(fn, fixtures: list[dict], iterations: int) -> dict:
+    results = [fn(f) for f in fixtures]
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for f in fixtures:
+            fn(f)
+    elapsed = time.perf_counter() - start
+    return {"latency_ms": elapsed / (iterations * len(fixtures)) * 1000, "results": results}
+
+
+async def bench_selector(fixtures: list[dict], iterations: int) -> dict | None:
+    try:
+        from playwright.async_api import async_playwright
+    except ImportError:
+        return None
+
+    async with async_playwright() as p:
+        try:
+            browser = await p.chromium.launch(headless=True)
+        except Exception as e:
+            print(f"  (selector skipped: {str(e).splitlines()[0]})")
+            return None
+        page = await browser.new_page()
+
+        async def run(f):
+            await page.set_content(f["html"], wait_until="domcontentloaded")
+            return await extract_stats_dom(page)
+
+        results = [await run(f) for f in fixtures]
+        start = time.perf_counter()
+        for _ in range(iterations):
+            for f in fixtures:
+                await run(f)
+        elapsed = time.perf_counter() - start
+        await browser.close()
+
+    return {"latency_ms": elapsed / (iterations * len(fixtures)) * 1000, "results": results}
+
+
+def main():
+    iterations = 200
+    if "--iterations" in sys.argv:
+        idx = sys.argv.index("--iterations")
+        if idx + 1 < len(sys.argv):
+            iterations = int(sys.argv[idx + 1])
+
+    fixtures = load_fixtures()
+    print(f"\n=== TikTok Extraction Benchmark ({len(fixtures)} pages, {iterations} iterations) ===\n")
+
+    runs = {
+        "regex": bench_sync(regex, fixtures, iterations),
+        "interception": bench_sync(interception, fixtures, iterations),
+    }
+    if "--no-browser" not in sys.argv:
+        # Rendering is far slower; keep the browser run short
+        selector = asyncio.run(bench_selector(fixtures, max(1, iterations // 20)))
+        if selector:
+            runs = {"selector": selector, **runs}
+
+    total_fields = len(fixtures) * len(FIELDS)
+    print(f"  {'Strategy':<14s} {'ms/page':>10s} {'exact':>8s} {'±5%':>8s}")
+    print(f"  {'─'*14} {'─'*10} {'─'*8} {'─'*8}")
+    for name, run in runs.items():
+        exact = close = 0
+        for f, found in zip(fixtures, run["results"]):
+            e, c = score(found, f["expected"])
+            exact += e
+            close += c
+        print(f"  {name:<14s} {run['latency_ms']:>10.3f} {exact:>4d}/{total_fields:<3d} {close:>4d}/{total_fields:<3d}")
+
+    print("\n  Per page:")
+    for i, f in enumerate(fixtures):
+        line = "  ".join(f"{name}={score(run['results'][i], f['expected'])[0]}/{len(FIELDS)}" for name, run in runs.items())
+        print(f"    {f['name']:<28s} {line}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
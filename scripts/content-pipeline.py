@@ -18,17 +18,22 @@ Usage:
   python content-pipeline.py --dry-run            # Preview without API calls
 """
 
+import asyncio
 import json
 import logging
-import os
 import re
 import sys
-import time
 from datetime import datetime
 from pathlib import Path
 
 import httpx
 
+from flashflow_api import API_KEY, AsyncFlashFlowClient, AsyncTokenBucket, api_call
+from keyword_matcher import KeywordMatcher
+from llm_cache import cached_completion
+from product_dedup import dedup_products
+from research_index import ResearchIndex
+
 # --- Configuration ---
 
 SCRIPTS_DIR = Path(__file__).parent
@@ -37,6 +42,7 @@ JOURNALS_DIR = Path.home() / ".openclaw" / "workspace" / "second-brain" / "journ
 CONFIG_PATH = SCRIPTS_DIR / "content-pipeline-config.json"
 
 LM_STUDIO_URL = "http://127.0.0.1:1234/v1"
+LM_MODEL = "llama-3.1-8b-instruct"
 
 logging.basicConfig(
     level=logging.INFO,
@@ -48,17 +54,6 @@ logging.basicConfig(
 )
 log = logging.getLogger("content-pipeline")
 
-# Find API key
-API_KEY = os.environ.get("FLASHFLOW_API_KEY", "")
-if not API_KEY:
-    skill_file = Path.home() / ".openclaw" / "agents" / "flashflow-work" / "workspace" / "skills" / "flashflow" / "skill.md"
-    if skill_file.exists():
-        match = re.search(r"ff_ak_[a-f0-9]{40}", skill_file.read_text())
-        if match:
-            API_KEY = match.group(0)
-
-API_URL = "https://web-pied-delta-30.vercel.app/api"
-
 CONTENT_TYPES = [
     "product_showcase",
     "ugc_testimonial",
@@ -67,6 +62,14 @@ CONTENT_TYPES = [
     "face_on_camera",
 ]
 
+# step2_select score boosts per keyword set
+SELECT_BOOSTS = {"trending": 5, "health": 3, "chronic_illness": 4}
+SELECT_MATCHER = KeywordMatcher({
+    "trending": ["trending", "viral", "hot"],
+    "health": ["turmeric", "collagen", "supplement", "health"],  # Brandon's niche
+    "chronic_illness": ["compression", "electrolyte", "eds", "pots"],
+})
+
 
 def load_config() -> dict:
     if CONFIG_PATH.exists():
@@ -77,34 +80,27 @@ def load_config() -> dict:
         "min_score": 7,
         "max_products": 5,
         "use_local_llm": True,
+        "generation_concurrency": 4,
+        "generation_rate_per_minute": 60,
+        "score_batch_size": 5,
+        "research_lookback_days": 14,
     }
 
 
-def api_call(method: str, endpoint: str, json_body: dict = None, params: dict = None) -> dict:
-    headers = {"Authorization": f"Bearer {API_KEY}", "Content-Type": "application/json"}
-    url = f"{API_URL}{endpoint}"
-    try:
-        if method == "GET":
-            resp = httpx.get(url, headers=headers, params=params, timeout=30)
-        elif method == "POST":
-            resp = httpx.post(url, headers=headers, json=json_body or {}, timeout=60)
-        else:
-            return {"ok": False, "error": f"Unknown method {method}"}
-        return {"ok": resp.status_code < 300, "status": resp.status_code, "data": resp.json()}
-    except Exception as e:
-        return {"ok": False, "error": str(e)}
+def lm_studio_generate(prompt: str, max_tokens: int = 500, temperature: float = 0.7, cache: bool | None = None) -> str:
+    """Generate text using local LM Studio. Low-temperature calls are served from the LLM cache."""
+    params = {"max_tokens": max_tokens, "temperature": temperature}
+    return cached_completion(LM_MODEL, prompt, params, lambda: _lm_request(prompt, params), cache=cache)
 
 
-def lm_studio_generate(prompt: str, max_tokens: int = 500, temperature: float = 0.7) -> str:
-    """Generate text using local LM Studio."""
+def _lm_request(prompt: str, params: dict) -> str:
     try:
         resp = httpx.post(
             f"{LM_STUDIO_URL}/chat/completions",
             json={
-                "model": "llama-3.1-8b-instruct",
+                "model": LM_MODEL,
                 "messages": [{"role": "user", "content": prompt}],
-                "max_tokens": max_tokens,
-                "temperature": temperature,
+                **params,
             },
             timeout=60,
         )
@@ -118,30 +114,26 @@ def lm_studio_generate(prompt: str, max_tokens: int = 500, temperature: float =
 
 # --- Pipeline Steps ---
 
-def step1_research() -> list[dict]:
-    """Pull trending products from recent research notes."""
+def step1_research(config: dict) -> list[dict]:
+    """Pull trending products from recent research notes (via the incremental research index)."""
     log.info("Step 1: Scanning research notes for trending products...")
     products = []
 
-    # Read recent research files
-    if RESEARCH_DIR.exists():
-        today = datetime.now().strftime("%Y-%m-%d")
-        yesterday = (datetime.now().replace(day=datetime.now().day)).strftime("%Y-%m-%d")
-
-        for f in sorted(RESEARCH_DIR.glob("*.md"), reverse=True)[:10]:
-            content = f.read_text()
-            # Extract product mentions
-            # Look for lines with product-like patterns
-            for line in content.split("\n"):
-                if any(kw in line.lower() for kw in ["product", "trending", "viral", "best seller", "commission"]):
-                    # Extract product name (crude but functional)
-                    clean = re.sub(r'[*#\[\]`]', '', line).strip()
-                    if len(clean) > 10 and len(clean) < 200:
-                        products.append({
-                            "name": clean[:80],
-                            "source": f.name,
-                            "score": 0,
-                        })
+    index = ResearchIndex()
+    try:
+        counts = index.sync(RESEARCH_DIR)
+        log.info(f"  Research index: {counts['indexed']} notes (re)indexed, {counts['unchanged']} unchanged")
+        for m in index.product_mentions(days=config.get("research_lookback_days", 14)):
+            products.append({
+                "name": m["name"],
+                "source": m["sources"][0],
+                "sources": m["sources"],
+                "mentions": m["mentions"],
+                "last_seen": m["last_seen"],
+                "score": 0,
+            })
+    finally:
+        index.close()
 
     # Also get products from FlashFlow that need scripts
     r = api_call("GET", "/products")
@@ -166,28 +158,18 @@ def step2_select(products: list[dict], config: dict) -> list[dict]:
     # Score products
     for p in products:
         score = p.get("score", 0)
-        name_lower = p["name"].lower()
-
-        # Boost for trending keywords
-        if any(kw in name_lower for kw in ["trending", "viral", "hot"]):
-            score += 5
-        if any(kw in name_lower for kw in ["turmeric", "collagen", "supplement", "health"]):
-            score += 3  # Brandon's niche
-        if any(kw in name_lower for kw in ["compression", "electrolyte", "eds", "pots"]):
-            score += 4  # Chronic illness niche
+
+        # Boost for trending and niche keywords
+        for category in SELECT_MATCHER.categories(p["name"]):
+            score += SELECT_BOOSTS[category]
         if p.get("source") == "flashflow_catalog":
             score += 5  # Known products
 
         p["score"] = score
 
-    # Deduplicate by name similarity
-    seen_names = set()
-    unique = []
-    for p in sorted(products, key=lambda x: x["score"], reverse=True):
-        name_key = p["name"].lower()[:30]
-        if name_key not in seen_names:
-            seen_names.add(name_key)
-            unique.append(p)
+    # Cluster near-duplicates (and link research mentions to catalog products)
+    unique = dedup_products(products)
+    log.info(f"  {len(products)} candidates -> {len(unique)} distinct products")
 
     selected = unique[:config.get("max_products", 5)]
     log.info(f"  Selected {len(selected)} products for generation")
@@ -197,121 +179,231 @@ def step2_select(products: list[dict], config: dict) -> list[dict]:
     return selected
 
 
+def parse_generation(product: dict, content_type: str, data: dict) -> dict:
+    """Turn a /ai/generate-content response into a pipeline script record."""
+    skit_data = data.get("skit_data") or data.get("script") or {}
+    hook = ""
+    script_text = ""
+
+    if isinstance(skit_data, dict):
+        hook = skit_data.get("hook", {}).get("line", "") if isinstance(skit_data.get("hook"), dict) else str(skit_data.get("hook", ""))
+        beats = skit_data.get("beats", [])
+        script_text = hook + "\n" + "\n".join(
+            b.get("dialogue", b.get("action", "")) for b in beats if isinstance(b, dict)
+        )
+    elif isinstance(skit_data, str):
+        script_text = skit_data
+        hook = skit_data.split("\n")[0] if skit_data else ""
+
+    ai_score = 0
+    score_data = data.get("ai_score") or data.get("score") or {}
+    if isinstance(score_data, dict):
+        ai_score = score_data.get("overall_score", 0)
+    elif isinstance(score_data, (int, float)):
+        ai_score = score_data
+
+    return {
+        "product": product,
+        "content_type": content_type,
+        "hook": hook[:200],
+        "script": script_text[:2000],
+        "skit_data": skit_data,
+        "ai_score": ai_score,
+        "local_score": 0,
+        "generation_data": data,
+    }
+
+
+async def generate_one(client: AsyncFlashFlowClient, limiter: AsyncTokenBucket, slots: asyncio.Semaphore,
+                       product: dict, content_type: str) -> dict | None:
+    """Generate a single script. Failures are logged and return None."""
+    async with slots:
+        await limiter.acquire()
+        log.info(f"  Generating {content_type} for {product['name'][:40]}...")
+        r = await client.request("POST", "/ai/generate-content", {
+            "product_id": product["id"],
+            "content_type": content_type,
+        })
+
+    if not r["ok"]:
+        log.warning(f"    Generation failed ({content_type}, {product['name'][:40]}): {r.get('error', r.get('data', {}))}")
+        return None
+
+    script = parse_generation(product, content_type, r["data"].get("data", {}))
+    log.info(f"    Hook: {script['hook'][:80]}")
+    log.info(f"    AI Score: {script['ai_score']}")
+    return script
+
+
+async def generate_all(jobs: list[tuple[dict, str]], config: dict) -> list[dict | None]:
+    """Run generation jobs concurrently. Results keep the order of `jobs`."""
+    concurrency = max(1, config.get("generation_concurrency", 4))
+    rate = config.get("generation_rate_per_minute", 60) / 60
+    limiter = AsyncTokenBucket(rate, capacity=concurrency)
+    slots = asyncio.Semaphore(concurrency)
+
+    async with AsyncFlashFlowClient() as client:
+        results = await asyncio.gather(
+            *(generate_one(client, limiter, slots, product, content_type) for product, content_type in jobs),
+            return_exceptions=True,
+        )
+
+    out = []
+    for (product, content_type), result in zip(jobs, results):
+        if isinstance(result, BaseException):
+            log.warning(f"    Generation error ({content_type}, {product['name'][:40]}): {result}")
+            result = None
+        out.append(result)
+    return out
+
+
 def step3_generate(products: list[dict], config: dict, dry_run: bool = False) -> list[dict]:
-    """Generate scripts for selected products."""
+    """Generate scripts for selected products.
+
+    Requests run concurrently (generation_concurrency) behind a token bucket
+    (generation_rate_per_minute), so wall-clock time tracks the slowest call
+    rather than the sum of all of them.
+    """
     log.info("Step 3: Generating scripts...")
-    scripts = []
     scripts_per = config.get("scripts_per_product", 3)
 
+    jobs = []
     for product in products:
-        product_id = product.get("id")
-        if not product_id:
+        if not product.get("id"):
             log.info(f"  Skipping '{product['name'][:40]}' — no FlashFlow product ID")
             continue
-
         for i in range(scripts_per):
-            content_type = CONTENT_TYPES[i % len(CONTENT_TYPES)]
-            log.info(f"  Generating {content_type} for {product['name'][:40]}...")
-
-            if dry_run:
-                scripts.append({
-                    "product": product,
-                    "content_type": content_type,
-                    "hook": f"[DRY RUN] Hook for {product['name']}",
-                    "script": "[DRY RUN] Script content",
-                    "ai_score": 0,
-                    "local_score": 0,
-                })
-                continue
+            jobs.append((product, CONTENT_TYPES[i % len(CONTENT_TYPES)]))
 
-            r = api_call("POST", "/ai/generate-content", {
-                "product_id": product_id,
+    if dry_run:
+        scripts = []
+        for product, content_type in jobs:
+            log.info(f"  Generating {content_type} for {product['name'][:40]}...")
+            scripts.append({
+                "product": product,
                 "content_type": content_type,
+                "hook": f"[DRY RUN] Hook for {product['name']}",
+                "script": "[DRY RUN] Script content",
+                "ai_score": 0,
+                "local_score": 0,
             })
+        log.info(f"  Generated {len(scripts)} scripts total")
+        return scripts
 
-            if r["ok"]:
-                data = r["data"].get("data", {})
-                skit_data = data.get("skit_data") or data.get("script") or {}
-                hook = ""
-                script_text = ""
-
-                if isinstance(skit_data, dict):
-                    hook = skit_data.get("hook", {}).get("line", "") if isinstance(skit_data.get("hook"), dict) else str(skit_data.get("hook", ""))
-                    beats = skit_data.get("beats", [])
-                    script_text = hook + "\n" + "\n".join(
-                        b.get("dialogue", b.get("action", "")) for b in beats if isinstance(b, dict)
-                    )
-                elif isinstance(skit_data, str):
-                    script_text = skit_data
-                    hook = skit_data.split("\n")[0] if skit_data else ""
-
-                ai_score = 0
-                score_data = data.get("ai_score") or data.get("score") or {}
-                if isinstance(score_data, dict):
-                    ai_score = score_data.get("overall_score", 0)
-                elif isinstance(score_data, (int, float)):
-                    ai_score = score_data
-
-                scripts.append({
-                    "product": product,
-                    "content_type": content_type,
-                    "hook": hook[:200],
-                    "script": script_text[:2000],
-                    "skit_data": skit_data,
-                    "ai_score": ai_score,
-                    "local_score": 0,
-                    "generation_data": data,
-                })
-                log.info(f"    Hook: {hook[:80]}")
-                log.info(f"    AI Score: {ai_score}")
-            else:
-                log.warning(f"    Generation failed: {r.get('error', r.get('data', {}))}")
-
-            time.sleep(2)  # Rate limit
+    scripts = [s for s in asyncio.run(generate_all(jobs, config)) if s]
 
-    log.info(f"  Generated {len(scripts)} scripts total")
+    log.info(f"  Generated {len(scripts)}/{len(jobs)} scripts total")
     return scripts
 
 
-def step4_score(scripts: list[dict], config: dict) -> list[dict]:
-    """Score scripts using local LLM."""
-    log.info("Step 4: Scoring scripts with local LLM...")
+SCORE_CRITERIA = """Consider:
+- Does the hook stop scrolling in 1-3 seconds?
+- Is there a clear pattern interrupt?
+- Is the CTA clear?
+- Would this work on TikTok?"""
 
-    if not config.get("use_local_llm", True):
-        log.info("  Local LLM scoring disabled, using AI scores only")
-        for s in scripts:
-            s["local_score"] = s["ai_score"]
-        return scripts
+# "1. 8", "2) 7/10", "Script 3: 9", "#4 - 6", "**5.** 8"
+NUMBERED_SCORE_RE = re.compile(
+    r'^[\s*#\-]*(?:script\s*)?#?(\d+)\s*\**\s*[\.\):\-–=]\s*\**\s*(\d+(?:\.\d+)?)',
+    re.IGNORECASE | re.MULTILINE,
+)
 
-    for s in scripts:
-        if not s["hook"] or s["hook"].startswith("[DRY RUN]"):
-            continue
 
-        prompt = f"""Rate this TikTok video script on a scale of 1-10 for viral potential.
+def parse_numbered_scores(response: str, count: int) -> dict[int, int]:
+    """Parse "N. score" lines into {index: score} (0-based). First answer per N wins."""
+    scores = {}
+    for idx_str, score_str in NUMBERED_SCORE_RE.findall(response):
+        idx = int(idx_str) - 1
+        if 0 <= idx < count and idx not in scores:
+            score = round(float(score_str))
+            if 1 <= score <= 10:
+                scores[idx] = score
+    return scores
+
+
+def score_single(s: dict) -> int | None:
+    """Score one script with its own LLM request."""
+    prompt = f"""Rate this TikTok video script on a scale of 1-10 for viral potential.
 
 Hook: {s['hook']}
 
 Full script:
 {s['script'][:500]}
 
-Consider:
-- Does the hook stop scrolling in 1-3 seconds?
-- Is there a clear pattern interrupt?
-- Is the CTA clear?
-- Would this work on TikTok?
+{SCORE_CRITERIA}
 
 Respond with ONLY a number 1-10, nothing else."""
 
-        response = lm_studio_generate(prompt, max_tokens=10, temperature=0.3)
-        # Extract number from response
-        numbers = re.findall(r'\b(\d+)\b', response)
-        if numbers:
-            score = min(int(numbers[0]), 10)
+    response = lm_studio_generate(prompt, max_tokens=10, temperature=0.3)
+    # Extract number from response
+    numbers = re.findall(r'\b(\d+)\b', response)
+    if numbers:
+        return min(int(numbers[0]), 10)
+    log.warning(f"    Could not parse LLM score: '{response[:50]}'")
+    return None
+
+
+def score_batch(batch: list[dict]) -> dict[int, int]:
+    """Score several scripts in one LLM request. Returns {index: score} for parsed items."""
+    scripts_text = "\n\n".join(
+        f"SCRIPT {i+1}\nHook: {s['hook']}\nFull script:\n{s['script'][:500]}"
+        for i, s in enumerate(batch)
+    )
+    prompt = f"""Rate each TikTok video script below on a scale of 1-10 for viral potential.
+
+{scripts_text}
+
+{SCORE_CRITERIA}
+
+Respond with ONLY the scores, one per line, in format: "N. [score]"
+Example:
+1. 8
+2. 6"""
+
+    response = lm_studio_generate(prompt, max_tokens=8 * len(batch) + 20, temperature=0.3)
+    return parse_numbered_scores(response, len(batch))
+
+
+def step4_score(scripts: list[dict], config: dict) -> list[dict]:
+    """Score scripts using local LLM.
+
+    With score_batch_size > 1, scripts are packed N per prompt; any the
+    model didn't answer for are re-scored one at a time.
+    """
+    log.info("Step 4: Scoring scripts with local LLM...")
+
+    if not config.get("use_local_llm", True):
+        log.info("  Local LLM scoring disabled, using AI scores only")
+        for s in scripts:
+            s["local_score"] = s["ai_score"]
+        return scripts
+
+    pending = [s for s in scripts if s["hook"] and not s["hook"].startswith("[DRY RUN]")]
+    batch_size = config.get("score_batch_size", 5)
+
+    unparsed = []
+    if batch_size > 1:
+        for i in range(0, len(pending), batch_size):
+            batch = pending[i:i+batch_size]
+            scores = score_batch(batch)
+            for j, s in enumerate(batch):
+                if j in scores:
+                    s["local_score"] = scores[j]
+                    log.info(f"    '{s['hook'][:50]}...' → LLM score: {scores[j]}")
+                else:
+                    unparsed.append(s)
+        if unparsed:
+            log.info(f"  Re-scoring {len(unparsed)}/{len(pending)} scripts missing from batch responses")
+    else:
+        unparsed = pending
+
+    for s in unparsed:
+        score = score_single(s)
+        if score is not None:
             s["local_score"] = score
             log.info(f"    '{s['hook'][:50]}...' → LLM score: {score}")
         else:
             s["local_score"] = s["ai_score"]  # Fallback
-            log.warning(f"    Could not parse LLM score: '{response[:50]}'")
 
     return scripts
 
@@ -491,7 +583,7 @@ def main():
                 log.error(f"Product '{target_product}' not found in FlashFlow")
                 sys.exit(1)
     else:
-        products = step1_research()
+        products = step1_research(config)
 
     # Step 2: Select
     selected = step2_select(products, config)
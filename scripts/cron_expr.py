@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+FlashFlow Cron Expressions
+
+Five-field cron expressions (minute hour day-of-month month day-of-week)
+for SCHEDULE entries in scheduler_core. Fields accept *, lists (1,15),
+ranges (1-5), steps (*/15, 9-17/2) and month/weekday names (jan, mon-fri).
+Day-of-week 0 and 7 are both Sunday. As in standard cron, when both
+day-of-month and day-of-week are restricted a day matching either fires.
+
+Times are wall-clock times in the timezone of the datetime passed in, so
+"0 9 * * 1-5" with an ET datetime means 9 AM New York time across DST.
+
+Usage:
+  from cron_expr import CronExpr
+
+  expr = CronExpr("0 9,14,18 * * mon-fri")
+  expr.next_after(now_et())       # Next fire time strictly after now
+"""
+
+from bisect import bisect_left
+from datetime import date, datetime, timedelta
+from datetime import time as dt_time
+
+ALIASES = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+MONTH_NAMES = {name: i for i, name in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], 1)}
+DAY_NAMES = {name: i for i, name in enumerate(["sun", "mon", "tue", "wed", "thu", "fri", "sat"])}
+# Give up looking for a match after this many days (e.g. "0 0 30 2 *" never fires)
+MAX_SEARCH_DAYS = 5 * 366
+
+
+def _parse_field(field: str, low: int, high: int, names: dict[str, int]) -> set[int]:
+    def value(token: str) -> int:
+        return names[token] if token in names else int(token)
+
+    values: set[int] = set()
+    for part in field.lower().split(","):
+        step = 1
+        if "/" in part:
+            part, step_str = part.split("/", 1)
+            step = int(step_str)
+            if step < 1:
+                raise ValueError(f"Bad step in cron field '{field}'")
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            a, b = part.split("-", 1)
+            start, end = value(a), value(b)
+        else:
+            start = value(part)
+            # "5/15" means from 5 to the end in steps of 15
+            end = high if step > 1 else start
+        if not (low <= start <= high and low <= end <= high) or start > end:
+            raise ValueError(f"Cron field '{field}' out of range {low}-{high}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronExpr:
+    """A parsed cron expression that computes its next fire time."""
+
+    def __init__(self, expr: str):
+        self.expr = expr.strip()
+        fields = ALIASES.get(self.expr.lower(), self.expr).split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: '{expr}'")
+
+        self.minutes = sorted(_parse_field(fields[0], 0, 59, {}))
+        self.hours = sorted(_parse_field(fields[1], 0, 23, {}))
+        self.days = _parse_field(fields[2], 1, 31, {})
+        self.months = _parse_field(fields[3], 1, 12, MONTH_NAMES)
+        weekdays = _parse_field(fields[4], 0, 7, DAY_NAMES)
+        self.weekdays = {d % 7 for d in weekdays}
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    def __repr__(self) -> str:
+        return f"CronExpr({self.expr!r})"
+
+    def matches_day(self, day: date) -> bool:
+        if day.month not in self.months:
+            return False
+        in_days = day.day in self.days
+        in_weekdays = (day.weekday() + 1) % 7 in self.weekdays
+        if self._any_day or self._any_weekday:
+            return in_days and in_weekdays
+        return in_days or in_weekdays
+
+    def next_after(self, dt: datetime) -> datetime:
+        """First fire time strictly after dt, in dt's timezone."""
+        tz = dt.tzinfo
+        start = dt.replace(tzinfo=None, second=0, microsecond=0) + timedelta(minutes=1)
+        day = start.date()
+        for offset in range(MAX_SEARCH_DAYS):
+            if self.matches_day(day):
+                first_day = offset == 0
+                for hour in self.hours[bisect_left(self.hours, start.hour) if first_day else 0:]:
+                    min_minute = start.minute if first_day and hour == start.hour else 0
+                    i = bisect_left(self.minutes, min_minute)
+                    if i < len(self.minutes):
+                        return datetime.combine(day, dt_time(hour, self.minutes[i]), tzinfo=tz)
+            day += timedelta(days=1)
+        raise ValueError(f"Cron expression '{self.expr}' has no fire time within {MAX_SEARCH_DAYS} days")
@@ -28,10 +28,15 @@ from pathlib import Path
 import discord
 import httpx
 
+from keyword_matcher import KeywordMatcher
+from seen_store import SeenStore
+from state_store import StateStore
+
 # --- Configuration ---
 
 CONFIG_PATH = Path(__file__).parent / "discord-monitor-config.json"
 STATE_PATH = Path(__file__).parent / ".discord-monitor-state.json"
+SEEN_PATH = Path(__file__).parent / ".discord-monitor-seen.sqlite3"
 LOG_DIR = Path.home() / ".openclaw" / "workspace" / "second-brain" / "journals"
 RESEARCH_DIR = Path.home() / ".openclaw" / "workspace" / "second-brain" / "research"
 
@@ -67,6 +72,8 @@ STRATEGY_KEYWORDS = [
     "fyp", "for you page", "engagement", "conversion",
 ]
 
+SIGNAL_MATCHER = KeywordMatcher({"trend": TREND_KEYWORDS, "strategy": STRATEGY_KEYWORDS})
+
 
 def load_config() -> dict:
     if not CONFIG_PATH.exists():
@@ -76,28 +83,28 @@ def load_config() -> dict:
         return json.load(f)
 
 
+STATE_STORE = StateStore(STATE_PATH)
+
+
 def load_state() -> dict:
-    if STATE_PATH.exists():
-        with open(STATE_PATH) as f:
-            return json.load(f)
-    return {"last_scan": {}, "seen_message_ids": []}
+    return STATE_STORE.load() or {"last_scan": {}}
 
 
 def save_state(state: dict):
-    with open(STATE_PATH, "w") as f:
-        json.dump(state, f, indent=2)
+    STATE_STORE.save(state)
 
 
 def extract_insights(message_content: str) -> dict:
     """Extract structured data from a Discord message."""
+    signals = SIGNAL_MATCHER.categories(message_content)
     insights = {
         "tiktok_urls": TIKTOK_URL_RE.findall(message_content),
         "shop_urls": TIKTOK_SHOP_RE.findall(message_content),
         "amazon_urls": AMAZON_RE.findall(message_content),
         "prices": PRICE_RE.findall(message_content),
         "views": VIEWS_RE.findall(message_content),
-        "has_trend_signal": any(kw in message_content.lower() for kw in TREND_KEYWORDS),
-        "has_strategy_signal": any(kw in message_content.lower() for kw in STRATEGY_KEYWORDS),
+        "has_trend_signal": "trend" in signals,
+        "has_strategy_signal": "strategy" in signals,
     }
     return insights
 
@@ -192,7 +199,10 @@ class MonitorClient(discord.Client):
         self.run_once = run_once
         self.watch_channel_ids = set(config.get("watch_channel_ids", []))
         self.state = load_state()
-        self.seen_ids = set(self.state.get("seen_message_ids", []))
+        self.seen = SeenStore(SEEN_PATH)
+        self.seen.import_ids(self.state.pop("seen_message_ids", []))
+        # Anything older than the lookback window is never rescanned
+        self.seen.expire(max_age_days=config.get("seen_retention_days", 30))
         self.processed_count = 0
 
     async def on_ready(self):
@@ -224,7 +234,6 @@ class MonitorClient(discord.Client):
                 log.error(f"Error scanning #{channel.name}: {e}")
 
         # Save state
-        self.state["seen_message_ids"] = list(self.seen_ids)[-5000:]  # Keep last 5000
         self.state["last_scan"][str(channel_id)] = datetime.now(timezone.utc).isoformat()
         save_state(self.state)
         log.info(f"Scan complete. Processed {self.processed_count} new actionable messages.")
@@ -240,10 +249,10 @@ class MonitorClient(discord.Client):
     async def process_message(self, message: discord.Message):
         """Process a single message for actionable content."""
         msg_id = str(message.id)
-        if msg_id in self.seen_ids:
+        if msg_id in self.seen:
             return
 
-        self.seen_ids.add(msg_id)
+        self.seen.add(msg_id)
         content = message.content
         if not content or len(content) < 20:
             return
@@ -267,11 +276,6 @@ class MonitorClient(discord.Client):
         if category == "product_lead":
             post_to_flashflow(self.config, category, content, insights)
 
-        # Periodically save state in daemon mode
-        if self.processed_count % 10 == 0:
-            self.state["seen_message_ids"] = list(self.seen_ids)[-5000:]
-            save_state(self.state)
-
 
 def main():
     LOG_DIR.mkdir(parents=True, exist_ok=True)
@@ -8,6 +8,15 @@ When new video files are detected:
   - Creates a FlashFlow pipeline entry via API
   - Logs all actions
 
+Polling modes:
+  - Change feed (default): reads the Drive Changes API from a page token
+    kept in the state file, so each poll costs O(changes) instead of a
+    walk of the whole tree. Folder paths come from a cached
+    folder-ID -> (name, parent) map.
+  - Full scan: walks the whole tree. Runs on first start, when the page
+    token is lost, and every full_scan_interval_hours as a reconciliation
+    pass (catches e.g. files inside a folder that was moved into the tree).
+
 Folder structure expected:
   NEEDS EDITED/
     BrandName/
@@ -19,26 +28,44 @@ Folder structure expected:
 Usage:
   python drive-watcher.py              # Run once
   python drive-watcher.py --daemon     # Run every 30 minutes
+  python drive-watcher.py --full-scan  # Force a full tree walk
 """
 
 import json
 import logging
 import os
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
 import httpx
 from google.oauth2.service_account import Credentials
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+
+from seen_store import SeenStore
+from state_store import StateStore
 
 # --- Configuration ---
 
 CONFIG_PATH = Path(__file__).parent / "drive-watcher-config.json"
 STATE_PATH = Path(__file__).parent / ".drive-watcher-state.json"
+SEEN_PATH = Path(__file__).parent / ".drive-watcher-seen.sqlite3"
 LOG_DIR = Path.home() / ".openclaw" / "workspace" / "second-brain" / "journals"
 
+FOLDER_MIME_TYPE = "application/vnd.google-apps.folder"
+VIDEO_EXTENSIONS = (".mp4", ".mov", ".avi", ".mkv", ".webm")
+# Parents OR-ed into one files().list query (keeps q well under Drive's length limit)
+LIST_BATCH_SIZE = 40
+LIST_WORKERS = 4
+CHANGE_FIELDS = (
+    "nextPageToken, newStartPageToken, "
+    "changes(fileId, removed, file(id, name, mimeType, parents, trashed, createdTime, size))"
+)
+
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s [%(levelname)s] %(message)s",
@@ -58,16 +85,15 @@ def load_config() -> dict:
         return json.load(f)
 
 
+STATE_STORE = StateStore(STATE_PATH)
+
+
 def load_state() -> dict:
-    if STATE_PATH.exists():
-        with open(STATE_PATH) as f:
-            return json.load(f)
-    return {"seen_file_ids": []}
+    return STATE_STORE.load() or {"folders": {}, "pending_files": []}
 
 
 def save_state(state: dict):
-    with open(STATE_PATH, "w") as f:
-        json.dump(state, f, indent=2)
+    STATE_STORE.save(state)
 
 
 def get_drive_service(config: dict):
@@ -84,49 +110,202 @@ def get_drive_service(config: dict):
     return build("drive", "v3", credentials=creds)
 
 
-def list_files_recursive(service, folder_id: str, path_parts: list[str] = None) -> list[dict]:
-    """Recursively list all files in a folder, tracking the path."""
-    if path_parts is None:
-        path_parts = []
+def is_video(name: str) -> bool:
+    return name.lower().endswith(VIDEO_EXTENSIONS)
 
-    results = []
-    query = f"'{folder_id}' in parents and trashed = false"
+
+def list_children(service, parent_ids: list[str]) -> list[dict]:
+    """List the direct children of several folders in one paged query."""
+    parents_clause = " or ".join(f"'{pid}' in parents" for pid in parent_ids)
+    query = f"({parents_clause}) and trashed = false"
+    items = []
     page_token = None
 
     while True:
         resp = service.files().list(
             q=query,
-            fields="nextPageToken, files(id, name, mimeType, createdTime, size)",
-            pageSize=100,
+            fields="nextPageToken, files(id, name, mimeType, parents, createdTime, size)",
+            pageSize=1000,
             pageToken=page_token,
         ).execute()
-
-        for item in resp.get("files", []):
-            if item["mimeType"] == "application/vnd.google-apps.folder":
-                # Recurse into subfolder
-                sub_results = list_files_recursive(
-                    service, item["id"], path_parts + [item["name"]]
-                )
-                results.extend(sub_results)
-            else:
-                # It's a file — check if it's a video
-                name_lower = item["name"].lower()
-                if any(name_lower.endswith(ext) for ext in [".mp4", ".mov", ".avi", ".mkv", ".webm"]):
-                    results.append({
-                        "id": item["id"],
-                        "name": item["name"],
-                        "path_parts": path_parts,
-                        "created_time": item.get("createdTime"),
-                        "size": item.get("size"),
-                    })
-
+        items.extend(resp.get("files", []))
         page_token = resp.get("nextPageToken")
         if not page_token:
             break
 
+    return items
+
+
+def list_video_files(new_service, folder_id: str, folders: dict | None = None,
+                     batch_size: int = LIST_BATCH_SIZE, workers: int = LIST_WORKERS) -> list[dict]:
+    """List every video file under a folder, tracking the path.
+
+    Walks the tree breadth-first: each level's folders are split into
+    batches of `batch_size` parents per files().list query, and the batches
+    run concurrently on `workers` threads. Drive service objects aren't
+    thread-safe, so `new_service()` is called once per worker thread.
+
+    If `folders` is given, every subfolder seen is recorded in it as
+    folder_id -> {"name", "parent"} for the change feed's path lookups.
+    """
+    local = threading.local()
+
+    def fetch(parent_ids: list[str]) -> list[dict]:
+        if not hasattr(local, "service"):
+            local.service = new_service()
+        return list_children(local.service, parent_ids)
+
+    paths = {folder_id: []}
+    results = []
+    level = [folder_id]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while level:
+            batches = [level[i:i + batch_size] for i in range(0, len(level), batch_size)]
+            level = []
+            for items in pool.map(fetch, batches):
+                for item in items:
+                    parent = next((p for p in item.get("parents", []) if p in paths), None)
+                    if parent is None:
+                        continue
+                    path_parts = paths[parent]
+                    if item["mimeType"] == FOLDER_MIME_TYPE:
+                        if item["id"] in paths:
+                            continue
+                        paths[item["id"]] = path_parts + [item["name"]]
+                        if folders is not None:
+                            folders[item["id"]] = {"name": item["name"], "parent": parent}
+                        level.append(item["id"])
+                    elif is_video(item["name"]):
+                        results.append(file_info(item, path_parts))
+
     return results
 
 
+def file_info(item: dict, path_parts: list[str]) -> dict:
+    return {
+        "id": item["id"],
+        "name": item["name"],
+        "path_parts": path_parts,
+        "created_time": item.get("createdTime"),
+        "size": item.get("size"),
+    }
+
+
+# --- Change feed ---
+
+def fetch_folder(service, folder_id: str) -> dict:
+    """Look up a folder we haven't cached. Inaccessible folders resolve to no parent."""
+    try:
+        item = service.files().get(fileId=folder_id, fields="id, name, parents").execute()
+    except HttpError as e:
+        log.debug(f"Folder {folder_id} not accessible: {e}")
+        return {"name": None, "parent": None}
+    parents = item.get("parents") or []
+    return {"name": item["name"], "parent": parents[0] if parents else None}
+
+
+def resolve_path(service, folders: dict, root_id: str, folder_id: str) -> list[str] | None:
+    """Path parts from the watch folder down to `folder_id`, or None if it's outside the tree."""
+    parts = []
+    visited = set()
+    while folder_id != root_id:
+        if folder_id in visited:
+            return None
+        visited.add(folder_id)
+        if folder_id not in folders:
+            folders[folder_id] = fetch_folder(service, folder_id)
+        folder = folders[folder_id]
+        if not folder["parent"]:
+            return None
+        parts.append(folder["name"])
+        folder_id = folder["parent"]
+    return list(reversed(parts))
+
+
+def list_changed_files(service, config: dict, state: dict) -> list[dict]:
+    """Read the Changes API since the stored page token. Returns new/changed video files in the tree."""
+    root_id = config["watch_folder_id"]
+    folders = state.setdefault("folders", {})
+    page_token = state["changes_page_token"]
+    changed: dict[str, dict] = {}
+    change_count = 0
+
+    while True:
+        resp = service.changes().list(
+            pageToken=page_token,
+            spaces="drive",
+            fields=CHANGE_FIELDS,
+            pageSize=1000,
+        ).execute()
+
+        for change in resp.get("changes", []):
+            change_count += 1
+            item = change.get("file")
+            file_id = change.get("fileId")
+
+            if change.get("removed") or not item or item.get("trashed"):
+                if file_id in folders:
+                    folders[file_id] = {"name": folders[file_id]["name"], "parent": None}
+                changed.pop(file_id, None)
+                continue
+
+            parents = item.get("parents") or []
+            parent = parents[0] if parents else None
+
+            if item["mimeType"] == FOLDER_MIME_TYPE:
+                # Renames and moves update every descendant's path on the next lookup
+                folders[item["id"]] = {"name": item["name"], "parent": parent}
+            elif is_video(item["name"]) and parent:
+                changed[item["id"]] = item
+
+        if "newStartPageToken" in resp:
+            state["changes_page_token"] = resp["newStartPageToken"]
+            break
+        page_token = resp["nextPageToken"]
+
+    results = []
+    for item in changed.values():
+        path_parts = resolve_path(service, folders, root_id, item["parents"][0])
+        if path_parts is not None:
+            results.append(file_info(item, path_parts))
+
+    log.info(f"Change feed: {change_count} changes, {len(results)} video files in watch folder")
+    return results
+
+
+def full_scan(service, config: dict, state: dict) -> list[dict]:
+    """Walk the whole tree, rebuilding the folder cache and resetting the change feed."""
+    folder_id = config["watch_folder_id"]
+    # Take the token before walking so changes made during the walk are replayed next poll
+    start_token = None
+    if config.get("change_feed", True):
+        start_token = service.changes().getStartPageToken().execute()["startPageToken"]
+
+    log.info(f"Full scan of Google Drive folder {folder_id}...")
+    folders: dict[str, dict] = {}
+    files = list_video_files(
+        lambda: get_drive_service(config), folder_id, folders,
+        batch_size=config.get("list_batch_size", LIST_BATCH_SIZE),
+        workers=config.get("list_workers", LIST_WORKERS),
+    )
+
+    state["folders"] = folders
+    state["changes_page_token"] = start_token
+    state["last_full_scan"] = datetime.utcnow().isoformat()
+    return files
+
+
+def full_scan_due(config: dict, state: dict) -> bool:
+    if not config.get("change_feed", True) or not state.get("changes_page_token"):
+        return True
+    last = state.get("last_full_scan")
+    if not last:
+        return True
+    age_hours = (datetime.utcnow() - datetime.fromisoformat(last)).total_seconds() / 3600
+    return age_hours >= config.get("full_scan_interval_hours", 24)
+
+
 def parse_brand_product(path_parts: list[str]) -> tuple[str | None, str | None, str]:
     """
     Parse folder path to extract brand and product names.
@@ -186,32 +365,41 @@ def create_pipeline_entry(config: dict, file_info: dict, brand: str | None, prod
         return False
 
 
-def run_once(config: dict):
-    """Single scan of the Google Drive folder."""
+def run_once(config: dict, force_full_scan: bool = False):
+    """Single poll of the Google Drive folder (change feed, or a full scan when due)."""
     state = load_state()
-    seen_ids = set(state.get("seen_file_ids", []))
+    # Drive file IDs are stable and a file must never be imported twice, so these never expire
+    seen = SeenStore(SEEN_PATH)
+    seen.import_ids(state.pop("seen_file_ids", []))
 
     service = get_drive_service(config)
-    folder_id = config["watch_folder_id"]
 
-    log.info(f"Scanning Google Drive folder {folder_id}...")
-    files = list_files_recursive(service, folder_id)
-    log.info(f"Found {len(files)} video files total, {len(seen_ids)} previously seen")
+    if force_full_scan or full_scan_due(config, state):
+        files = full_scan(service, config, state)
+        log.info(f"Found {len(files)} video files total, {len(seen)} previously seen")
+    else:
+        # Files whose pipeline entry failed last poll won't show up in the feed again
+        files = state.get("pending_files", []) + list_changed_files(service, config, state)
 
     new_count = 0
+    pending = {}
     for f in files:
-        if f["id"] in seen_ids:
+        if f["id"] in seen:
             continue
 
         brand, product, status = parse_brand_product(f["path_parts"])
         success = create_pipeline_entry(config, f, brand, product, status)
 
         if success:
-            seen_ids.add(f["id"])
+            seen.add(f["id"])
             new_count += 1
+        else:
+            pending[f["id"]] = f
+
+    seen.close()
 
     # Save state
-    state["seen_file_ids"] = list(seen_ids)
+    state["pending_files"] = list(pending.values())
     state["last_scan"] = datetime.utcnow().isoformat()
     state["last_scan_new_files"] = new_count
     save_state(state)
@@ -223,18 +411,20 @@ def run_once(config: dict):
 def main():
     LOG_DIR.mkdir(parents=True, exist_ok=True)
     config = load_config()
+    force_full_scan = "--full-scan" in sys.argv
 
     if "--daemon" in sys.argv:
         interval = config.get("poll_interval_minutes", 30) * 60
         log.info(f"Starting daemon mode. Polling every {interval // 60} minutes.")
         while True:
             try:
-                run_once(config)
+                run_once(config, force_full_scan)
+                force_full_scan = False
             except Exception as e:
                 log.error(f"Scan failed: {e}")
             time.sleep(interval)
     else:
-        run_once(config)
+        run_once(config, force_full_scan)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+FlashFlow API Client
+
+Shared HTTP client for every automation script that talks to the
+FlashFlow API. One pooled connection per process instead of a fresh
+TCP+TLS handshake per request.
+
+Features:
+  - Persistent httpx.Client / httpx.AsyncClient with keep-alive pooling
+  - HTTP/2 when the `h2` package is installed (pip install "httpx[http2]")
+  - Retry with jittered exponential backoff on 429 and 5xx (honours Retry-After)
+  - Per-host concurrency limits so bursts don't trip Vercel rate limits
+
+Usage:
+  from flashflow_api import API_KEY, api_call
+
+  r = api_call("GET", "/products")
+  if r["ok"]:
+      products = r["data"].get("data", [])
+
+  # Async scripts
+  async with AsyncFlashFlowClient() as client:
+      r = await client.request("POST", "/skits", {"title": "..."})
+"""
+
+import asyncio
+import atexit
+import logging
+import os
+import random
+import re
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import httpx
+
+try:
+    import h2  # noqa: F401
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+
+# --- Configuration ---
+
+API_URL = "https://web-pied-delta-30.vercel.app/api"
+
+DEFAULT_TIMEOUT = httpx.Timeout(60.0, connect=10.0)
+POOL_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60)
+MAX_CONCURRENT_PER_HOST = 8
+
+MAX_RETRIES = 3
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 8.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# POST creates records, so only retry it when the server says it didn't process the request
+POST_RETRY_STATUSES = {429, 503}
+
+log = logging.getLogger("flashflow-api")
+
+
+def find_api_key() -> str:
+    """Find the FlashFlow API key from env or the OpenClaw skill file."""
+    key = os.environ.get("FLASHFLOW_API_KEY", "")
+    if key:
+        return key
+    skill_file = Path.home() / ".openclaw" / "agents" / "flashflow-work" / "workspace" / "skills" / "flashflow" / "skill.md"
+    if skill_file.exists():
+        match = re.search(r"ff_ak_[a-f0-9]{40}", skill_file.read_text())
+        if match:
+            return match.group(0)
+    return ""
+
+
+API_KEY = find_api_key()
+
+
+# --- Helpers ---
+
+def _should_retry(method: str, status: int) -> bool:
+    if method == "POST":
+        return status in POST_RETRY_STATUSES
+    return status in RETRY_STATUSES
+
+
+def _backoff_delay(attempt: int, retry_after: str | None = None) -> float:
+    """Full-jitter exponential backoff, or the server's Retry-After if given."""
+    if retry_after:
+        try:
+            return min(float(retry_after), BACKOFF_MAX_SECONDS)
+        except ValueError:
+            pass
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** attempt)))
+
+
+def _to_result(resp: httpx.Response) -> dict:
+    try:
+        data = resp.json()
+    except ValueError:
+        data = {}
+    return {"ok": resp.status_code < 300, "status": resp.status_code, "data": data}
+
+
+def _build_url(base_url: str, endpoint: str) -> str:
+    if endpoint.startswith(("http://", "https://")):
+        return endpoint
+    return f"{base_url}{endpoint}"
+
+
+def _headers(api_key: str) -> dict:
+    headers = {"Content-Type": "application/json"}
+    if api_key:
+        headers["Authorization"] = f"Bearer {api_key}"
+    return headers
+
+
+# --- Sync client ---
+
+class FlashFlowClient:
+    """Pooled, retrying sync client. Safe to share across threads."""
+
+    def __init__(self, base_url: str = API_URL, api_key: str | None = None,
+                 max_per_host: int = MAX_CONCURRENT_PER_HOST, timeout: httpx.Timeout = DEFAULT_TIMEOUT):
+        self.base_url = base_url.rstrip("/")
+        self.max_per_host = max_per_host
+        self._client = httpx.Client(
+            http2=HTTP2,
+            limits=POOL_LIMITS,
+            timeout=timeout,
+            headers=_headers(API_KEY if api_key is None else api_key),
+        )
+        self._host_slots: dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def _slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.max_per_host)
+            return self._host_slots[host]
+
+    def request(self, method: str, endpoint: str, json_body: dict = None, params: dict = None,
+                timeout: float | None = None) -> dict:
+        """Make an API request. Returns {"ok", "status", "data"} or {"ok": False, "error"}."""
+        method = method.upper()
+        url = _build_url(self.base_url, endpoint)
+        kwargs = {"params": params}
+        if method in ("POST", "PATCH", "PUT"):
+            kwargs["json"] = json_body or {}
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                with self._slot(url):
+                    resp = self._client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                if attempt == MAX_RETRIES or (method == "POST" and not isinstance(e, httpx.ConnectError)):
+                    return {"ok": False, "error": str(e)}
+                delay = _backoff_delay(attempt)
+                log.debug(f"{method} {endpoint}: {e} — retrying in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+            except Exception as e:
+                return {"ok": False, "error": str(e)}
+
+            if attempt < MAX_RETRIES and _should_retry(method, resp.status_code):
+                delay = _backoff_delay(attempt, resp.headers.get("Retry-After"))
+                log.debug(f"{method} {endpoint}: HTTP {resp.status_code} — retrying in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+            return _to_result(resp)
+
+        return {"ok": False, "error": "retries exhausted"}
+
+    def close(self):
+        self._client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# --- Async client ---
+
+class AsyncFlashFlowClient:
+    """Pooled, retrying async client. Create one per event loop."""
+
+    def __init__(self, base_url: str = API_URL, api_key: str | None = None,
+                 max_per_host: int = MAX_CONCURRENT_PER_HOST, timeout: httpx.Timeout = DEFAULT_TIMEOUT):
+        self.base_url = base_url.rstrip("/")
+        self.max_per_host = max_per_host
+        self._client = httpx.AsyncClient(
+            http2=HTTP2,
+            limits=POOL_LIMITS,
+            timeout=timeout,
+            headers=_headers(API_KEY if api_key is None else api_key),
+        )
+        self._host_slots: dict[str, asyncio.Semaphore] = {}
+
+    def _slot(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        if host not in self._host_slots:
+            self._host_slots[host] = asyncio.Semaphore(self.max_per_host)
+        return self._host_slots[host]
+
+    async def request(self, method: str, endpoint: str, json_body: dict = None, params: dict = None,
+                      timeout: float | None = None) -> dict:
+        """Async variant of FlashFlowClient.request — same return shape."""
+        method = method.upper()
+        url = _build_url(self.base_url, endpoint)
+        kwargs = {"params": params}
+        if method in ("POST", "PATCH", "PUT"):
+            kwargs["json"] = json_body or {}
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                async with self._slot(url):
+                    resp = await self._client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                if attempt == MAX_RETRIES or (method == "POST" and not isinstance(e, httpx.ConnectError)):
+                    return {"ok": False, "error": str(e)}
+                await asyncio.sleep(_backoff_delay(attempt))
+                continue
+            except Exception as e:
+                return {"ok": False, "error": str(e)}
+
+            if attempt < MAX_RETRIES and _should_retry(method, resp.status_code):
+                await asyncio.sleep(_backoff_delay(attempt, resp.headers.get("Retry-After")))
+                continue
+            return _to_result(resp)
+
+        return {"ok": False, "error": "retries exhausted"}
+
+    async def aclose(self):
+        await self._client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+
+# --- Rate limiting ---
+
+class AsyncTokenBucket:
+    """Token-bucket rate limiter for asyncio callers.
+
+    Allows bursts of up to `capacity` requests, refilling at `rate` tokens
+    per second. Use instead of fixed time.sleep() between calls.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = max(rate, 0.001)
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1.0):
+        async with self._lock:
+            self._refill()
+            while self._tokens < tokens:
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= tokens
+
+
+# --- Shared default client ---
+
+_default_client: FlashFlowClient | None = None
+_default_lock = threading.Lock()
+
+
+def get_client() -> FlashFlowClient:
+    """Return the process-wide pooled client, creating it on first use."""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = FlashFlowClient()
+            atexit.register(_default_client.close)
+        return _default_client
+
+
+def api_call(method: str, endpoint: str, json_body: dict = None, params: dict = None,
+             timeout: float | None = None) -> dict:
+    """Call the FlashFlow API over the shared connection pool."""
+    return get_client().request(method, endpoint, json_body=json_body, params=params, timeout=timeout)
@@ -32,6 +32,8 @@ from pathlib import Path
 
 import requests
 
+from state_store import StateStore
+
 # ── Configuration ────────────────────────────────────────────────────────────
 
 FLASHFLOW_KEY = os.getenv("SERVICE_API_KEY") or os.getenv("FLASHFLOW_API_KEY")
@@ -107,20 +109,18 @@ def log_message(msg):
 
 # ── State Persistence ────────────────────────────────────────────────────────
 
+STATE_STORE = StateStore(STATE_PATH, mode=0o600)
+
+
 def load_state() -> dict:
-    if STATE_PATH.exists():
-        try:
-            with open(STATE_PATH) as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
-            pass
-    return {}
+    try:
+        return STATE_STORE.load() or {}
+    except (json.JSONDecodeError, IOError):
+        return {}
 
 
 def save_state(state: dict):
-    with open(STATE_PATH, "w") as f:
-        json.dump(state, f, indent=2, default=str)
-    os.chmod(STATE_PATH, 0o600)
+    STATE_STORE.save(state)
 
 
 def compute_fingerprint(analysis: dict) -> str:
@@ -15,7 +15,6 @@ Usage:
 
 import json
 import logging
-import os
 import re
 import sys
 import time
@@ -24,10 +23,13 @@ from pathlib import Path
 
 import httpx
 
+from flashflow_api import API_KEY, api_call
+from llm_cache import cached_completion
+
 # --- Configuration ---
 
 LM_STUDIO_URL = "http://127.0.0.1:1234/v1"
-API_URL = "https://web-pied-delta-30.vercel.app/api"
+LM_MODEL = "llama-3.1-8b-instruct"
 JOURNALS_DIR = Path.home() / ".openclaw" / "workspace" / "second-brain" / "journals"
 OUTPUT_DIR = Path(__file__).parent / "hook-output"
 
@@ -38,15 +40,6 @@ logging.basicConfig(
 )
 log = logging.getLogger("hook-factory")
 
-# Find API key
-API_KEY = os.environ.get("FLASHFLOW_API_KEY", "")
-if not API_KEY:
-    skill_file = Path.home() / ".openclaw" / "agents" / "flashflow-work" / "workspace" / "skills" / "flashflow" / "skill.md"
-    if skill_file.exists():
-        match = re.search(r"ff_ak_[a-f0-9]{40}", skill_file.read_text())
-        if match:
-            API_KEY = match.group(0)
-
 HOOK_FORMULAS = [
     "I can't believe I used to [old way] when [product] exists",
     "POV: you finally found a [product] that actually [benefit]",
@@ -72,16 +65,20 @@ HOOK_TYPES = [
 ]
 
 
-def lm_generate(prompt: str, max_tokens: int = 1000, temperature: float = 0.8) -> str:
-    """Generate text using local LM Studio."""
+def lm_generate(prompt: str, max_tokens: int = 1000, temperature: float = 0.8, cache: bool | None = None) -> str:
+    """Generate text using local LM Studio. Low-temperature calls are served from the LLM cache."""
+    params = {"max_tokens": max_tokens, "temperature": temperature}
+    return cached_completion(LM_MODEL, prompt, params, lambda: _lm_request(prompt, params), cache=cache)
+
+
+def _lm_request(prompt: str, params: dict) -> str:
     try:
         resp = httpx.post(
             f"{LM_STUDIO_URL}/chat/completions",
             json={
-                "model": "llama-3.1-8b-instruct",
+                "model": LM_MODEL,
                 "messages": [{"role": "user", "content": prompt}],
-                "max_tokens": max_tokens,
-                "temperature": temperature,
+                **params,
             },
             timeout=120,
         )
@@ -209,19 +206,14 @@ def save_to_winners_bank(hooks: list[dict], top_n: int = 10) -> int:
         if hook["score"] < 6:  # Only save decent hooks
             continue
 
-        resp = httpx.post(
-            f"{API_URL}/winners",
-            headers={"Authorization": f"Bearer {API_KEY}", "Content-Type": "application/json"},
-            json={
-                "source_type": "generated",
-                "hook": hook["text"],
-                "content_format": "product_showcase",
-                "product_category": hook.get("category", "general"),
-                "notes": f"Hook Factory (LLM score: {hook['score']}/10, type: {hook['hook_type']})",
-            },
-            timeout=15,
-        )
-        if resp.status_code < 300:
+        r = api_call("POST", "/winners", {
+            "source_type": "generated",
+            "hook": hook["text"],
+            "content_format": "product_showcase",
+            "product_category": hook.get("category", "general"),
+            "notes": f"Hook Factory (LLM score: {hook['score']}/10, type: {hook['hook_type']})",
+        })
+        if r["ok"]:
             saved += 1
 
     log.info(f"  Saved {saved} hooks to Winners Bank")
@@ -260,13 +252,9 @@ def get_all_products() -> list[dict]:
     """Fetch all products from FlashFlow."""
     if not API_KEY:
         return []
-    resp = httpx.get(
-        f"{API_URL}/products",
-        headers={"Authorization": f"Bearer {API_KEY}"},
-        timeout=15,
-    )
-    if resp.status_code == 200:
-        return resp.json().get("data", [])
+    r = api_call("GET", "/products")
+    if r["ok"]:
+        return r["data"].get("data", [])
     return []
 
 
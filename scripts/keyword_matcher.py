@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+FlashFlow Keyword Matcher
+
+Compiles named keyword sets once into a single case-insensitive regex and
+reports every hit, with its category, in one pass over the text. Shared by
+research-scanner (relevance scoring), discord-monitor (insight extraction)
+and content-pipeline (research line filter and product boosts).
+
+Matching has the same semantics as `kw in text.lower()` for each keyword:
+substring, case-insensitive, overlapping. The regex is built from a trie
+of the keywords so the engine does one prefix walk per text position
+instead of one full scan of the text per keyword.
+
+Usage:
+  from keyword_matcher import KeywordMatcher
+
+  matcher = KeywordMatcher({"trend": ["trending", "viral"], "strategy": ["hook", "cta"]})
+  matcher.matches("This hook is going viral")   # {"trend": {"viral"}, "strategy": {"hook"}}
+  matcher.categories(text)                       # {"trend", "strategy"}
+  matcher.search(text)                           # True if anything matches
+"""
+
+import re
+from typing import Iterable
+
+
+def _trie_pattern(words: list[str]) -> str:
+    """Regex for a set of words, factored by common prefix, longest match first."""
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        terminal = "" in node
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if terminal:
+            # Greedy optional: prefer the longer keyword at this position
+            return f"(?:{body})?" if len(branches) > 1 or len(body) > 1 else f"{body}?"
+        return body
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """Multi-set substring matcher compiled into one regex."""
+
+    def __init__(self, keyword_sets: dict[str, Iterable[str]]):
+        self.categories_by_keyword: dict[str, set[str]] = {}
+        for category, keywords in keyword_sets.items():
+            for kw in keywords:
+                kw = kw.lower()
+                if kw:
+                    self.categories_by_keyword.setdefault(kw, set()).add(category)
+
+        keywords = sorted(self.categories_by_keyword)
+        known = set(keywords)
+        # A regex hit at a position is the longest keyword starting there; any shorter
+        # keyword inside it (e.g. "sound" in "trending sound") is implied by that hit
+        self._contained = {
+            kw: {kw[i:j] for i in range(len(kw)) for j in range(i + 1, len(kw) + 1) if kw[i:j] in known}
+            for kw in keywords
+        }
+        # A keyword that starts inside another and runs past its end ("best seller" /
+        # "seller tips") would be skipped by a non-overlapping scan
+        proper_prefixes = {kw[:i] for kw in keywords for i in range(1, len(kw))}
+        self._overlapping = any(kw[i:] in proper_prefixes for kw in keywords for i in range(1, len(kw)))
+        pattern = _trie_pattern(keywords) if keywords else r"(?!)"
+        self._regex = re.compile(pattern)
+
+    def search(self, text: str) -> bool:
+        return self._regex.search(text.lower()) is not None
+
+    def keywords(self, text: str) -> set[str]:
+        """Every keyword that occurs in the text."""
+        text = text.lower()
+        if not self._overlapping:
+            longest = set(self._regex.findall(text))
+        else:
+            longest = set()
+            match = self._regex.search(text)
+            while match:
+                longest.add(match.group())
+                match = self._regex.search(text, match.start() + 1)
+
+        found = set()
+        for kw in longest:
+            found.update(self._contained[kw])
+        return found
+
+    def matches(self, text: str) -> dict[str, set[str]]:
+        """Matched keywords grouped by category."""
+        hits: dict[str, set[str]] = {}
+        for kw in self.keywords(text):
+            for category in self.categories_by_keyword[kw]:
+                hits.setdefault(category, set()).add(kw)
+        return hits
+
+    def categories(self, text: str) -> set[str]:
+        return set(self.matches(text))
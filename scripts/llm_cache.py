@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+FlashFlow LLM Response Cache
+
+Persistent, content-addressed cache for LLM completions (LM Studio and
+Anthropic). Entries are keyed by sha256(model, prompt, params) and stored
+in a local SQLite file with a TTL and size-bounded LRU eviction.
+
+Caching policy:
+  - cache=True   always cache
+  - cache=False  never cache
+  - cache=None   cache only deterministic-ish calls
+                 (temperature <= MAX_CACHEABLE_TEMPERATURE)
+
+High-temperature calls (hook brainstorming, remixes) are sampling on
+purpose, so they skip the cache unless a caller opts in.
+
+Set FLASHFLOW_LLM_CACHE=off to bypass the cache entirely.
+
+Usage:
+  from llm_cache import cached_completion
+
+  text = cached_completion(
+      "llama-3.1-8b-instruct", prompt, {"max_tokens": 10, "temperature": 0.3},
+      lambda: call_the_model(prompt),
+  )
+
+  python llm_cache.py            # Show cache stats
+  python llm_cache.py --clear    # Drop all entries
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable
+
+# --- Configuration ---
+
+CACHE_PATH = Path(os.environ.get("FLASHFLOW_LLM_CACHE_PATH", Path(__file__).parent / ".llm-cache.sqlite3"))
+CACHE_DISABLED = os.environ.get("FLASHFLOW_LLM_CACHE", "").lower() in ("off", "0", "false")
+
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+MAX_ENTRIES = 5000
+MAX_CACHEABLE_TEMPERATURE = 0.5
+
+log = logging.getLogger("llm-cache")
+
+
+def cache_key(model: str, prompt: str, params: dict | None = None) -> str:
+    """Stable content hash of a completion request."""
+    payload = json.dumps(
+        {"model": model, "prompt": prompt, "params": params or {}},
+        sort_keys=True, separators=(",", ":"), default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def is_cacheable(params: dict | None, cache: bool | None) -> bool:
+    if CACHE_DISABLED:
+        return False
+    if cache is not None:
+        return cache
+    temperature = (params or {}).get("temperature", 1.0)
+    return temperature <= MAX_CACHEABLE_TEMPERATURE
+
+
+class LLMCache:
+    """SQLite-backed response cache with TTL and LRU eviction."""
+
+    def __init__(self, path: Path = CACHE_PATH, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_entries: int = MAX_ENTRIES):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )"""
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache (accessed_at)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS llm_cache_stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+
+    def _bump(self, name: str):
+        self._db.execute(
+            "INSERT INTO llm_cache_stats (name, value) VALUES (?, 1) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + 1",
+            (name,),
+        )
+
+    def get(self, model: str, prompt: str, params: dict | None = None) -> str | None:
+        key = cache_key(model, prompt, params)
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT response, expires_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row and row[1] > now:
+                self._db.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+                self.hits += 1
+                self._bump("hits")
+                return row[0]
+            if row:
+                self._db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            self.misses += 1
+            self._bump("misses")
+            return None
+
+    def put(self, model: str, prompt: str, params: dict | None, response: str, ttl: float | None = None):
+        key = cache_key(model, prompt, params)
+        now = time.time()
+        expires = now + (self.ttl_seconds if ttl is None else ttl)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, model, response, created_at, accessed_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, now, now, expires),
+            )
+            self._evict(now)
+
+    def _evict(self, now: float):
+        self._db.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+        count = self._db.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        if count > self.max_entries:
+            self._db.execute(
+                "DELETE FROM llm_cache WHERE key IN "
+                "(SELECT key FROM llm_cache ORDER BY accessed_at ASC LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM llm_cache")
+            self._db.execute("DELETE FROM llm_cache_stats")
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            totals = dict(self._db.execute("SELECT name, value FROM llm_cache_stats").fetchall())
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "total_hits": totals.get("hits", 0),
+            "total_misses": totals.get("misses", 0),
+        }
+
+    def close(self):
+        self._db.close()
+
+
+_default_cache: LLMCache | None = None
+_default_lock = threading.Lock()
+
+
+def get_cache() -> LLMCache:
+    """Return the process-wide cache, opening it on first use."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = LLMCache()
+        return _default_cache
+
+
+def cached_completion(model: str, prompt: str, params: dict | None, generate: Callable[[], str],
+                      cache: bool | None = None, ttl: float | None = None) -> str:
+    """Return a cached completion, or call `generate()` and store a non-empty result."""
+    if not is_cacheable(params, cache):
+        return generate()
+
+    try:
+        store = get_cache()
+        hit = store.get(model, prompt, params)
+    except sqlite3.Error as e:
+        log.warning(f"LLM cache unavailable: {e}")
+        return generate()
+
+    if hit is not None:
+        return hit
+
+    response = generate()
+    if response:
+        try:
+            store.put(model, prompt, params, response, ttl=ttl)
+        except sqlite3.Error as e:
+            log.warning(f"LLM cache write failed: {e}")
+    return response
+
+
+def main():
+    store = get_cache()
+    if "--clear" in sys.argv:
+        store.clear()
+        print(f"Cleared {store.path}")
+        return
+
+    stats = store.stats()
+    total = stats["total_hits"] + stats["total_misses"]
+    hit_rate = (stats["total_hits"] / total * 100) if total else 0
+    print(f"\n=== LLM Cache ({store.path}) ===\n")
+    print(f"  Entries:  {stats['entries']}/{store.max_entries}")
+    print(f"  Hits:     {stats['total_hits']}")
+    print(f"  Misses:   {stats['total_misses']}")
+    print(f"  Hit rate: {hit_rate:.1f}%\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,35 +3,53 @@
 FlashFlow Posting Scheduler
 
 Auto-distributes READY_TO_POST videos across active posting accounts.
-Balances by daily posting limits, recent posting history, and account performance.
+Balances by daily posting limits, brand diversity, posting windows and account
+performance, solved as a min-cost flow (see posting_planner.py).
+
+Keeps a posting calendar (.posting-plan.json) with a concrete post time
+per video over the next HORIZON_DAYS days. Each run only re-plans what
+changed: slots whose day has passed, whose video is no longer ready or
+whose account went inactive are freed, and new READY_TO_POST videos
+fill free slots; every other slot stays as planned. --assign only
+PATCHes videos whose slot is new.
 
 Usage:
   python posting-scheduler.py                    # Show schedule preview
   python posting-scheduler.py --assign           # Assign videos to accounts
+  python posting-scheduler.py --days 14          # Plan 14 days ahead (default 7)
   python posting-scheduler.py --status           # Show account posting status
   python posting-scheduler.py --report           # Weekly posting report
 """
 
-import json
 import logging
-import os
-import re
 import sys
-from datetime import datetime, timedelta
+import zlib
+from datetime import date, datetime, timedelta
+from datetime import time as dt_time
 from pathlib import Path
+from zoneinfo import ZoneInfo
 
-import httpx
+from flashflow_api import API_KEY, api_call
+from posting_planner import account_scores, plan_calendar, video_brand
+from state_store import StateStore
 
 # --- Configuration ---
 
-API_URL = "https://web-pied-delta-30.vercel.app/api"
 JOURNALS_DIR = Path.home() / ".openclaw" / "workspace" / "second-brain" / "journals"
+PLAN_PATH = Path(__file__).parent / ".posting-plan.json"
+
+ET = ZoneInfo("America/New_York")
 
-# Posting limits per account per day
+# Posting limits per account per day: the calendar plans up to
+# MAX_POSTS_PER_ACCOUNT_PER_DAY across the whole horizon first, and goes up
+# to MAX_POSTS_PER_DAY only for videos that would not fit otherwise
 MAX_POSTS_PER_DAY = 3
 MAX_POSTS_PER_ACCOUNT_PER_DAY = 2
 
-# Optimal posting windows (ET)
+# Days ahead the posting calendar covers (override with --days)
+HORIZON_DAYS = 7
+
+# Optimal posting windows (ET). An optional "capacity" caps posts per window across all accounts.
 POSTING_WINDOWS = [
     {"label": "Morning", "start": 8, "end": 10},
     {"label": "Lunch", "start": 12, "end": 14},
@@ -45,45 +63,22 @@ logging.basicConfig(
 )
 log = logging.getLogger("posting-scheduler")
 
-API_KEY = os.environ.get("FLASHFLOW_API_KEY", "")
-if not API_KEY:
-    skill_file = Path.home() / ".openclaw" / "agents" / "flashflow-work" / "workspace" / "skills" / "flashflow" / "skill.md"
-    if skill_file.exists():
-        match = re.search(r"ff_ak_[a-f0-9]{40}", skill_file.read_text())
-        if match:
-            API_KEY = match.group(0)
-
-
-def api_call(method: str, endpoint: str, json_body: dict = None, params: dict = None) -> dict:
-    headers = {"Authorization": f"Bearer {API_KEY}", "Content-Type": "application/json"}
-    url = f"{API_URL}{endpoint}"
-    try:
-        if method == "GET":
-            resp = httpx.get(url, headers=headers, params=params, timeout=30)
-        elif method == "POST":
-            resp = httpx.post(url, headers=headers, json=json_body or {}, timeout=30)
-        elif method == "PATCH":
-            resp = httpx.patch(url, headers=headers, json=json_body or {}, timeout=30)
-        else:
-            return {"ok": False}
-        return {"ok": resp.status_code < 300, "data": resp.json()}
-    except Exception as e:
-        return {"ok": False, "error": str(e)}
-
-
-def get_active_accounts() -> list[dict]:
-    """Fetch active posting accounts."""
+
+def get_active_accounts() -> list[dict] | None:
+    """Fetch active posting accounts. None if the request failed."""
     r = api_call("GET", "/posting-accounts")
     if r["ok"]:
         return [a for a in (r["data"].get("data") or []) if a.get("is_active")]
-    return []
+    log.error(f"Failed to fetch posting accounts: {r.get('error') or r.get('status')}")
+    return None
 
 
-def get_ready_videos() -> list[dict]:
-    """Fetch videos ready to post."""
+def get_ready_videos() -> list[dict] | None:
+    """Fetch videos ready to post. None if the request failed."""
     r = api_call("GET", "/videos/queue")
     if not r["ok"]:
-        return []
+        log.error(f"Failed to fetch the video queue: {r.get('error') or r.get('status')}")
+        return None
 
     videos = r["data"].get("data", [])
     return [v for v in videos if (v.get("recording_status") or v.get("status", "")).upper() in ("READY_TO_POST", "APPROVED")]
@@ -107,101 +102,106 @@ def get_recent_posts(days: int = 7) -> dict[str, int]:
     return {}
 
 
-def calculate_schedule(accounts: list[dict], videos: list[dict], performance: dict[str, dict]) -> list[dict]:
-    """
-    Distribute videos across accounts.
+PLAN_STORE = StateStore(PLAN_PATH)
 
-    Strategy:
-    1. Round-robin across active accounts
-    2. Weight by performance (better performing accounts get more)
-    3. Respect daily posting limits
-    4. Balance brands across accounts (don't stack same brand on one account)
-    """
-    if not accounts or not videos:
-        return []
 
-    # Score accounts by performance
-    account_scores = {}
-    for acct in accounts:
-        aid = acct["id"]
-        perf = performance.get(aid, {})
-        views = perf.get("views", 0)
-        engagement = perf.get("avg_engagement", 0)
-        # Higher score = more proven account
-        score = 1.0 + (views / max(sum(p.get("views", 0) for p in performance.values()), 1)) + (engagement / 10)
-        account_scores[aid] = score
+def load_plan() -> dict:
+    return PLAN_STORE.load() or {"entries": {}}
 
-    # Sort accounts by score (best first)
-    sorted_accounts = sorted(accounts, key=lambda a: account_scores.get(a["id"], 1.0), reverse=True)
 
-    # Assign videos round-robin with performance weighting
-    schedule = []
-    account_daily_count = {a["id"]: 0 for a in accounts}
-    account_brands = {a["id"]: set() for a in accounts}
-    acct_idx = 0
-
-    for video in videos:
-        vid = video.get("id", "")
-        title = video.get("title", "")[:50]
-        brand = ""
-        product = video.get("product")
-        if isinstance(product, dict):
-            brand = product.get("brand", "")
-
-        # Find best account for this video
-        best_account = None
-        attempts = 0
-
-        while attempts < len(sorted_accounts):
-            candidate = sorted_accounts[acct_idx % len(sorted_accounts)]
-            cid = candidate["id"]
-
-            # Check daily limit
-            if account_daily_count[cid] >= MAX_POSTS_PER_ACCOUNT_PER_DAY:
-                acct_idx += 1
-                attempts += 1
-                continue
-
-            # Prefer accounts that don't already have this brand today
-            if brand and brand in account_brands[cid] and attempts < len(sorted_accounts) - 1:
-                acct_idx += 1
-                attempts += 1
-                continue
-
-            best_account = candidate
-            break
-
-        if not best_account:
-            # All accounts full, use first available
-            best_account = sorted_accounts[0]
-
-        aid = best_account["id"]
-        account_daily_count[aid] += 1
-        if brand:
-            account_brands[aid].add(brand)
-
-        # Choose optimal posting window
-        window_idx = (len(schedule)) % len(POSTING_WINDOWS)
-        window = POSTING_WINDOWS[window_idx]
+def save_plan(plan: dict):
+    PLAN_STORE.save(plan)
+
+
+def post_time(account_id: str, day: date, window: dict) -> datetime:
+    """A fixed minute inside the window per account, so accounts don't all post at once."""
+    offset = zlib.crc32(account_id.encode("utf-8")) % ((window["end"] - window["start"]) * 60)
+    return datetime.combine(day, dt_time(window["start"]), tzinfo=ET) + timedelta(minutes=offset)
 
+
+def calculate_schedule(accounts: list[dict], videos: list[dict], performance: dict[str, dict],
+                       plan: dict, horizon_days: int = HORIZON_DAYS) -> list[dict]:
+    """
+    Update the posting calendar in `plan` and return it, earliest post first.
+
+    Planned slots stay where they are. A slot is freed (its video goes back
+    in the queue) when its day has passed, its video is no longer ready to
+    post or its account is no longer active. `accounts` and `videos` must
+    come from successful fetches: an empty list frees every slot. Queued videos then fill free
+    slots over the next `horizon_days` days (posting_planner.plan_calendar):
+    1. At most one video per posting window per account
+    2. At most one video of a brand per account per day
+    3. MAX_POSTS_PER_ACCOUNT_PER_DAY per account per day across the horizon
+       first; up to MAX_POSTS_PER_DAY only for videos that don't fit otherwise
+    4. Earliest day first, on the best performing accounts
+    """
+    entries = plan.setdefault("entries", {})
+    now = datetime.now(ET)
+    days = [now.date() + timedelta(days=i) for i in range(horizon_days)]
+    day_index = {day.isoformat(): i for i, day in enumerate(days)}
+    ready = {v["id"]: v for v in videos if v.get("id")}
+    account_index = {a["id"]: i for i, a in enumerate(accounts)}
+    window_index = {w["label"]: i for i, w in enumerate(POSTING_WINDOWS)}
+
+    freed = 0
+    for video_id, entry in list(entries.items()):
+        if entry["day"] < days[0].isoformat() or video_id not in ready or entry["account_id"] not in account_index:
+            del entries[video_id]
+            freed += 1
+
+    existing = [
+        (account_index[e["account_id"]], day_index[e["day"]], window_index[e["window"]], e["brand"])
+        for e in entries.values()
+        if e["day"] in day_index and e["window"] in window_index
+    ]
+    queue = [v for video_id, v in ready.items() if video_id not in entries]
+    # Windows that have already started today take no new posts (their post times may have passed)
+    today_windows = [dict(w, capacity=0) if now.hour >= w["start"] else w for w in POSTING_WINDOWS]
+    day_windows = [today_windows] + [POSTING_WINDOWS] * (horizon_days - 1)
+
+    placed = plan_calendar(
+        queue, accounts, account_scores(accounts, performance), day_windows,
+        MAX_POSTS_PER_ACCOUNT_PER_DAY, MAX_POSTS_PER_DAY, existing=existing,
+    )
+    for video_idx, account_idx, day_idx, window_idx in placed:
+        video, account, window = queue[video_idx], accounts[account_idx], POSTING_WINDOWS[window_idx]
+        entries[video["id"]] = {
+            "account_id": account["id"],
+            "day": days[day_idx].isoformat(),
+            "window": window["label"],
+            "scheduled_at": post_time(account["id"], days[day_idx], window).isoformat(),
+            "title": video.get("title", "")[:50],
+            "brand": video_brand(video),
+            "assigned": False,
+        }
+
+    log.info(f"Calendar: {len(placed)} new slots, {len(entries) - len(placed)} kept, {freed} freed")
+    if len(placed) < len(queue):
+        log.info(f"{len(queue) - len(placed)} videos don't fit the next {horizon_days} days; left for a later run")
+
+    schedule = []
+    for video_id, entry in entries.items():
+        account = accounts[account_index[entry["account_id"]]]
+        window = POSTING_WINDOWS[window_index.get(entry["window"], 0)]
         schedule.append({
-            "video_id": vid,
-            "video_title": title,
-            "brand": brand,
-            "account_id": aid,
-            "account_name": best_account["display_name"],
-            "account_code": best_account["account_code"],
-            "suggested_window": window["label"],
+            "video_id": video_id,
+            "video_title": entry["title"],
+            "brand": entry["brand"],
+            "account_id": account["id"],
+            "account_name": account["display_name"],
+            "account_code": account["account_code"],
+            "day": entry["day"],
+            "scheduled_at": entry["scheduled_at"],
+            "suggested_window": entry["window"],
             "suggested_time": f"{window['start']}:00-{window['end']}:00 ET",
+            "assigned": entry["assigned"],
         })
-
-        acct_idx += 1
-
+    schedule.sort(key=lambda item: item["scheduled_at"])
     return schedule
 
 
 def show_schedule(schedule: list[dict]):
-    """Display posting schedule."""
+    """Display posting calendar."""
     print(f"\n{'='*70}")
     print(f"  Posting Schedule — {datetime.now().strftime('%Y-%m-%d')}")
     print(f"{'='*70}\n")
@@ -210,22 +210,24 @@ def show_schedule(schedule: list[dict]):
         print("  No videos ready to post.\n")
         return
 
-    # Group by account
-    by_account: dict[str, list[dict]] = {}
+    # Group by day
+    by_day: dict[str, list[dict]] = {}
     for item in schedule:
-        name = item["account_name"]
-        if name not in by_account:
-            by_account[name] = []
-        by_account[name].append(item)
+        by_day.setdefault(item["day"], []).append(item)
 
-    for account_name, items in by_account.items():
-        print(f"  [{account_name}] ({len(items)} videos)")
+    for day, items in by_day.items():
+        print(f"  [{day}] ({len(items)} videos)")
         for item in items:
-            print(f"    {item['suggested_window']:8s}  {item['video_title'][:40]:40s}  {item['brand'] or '-'}")
+            at = datetime.fromisoformat(item["scheduled_at"]).strftime("%H:%M")
+            new = "" if item["assigned"] else " *"
+            print(f"    {at}  {item['suggested_window']:8s}  {item['account_name'][:20]:20s}  "
+                  f"{item['video_title'][:40]:40s}  {item['brand'] or '-'}{new}")
         print()
 
-    print(f"  Total: {len(schedule)} videos across {len(by_account)} accounts")
-    print(f"  Suggested: {MAX_POSTS_PER_ACCOUNT_PER_DAY} max/account/day\n")
+    accounts = len({item["account_id"] for item in schedule})
+    print(f"  Total: {len(schedule)} videos across {len(by_day)} days and {accounts} accounts (* = new slot)")
+    print(f"  Limits: {MAX_POSTS_PER_ACCOUNT_PER_DAY} max/account/day ({MAX_POSTS_PER_DAY} when the backlog needs it), "
+          f"one per window\n")
 
 
 def show_status(accounts: list[dict], performance: dict[str, dict]):
@@ -302,6 +304,8 @@ def main():
         sys.exit(1)
 
     accounts = get_active_accounts()
+    if accounts is None:
+        sys.exit(1)
     performance = get_account_performance()
 
     if "--status" in sys.argv:
@@ -312,29 +316,43 @@ def main():
         generate_weekly_report(accounts, performance)
         return
 
-    # Get ready videos and create schedule
+    horizon_days = HORIZON_DAYS
+    if "--days" in sys.argv:
+        idx = sys.argv.index("--days")
+        if idx + 1 < len(sys.argv):
+            horizon_days = max(1, int(sys.argv[idx + 1]))
+
+    # Get ready videos and update the calendar. A failed fetch must not look
+    # like an empty queue: that would free every planned slot
     videos = get_ready_videos()
-    schedule = calculate_schedule(accounts, videos, performance)
+    if videos is None:
+        sys.exit(1)
+    plan = load_plan()
+    schedule = calculate_schedule(accounts, videos, performance, plan, horizon_days)
 
     if "--assign" in sys.argv:
-        if not schedule:
-            log.info("No videos to assign.")
+        pending = [item for item in schedule if not item["assigned"]]
+        if not pending:
+            save_plan(plan)
+            log.info("No new videos to assign.")
             return
 
-        log.info(f"Assigning {len(schedule)} videos to posting accounts...")
+        log.info(f"Assigning {len(pending)} videos to posting accounts...")
         assigned = 0
 
-        for item in schedule:
+        for item in pending:
             r = api_call("PATCH", f"/videos/{item['video_id']}", {
                 "posting_account_id": item["account_id"],
             })
             if r.get("ok"):
                 assigned += 1
-                log.info(f"  Assigned: {item['video_title'][:40]} → {item['account_name']}")
+                plan["entries"][item["video_id"]]["assigned"] = True
+                log.info(f"  Assigned: {item['video_title'][:40]} → {item['account_name']} at {item['scheduled_at']}")
             else:
                 log.warning(f"  Failed to assign {item['video_title'][:40]}: {r.get('error', 'unknown')}")
 
-        log.info(f"\nAssigned {assigned}/{len(schedule)} videos.")
+        save_plan(plan)
+        log.info(f"\nAssigned {assigned}/{len(pending)} videos.")
 
         # Log to journal
         JOURNALS_DIR.mkdir(parents=True, exist_ok=True)
@@ -342,11 +360,12 @@ def main():
         journal = JOURNALS_DIR / f"{today}-posting-scheduler.md"
         with open(journal, "a") as f:
             f.write(f"\n## Posting Schedule — {datetime.now().strftime('%H:%M')}\n")
-            f.write(f"- Assigned {assigned} videos to {len(set(s['account_id'] for s in schedule))} accounts\n")
+            f.write(f"- Assigned {assigned} videos to {len(set(s['account_id'] for s in pending))} accounts\n")
+            f.write(f"- Calendar: {len(schedule)} videos planned over the next {horizon_days} days\n")
     else:
-        # Preview mode
+        # Preview mode (the calendar is not saved)
         show_schedule(schedule)
-        if schedule:
+        if any(not item["assigned"] for item in schedule):
             print("  Run with --assign to actually assign videos to accounts.\n")
 
 
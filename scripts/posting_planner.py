@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+FlashFlow Posting Planner
+
+Assigns READY_TO_POST videos to posting accounts for posting-scheduler.
+The old greedy round-robin probed accounts one by one per video, summed
+every account's views inside the per-account scoring loop (O(A^2)) and,
+when every account was full, piled the rest onto the top account.
+
+Assignment is solved as a min-cost max-flow instead:
+
+  source -> brand group -> account class -> window -> sink
+     videos    per-account     daily cap       per-window
+     of brand  brand cap       (cost = -score) capacity
+
+  - Videos of one brand are interchangeable for the constraints, so they
+    enter as one group node (capacity = number of videos); videos with no
+    brand form a group with no brand cap
+  - Accounts with the same quantized score form one class node with its
+    capacities multiplied by the class size, then the class's flow is
+    dealt back to its accounts round-robin, which keeps every per-account
+    cap. This keeps 10k videos x 500 accounts at a few thousand edges
+  - Every unit of flow is one posted video, worth its account's score:
+    the solver posts as many videos as the caps allow and, among those
+    plans, maximizes the total expected performance. Videos that don't
+    fit wait for the next run instead of overloading an account
+
+plan_calendar fills a multi-day horizon one day at a time with the same
+solver, around slots that are already planned: each account's posts,
+windows and brands on a day count against its caps, so new videos only
+take free slots and nothing already planned moves.
+
+Usage:
+  from posting_planner import account_scores, plan_calendar, solve_assignment
+
+  scores = account_scores(accounts, performance)
+  plan = solve_assignment(videos, accounts, scores, POSTING_WINDOWS, daily_cap=2)
+  for video_idx, account_idx, window_idx in plan:
+      ...
+  calendar = plan_calendar(videos, accounts, scores, [POSTING_WINDOWS] * 7, 2, 3, existing=taken)
+"""
+
+import heapq
+from collections import Counter, defaultdict
+
+# --- Configuration ---
+
+# Scores are rounded to this many steps per point; accounts that round
+# to the same score share a class node
+SCORE_SCALE = 100
+# Videos of one brand per account per day
+BRAND_CAP_PER_ACCOUNT = 1
+
+
+class MinCostFlow:
+    """Min-cost max-flow by successive shortest paths (primal-dual).
+
+    Each phase runs Dijkstra on reduced costs to update the node
+    potentials, then pushes a blocking flow (Dinic) through all edges of
+    zero reduced cost, so every shortest path of that length is used at
+    once: the number of phases follows the number of distinct path costs,
+    not the amount of flow. Capacities and costs are non-negative integers.
+    """
+
+    def __init__(self, nodes: int):
+        self.nodes = nodes
+        self.adj: list[list[int]] = [[] for _ in range(nodes)]
+        self.to: list[int] = []
+        self.cap: list[int] = []
+        self.cost: list[int] = []
+
+    def add_edge(self, u: int, v: int, cap: int, cost: int = 0) -> int:
+        """Add an edge; returns its id for flow_on(). The reverse edge is id ^ 1."""
+        e = len(self.to)
+        self.to += [v, u]
+        self.cap += [cap, 0]
+        self.cost += [cost, -cost]
+        self.adj[u].append(e)
+        self.adj[v].append(e + 1)
+        return e
+
+    def flow_on(self, e: int) -> int:
+        return self.cap[e ^ 1]
+
+    def solve(self, source: int, sink: int) -> tuple[int, int]:
+        """Push the maximum flow at minimum cost. Returns (flow, cost)."""
+        n, adj, to, cap, cost = self.nodes, self.adj, self.to, self.cap, self.cost
+        inf = float("inf")
+        pot = [0] * n
+        total_flow = total_cost = 0
+
+        while True:
+            dist = [inf] * n
+            dist[source] = 0
+            heap = [(0, source)]
+            while heap:
+                d, u = heapq.heappop(heap)
+                if d > dist[u]:
+                    continue
+                base = d + pot[u]
+                for e in adj[u]:
+                    if cap[e] > 0:
+                        v = to[e]
+                        nd = base + cost[e] - pot[v]
+                        if nd < dist[v]:
+                            dist[v] = nd
+                            heapq.heappush(heap, (nd, v))
+            if dist[sink] == inf:
+                break
+            limit = dist[sink]
+            for v in range(n):
+                pot[v] += dist[v] if dist[v] < limit else limit
+
+            pushed = self._blocking_flows(source, sink, pot)
+            total_flow += pushed
+            total_cost += pushed * (pot[sink] - pot[source])
+
+        return total_flow, total_cost
+
+    def _blocking_flows(self, source: int, sink: int, pot: list[int]) -> int:
+        """Dinic restricted to zero-reduced-cost edges. Returns the flow pushed."""
+        n, adj, to, cap, cost = self.nodes, self.adj, self.to, self.cap, self.cost
+
+        def admissible(e: int, u: int) -> bool:
+            return cap[e] > 0 and cost[e] + pot[u] - pot[to[e]] == 0
+
+        pushed = 0
+        while True:
+            level = [-1] * n
+            level[source] = 0
+            queue = [source]
+            for u in queue:
+                for e in adj[u]:
+                    if level[to[e]] < 0 and admissible(e, u):
+                        level[to[e]] = level[u] + 1
+                        queue.append(to[e])
+            if level[sink] < 0:
+                return pushed
+
+            current = [0] * n
+            path: list[int] = []
+            u = source
+            while True:
+                if u == sink:
+                    f = min(cap[e] for e in path)
+                    for e in path:
+                        cap[e] -= f
+                        cap[e ^ 1] += f
+                    pushed += f
+                    path.clear()
+                    u = source
+                    continue
+                edges = adj[u]
+                while current[u] < len(edges):
+                    e = edges[current[u]]
+                    if level[to[e]] == level[u] + 1 and admissible(e, u):
+                        break
+                    current[u] += 1
+                if current[u] < len(edges):
+                    path.append(edges[current[u]])
+                    u = to[edges[current[u]]]
+                    continue
+                # Dead end: never come back here this round
+                level[u] = -1
+                if u == source:
+                    break
+                e = path.pop()
+                u = to[e ^ 1]
+                current[u] += 1
+
+
+def video_brand(video: dict) -> str:
+    product = video.get("product")
+    return product.get("brand", "") if isinstance(product, dict) else ""
+
+
+def account_scores(accounts: list[dict], performance: dict[str, dict]) -> dict[str, float]:
+    """Expected-performance score per account: 1 + share of all views + engagement / 10."""
+    total_views = max(sum(p.get("views", 0) for p in performance.values()), 1)
+    scores = {}
+    for acct in accounts:
+        perf = performance.get(acct["id"], {})
+        scores[acct["id"]] = 1.0 + perf.get("views", 0) / total_views + perf.get("avg_engagement", 0) / 10
+    return scores
+
+
+def _deal(units: list, members: list[int]) -> dict[int, list]:
+    """Hand out units to members round-robin, in order."""
+    out: dict[int, list] = defaultdict(list)
+    for pos, unit in enumerate(units):
+        out[members[pos % len(members)]].append(unit)
+    return out
+
+
+def empty_usage() -> dict:
+    """What an account already has planned on a day."""
+    return {"posts": 0, "windows": set(), "brands": Counter()}
+
+
+def solve_assignment(videos: list[dict], accounts: list[dict], scores: dict[str, float],
+                     windows: list[dict], daily_cap: int, brand_cap: int = BRAND_CAP_PER_ACCOUNT,
+                     usage: dict[int, dict] | None = None) -> list[tuple[int, int, int]]:
+    """Plan one day of posts. Returns [(video index, account index, window index)].
+
+    Each account posts at most `daily_cap` videos, at most `brand_cap` of
+    any one brand and at most one per window; a window's optional
+    "capacity" caps its posts across all accounts. `usage` maps account
+    index to what it already has that day (see empty_usage), which counts
+    against those caps. Videos of a brand are used in queue order.
+    Videos left out did not fit.
+    """
+    if not videos or not accounts or not windows or daily_cap < 1:
+        return []
+    usage = usage or {}
+    no_usage = empty_usage()
+
+    groups: dict[str, list[int]] = defaultdict(list)
+    for i, video in enumerate(videos):
+        groups[video_brand(video)].append(i)
+    # Accounts are interchangeable when score and free capacity match
+    classes: dict[tuple, list[int]] = defaultdict(list)
+    for i, acct in enumerate(accounts):
+        used = usage.get(i, no_usage)
+        free = daily_cap - used["posts"]
+        free_windows = tuple(w for w in range(len(windows)) if w not in used["windows"])
+        if free < 1 or not free_windows:
+            continue
+        brands = tuple(sorted((b, n) for b, n in used["brands"].items() if b in groups))
+        classes[round(scores.get(acct["id"], 1.0) * SCORE_SCALE), free, free_windows, brands].append(i)
+    if not classes:
+        return []
+    top = max(key[0] for key in classes)
+
+    group_keys = list(groups)
+    class_keys = sorted(classes, reverse=True)
+    # Nodes: source, groups, class in, class out, windows, sink
+    g0 = 1
+    c_in = g0 + len(group_keys)
+    c_out = c_in + len(class_keys)
+    w0 = c_out + len(class_keys)
+    sink = w0 + len(windows)
+    flow = MinCostFlow(sink + 1)
+
+    for gi, key in enumerate(group_keys):
+        flow.add_edge(0, g0 + gi, len(groups[key]))
+    pair_edges = {}
+    window_edges = {}
+    for ci, class_key in enumerate(class_keys):
+        score, free, free_windows, brands = class_key
+        size = len(classes[class_key])
+        used_brands = dict(brands)
+        for gi, key in enumerate(group_keys):
+            per_account = brand_cap - used_brands.get(key, 0) if key else free
+            if per_account > 0:
+                pair_edges[gi, ci] = flow.add_edge(g0 + gi, c_in + ci, per_account * size)
+        # Costs must be non-negative: pay (top - score) per post; with the
+        # flow maximized first, that is the same as maximizing the score
+        flow.add_edge(c_in + ci, c_out + ci, free * size, top - score)
+        for wi in free_windows:
+            window_edges[ci, wi] = flow.add_edge(c_out + ci, w0 + wi, size)
+    taken = Counter(w for used in usage.values() for w in used["windows"])
+    for wi, window in enumerate(windows):
+        capacity = window.get("capacity")
+        capacity = len(videos) if capacity is None else capacity - taken[wi]
+        if capacity > 0:
+            flow.add_edge(w0 + wi, sink, capacity)
+
+    flow.solve(0, sink)
+
+    queues = {key: iter(indices) for key, indices in groups.items()}
+    plan = []
+    for ci, class_key in enumerate(class_keys):
+        members = classes[class_key]
+        # Same round-robin order on both sides, so every member gets as
+        # many windows as videos and stays within each per-account cap
+        video_units = [
+            next(queues[key])
+            for gi, key in enumerate(group_keys) if (gi, ci) in pair_edges
+            for _ in range(flow.flow_on(pair_edges[gi, ci]))
+        ]
+        window_units = [
+            wi for wi in class_key[2] for _ in range(flow.flow_on(window_edges[ci, wi]))
+        ]
+        by_video = _deal(video_units, members)
+        by_window = _deal(window_units, members)
+        for account_idx in members:
+            for video_idx, window_idx in zip(by_video.get(account_idx, []), by_window.get(account_idx, [])):
+                plan.append((video_idx, account_idx, window_idx))
+
+    plan.sort()
+    return plan
+
+
+def plan_calendar(videos: list[dict], accounts: list[dict], scores: dict[str, float],
+                  day_windows: list[list[dict]], target_per_day: int, max_per_day: int,
+                  brand_cap: int = BRAND_CAP_PER_ACCOUNT,
+                  existing: list[tuple[int, int, int, str]] = ()) -> list[tuple[int, int, int, int]]:
+    """Fill a multi-day calendar. Returns [(video index, account index, day index, window index)].
+
+    `day_windows` holds each day's posting windows (a window with capacity
+    0 takes no posts, e.g. today's windows that have passed). `existing`
+    lists slots already planned as (account index, day index, window
+    index, brand); they count against the caps and are left where they are.
+
+    Days are filled in order, so videos post as early as possible: first
+    up to target_per_day posts per account per day across the whole
+    horizon, then, only for videos still left over, up to max_per_day.
+    """
+    usage = [defaultdict(empty_usage) for _ in day_windows]
+
+    def take(account_idx: int, day_idx: int, window_idx: int, brand: str):
+        used = usage[day_idx][account_idx]
+        used["posts"] += 1
+        used["windows"].add(window_idx)
+        if brand:
+            used["brands"][brand] += 1
+
+    for slot in existing:
+        take(*slot)
+
+    remaining = list(range(len(videos)))
+    plan = []
+    for cap in sorted({target_per_day, max_per_day}):
+        for day_idx, windows in enumerate(day_windows):
+            if not remaining:
+                return plan
+            placed = solve_assignment(
+                [videos[i] for i in remaining], accounts, scores, windows, cap, brand_cap, usage[day_idx]
+            )
+            for video_pos, account_idx, window_idx in placed:
+                video_idx = remaining[video_pos]
+                plan.append((video_idx, account_idx, day_idx, window_idx))
+                take(account_idx, day_idx, window_idx, video_brand(videos[video_idx]))
+            done = {remaining[video_pos] for video_pos, _, _ in placed}
+            remaining = [i for i in remaining if i not in done]
+    return plan
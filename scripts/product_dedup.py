@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+FlashFlow Product Dedup
+
+Clusters near-duplicate product candidates for content-pipeline
+step2_select. Research notes mention the same product many ways
+("Collagen powder is trending", "collagen powder - viral again"), and
+distinct products often share a prefix ("Collagen gummies" vs
+"Collagen powder"), so a fixed-length name prefix is the wrong key.
+
+  1. Catalog linking: candidates whose text contains a FlashFlow catalog
+     product's name join that product's cluster (one KeywordMatcher pass).
+  2. MinHash/LSH on character 3-grams of the product words (buzz words
+     like "trending"/"viral" stripped): one-permutation MinHash signatures
+     banded into LSH buckets find similar cluster leaders in near-linear
+     time, confirmed by exact Jaccard similarity before joining.
+  3. Each cluster keeps its best-scored member as the representative,
+     carrying the catalog product ID (if any) and the summed mention count.
+
+Usage:
+  from product_dedup import dedup_products
+
+  unique = dedup_products(products)   # Best first
+"""
+
+import hashlib
+from collections import defaultdict
+
+from keyword_matcher import KeywordMatcher
+from research_index import normalize_name
+
+# --- Configuration ---
+
+SHINGLE_SIZE = 3
+NUM_BANDS = 16
+ROWS_PER_BAND = 2
+SIMILARITY_THRESHOLD = 0.6
+# Catalog names shorter than this are too generic to link on ("Gel", "Mask")
+MIN_CATALOG_NAME_LENGTH = 6
+
+# Words that describe buzz, not the product ("X is trending", "my X video went viral")
+STOP_WORDS = {
+    "a", "an", "and", "anyone", "are", "again", "at", "best", "buy", "check", "commission", "for",
+    "from", "fyp", "going", "got", "has", "have", "here", "i", "in", "is", "it", "just", "link",
+    "links", "my", "new", "now", "of", "on", "or", "out", "overnight", "product", "products", "right",
+    "sale", "sales", "seller", "selling", "shop", "so", "the", "this", "tiktok", "to", "trending",
+    "video", "videos", "viral", "week", "went", "with", "you", "your",
+}
+
+_NUM_HASHES = NUM_BANDS * ROWS_PER_BAND
+_MASK64 = (1 << 64) - 1
+
+
+def shingles(key: str, size: int = SHINGLE_SIZE) -> set[str]:
+    padded = f" {key} "
+    if len(padded) <= size:
+        return {padded}
+    return {padded[i:i + size] for i in range(len(padded) - size + 1)}
+
+
+def _hash64(shingle: str) -> int:
+    return int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def minhash_signature(hashes: list[int], num_hashes: int = _NUM_HASHES) -> list[int]:
+    """One-permutation MinHash: each shingle hash lands in one bin, keep the min per bin.
+
+    Empty bins borrow from the next non-empty bin (rotation densification),
+    so the cost is one pass over the shingles instead of num_hashes passes.
+    """
+    bins = [_MASK64] * num_hashes
+    for h in hashes:
+        b = h % num_hashes
+        v = h // num_hashes
+        if v < bins[b]:
+            bins[b] = v
+    if _MASK64 in bins and len(hashes):
+        filled = [i for i, v in enumerate(bins) if v != _MASK64]
+        for i in range(num_hashes):
+            if bins[i] == _MASK64:
+                # Nearest filled bin to the right (wrapping), offset by distance
+                j = next((f for f in filled if f > i), filled[0])
+                bins[i] = (bins[j] + ((j - i) % num_hashes) * 0x9E3779B97F4A7C15) & _MASK64
+    return bins
+
+
+def jaccard(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def product_key(name: str) -> str:
+    """Normalized name with trend vocabulary, filler words and numbers removed."""
+    return " ".join(
+        token for token in normalize_name(name).split()
+        if token not in STOP_WORDS and not token.isdigit()
+    )
+
+
+def cluster_keys(keys: list[str], threshold: float = SIMILARITY_THRESHOLD,
+                 leaders: list[int] | None = None) -> list[int]:
+    """Leader clustering over product keys. Returns the leader index for every key.
+
+    Keys in `leaders` (catalog products) always start their own cluster and
+    are visited first. Every other key joins the most similar existing leader found through the LSH buckets
+    if their Jaccard similarity reaches `threshold`, otherwise it becomes a
+    new leader. Comparing against leaders only (not every member) keeps
+    chains of near-matches from collapsing distinct products together.
+    """
+    first = list(leaders or [])
+    seeded = set(first)
+    order = first + [i for i in range(len(keys)) if i not in seeded]
+    assigned = [-1] * len(keys)
+    leader_of_key: dict[str, int] = {}
+    shingle_sets: dict[int, set[str]] = {}
+    shingle_hashes: dict[str, int] = {}
+    buckets: dict[tuple, list[int]] = defaultdict(list)
+
+    for i in order:
+        key = keys[i]
+        if key in leader_of_key and i not in seeded:
+            # Identical keys join without hashing
+            assigned[i] = leader_of_key[key]
+            continue
+
+        grams = shingles(key)
+        hashes = []
+        for g in grams:
+            h = shingle_hashes.get(g)
+            if h is None:
+                h = shingle_hashes[g] = _hash64(g)
+            hashes.append(h)
+        sig = minhash_signature(hashes)
+        bands = [(band, *sig[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]) for band in range(NUM_BANDS)]
+
+        best, best_sim = -1, threshold
+        candidates = () if i in seeded else {leader for band in bands for leader in buckets.get(band, ())}
+        for leader in candidates:
+            sim = jaccard(grams, shingle_sets[leader])
+            if sim >= best_sim:
+                best, best_sim = leader, sim
+
+        if best < 0:
+            best = i
+            shingle_sets[i] = grams
+            for band in bands:
+                buckets[band].append(i)
+        assigned[i] = best
+        leader_of_key.setdefault(key, best)
+
+    return assigned
+
+
+def link_catalog(products: list[dict]) -> dict[int, int]:
+    """Map candidate index -> catalog candidate index for mentions naming a catalog product."""
+    catalog = {}
+    for i, p in enumerate(products):
+        key = normalize_name(p.get("name", ""))
+        if p.get("id") and len(key) >= MIN_CATALOG_NAME_LENGTH:
+            catalog.setdefault(key, i)
+    if not catalog:
+        return {}
+
+    matcher = KeywordMatcher({key: [f" {key} "] for key in catalog})
+    links = {}
+    for i, p in enumerate(products):
+        if p.get("id"):
+            continue
+        hits = matcher.keywords(f" {normalize_name(p.get('name', ''))} ")
+        if hits:
+            # Most specific product name wins
+            links[i] = catalog[max(hits, key=len).strip()]
+    return links
+
+
+def cluster_products(products: list[dict], threshold: float = SIMILARITY_THRESHOLD) -> list[list[int]]:
+    """Group candidates into clusters of indices into `products`."""
+    links = link_catalog(products)
+    unlinked = [i for i in range(len(products)) if i not in links]
+    keys = [product_key(products[i].get("name", "")) for i in unlinked]
+    catalog_positions = [pos for pos, i in enumerate(unlinked) if products[i].get("id")]
+    leaders = cluster_keys(keys, threshold, leaders=catalog_positions)
+
+    clusters: dict[int, list[int]] = defaultdict(list)
+    for pos, i in enumerate(unlinked):
+        clusters[unlinked[leaders[pos]]].append(i)
+    for i, catalog_idx in links.items():
+        clusters[catalog_idx].append(i)
+    return list(clusters.values())
+
+
+def dedup_products(products: list[dict], threshold: float = SIMILARITY_THRESHOLD) -> list[dict]:
+    """Collapse near-duplicate candidates. Returns one representative per cluster, best score first."""
+    unique = []
+    for members in cluster_products(products, threshold):
+        best = max(members, key=lambda i: products[i].get("score", 0))
+        rep = dict(products[best])
+        catalog = next((products[i] for i in members if products[i].get("id")), None)
+        if catalog and not rep.get("id"):
+            rep["id"] = catalog["id"]
+            rep.setdefault("brand", catalog.get("brand", ""))
+        rep["mentions"] = sum(products[i].get("mentions", 1) for i in members)
+        rep["cluster_size"] = len(members)
+        unique.append(rep)
+
+    unique.sort(key=lambda p: p.get("score", 0), reverse=True)
+    return unique
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+FlashFlow Remote Execution
+
+SSH connection layer for orchestrator and cron-manager. Every remote call
+used to spawn a fresh `ssh` process with a full key exchange, and a single
+health check made four of them per machine (echo, psutil, disk, schtasks).
+
+  - Persistent sessions: OpenSSH ControlMaster. The first command to a host
+    opens a master connection that stays up for CONTROL_PERSIST after the
+    last use; later commands ride on it without a new handshake.
+  - Batched probe: one Python script, piped to the machine's interpreter on
+    stdin, gathers reachability, CPU/memory, disk and scheduled-task status
+    and prints them as a single JSON object. One round trip per machine.
+  - Detached jobs: spawn_job starts a script that outlives the SSH session
+    and records its exit code and duration in a status file next to its
+    log; poll_jobs reads back status, liveness and log tails for all of a
+    machine's jobs in one round trip.
+
+Machines are the dicts from orchestrator-config.json ("host", "ssh_user",
+"ssh_key", optional "python"). A host of "localhost" runs locally.
+
+Usage:
+  from remote_exec import run_command, probe
+
+  ok, output = run_command(machine, "cd /d C:\\FlashFlow\\scripts && dir")
+  ok, info = probe(machine, scheduled_tasks=["FlashFlow-TikTokScraper"])
+  ok, job = spawn_job(machine, [python, "tiktok-scraper.py"], scripts_dir, log_path, status_path)
+  ok, [result] = poll_jobs(machine, [job])
+
+  python remote_exec.py user@host           # Probe a host and print the JSON
+  python remote_exec.py user@host --close   # Close its master connection
+"""
+
+import json
+import logging
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+# --- Configuration ---
+
+CONNECT_TIMEOUT = 10
+CONTROL_PERSIST = "10m"
+# %C is a hash of (local host, remote host, port, user): short enough for the
+# Unix socket path limit and unique per destination
+CONTROL_PATH = str(Path.home() / ".ssh" / "flashflow-cm-%C")
+LOCAL_PYTHON = "python3"
+REMOTE_PYTHON = "C:\\FlashFlow\\.venv\\Scripts\\python.exe"
+LOG_TAIL_BYTES = 2000
+
+log = logging.getLogger("remote-exec")
+
+# Runs on the target machine. Standard library only, psutil if installed.
+# __NAME__ sentinels in these scripts are filled in by fill_script().
+PROBE_SCRIPT = r"""
+import json, os, shutil, subprocess, sys
+out = {"reachable": True, "platform": sys.platform}
+try:
+    import psutil
+    out["cpu_percent"] = psutil.cpu_percent(interval=0.5)
+    out["memory_percent"] = psutil.virtual_memory().percent
+except Exception:
+    pass
+try:
+    usage = shutil.disk_usage(os.path.abspath(os.sep))
+    out["disk_percent"] = round(usage.used / usage.total * 100, 1)
+    out["disk_free_gb"] = round(usage.free / 1e9, 1)
+except Exception as e:
+    out["disk_error"] = str(e)
+tasks = {}
+for name in __TASK_NAMES__:
+    if sys.platform != "win32":
+        break
+    try:
+        res = subprocess.run(["schtasks", "/query", "/tn", name, "/fo", "CSV", "/nh"],
+                             capture_output=True, text=True, timeout=10)
+        line = res.stdout.strip().splitlines()[-1] if res.returncode == 0 and res.stdout.strip() else ""
+        tasks[name] = line.rsplit(",", 1)[-1].strip('"') if line else "not_found"
+    except Exception as e:
+        tasks[name] = "error: " + str(e)
+out["scheduled_tasks"] = tasks
+print(json.dumps(out))
+"""
+
+
+# Started detached by LAUNCH_SCRIPT: runs the job, then records how it ended
+RUNNER_SCRIPT = r"""
+import json, os, subprocess, sys, time
+from datetime import datetime
+p = json.loads(sys.argv[1])
+start = time.time()
+with open(p["log"], "w") as log:
+    try:
+        code = subprocess.call(p["argv"], cwd=p["cwd"], stdout=log, stderr=subprocess.STDOUT)
+    except Exception as e:
+        log.write("Failed to start: " + str(e) + "\n")
+        code = -1
+tmp = p["status"] + ".tmp"
+with open(tmp, "w") as f:
+    json.dump({"exit_code": code, "ended_at": datetime.utcnow().isoformat(),
+               "duration_seconds": round(time.time() - start, 1)}, f)
+os.replace(tmp, p["status"])
+"""
+
+LAUNCH_SCRIPT = r"""
+import json, os, subprocess, sys
+p = __PARAMS__
+try:
+    os.remove(p["status"])
+except FileNotFoundError:
+    pass
+os.makedirs(os.path.dirname(p["log"]) or ".", exist_ok=True)
+argv = [sys.executable, "-c", __RUNNER__, json.dumps(p)]
+io = {"stdin": subprocess.DEVNULL, "stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL}
+if sys.platform == "win32":
+    # DETACHED_PROCESS | CREATE_NEW_PROCESS_GROUP, plus CREATE_BREAKAWAY_FROM_JOB so the
+    # job survives sshd closing the session's job object (not always permitted)
+    try:
+        proc = subprocess.Popen(argv, creationflags=0x01000208, **io)
+    except OSError:
+        proc = subprocess.Popen(argv, creationflags=0x00000208, **io)
+else:
+    proc = subprocess.Popen(argv, start_new_session=True, **io)
+print(json.dumps({"pid": proc.pid}))
+"""
+
+POLL_SCRIPT = r"""
+import json, os, signal, subprocess, sys
+def alive(pid):
+    if sys.platform == "win32":
+        out = subprocess.run(["tasklist", "/fi", "PID eq %d" % pid, "/fo", "CSV", "/nh"],
+                             capture_output=True, text=True).stdout
+        return '"%d"' % pid in out
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+def kill(pid):
+    if sys.platform == "win32":
+        subprocess.run(["taskkill", "/T", "/F", "/PID", str(pid)], capture_output=True)
+    else:
+        try:
+            os.killpg(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+results = []
+for job in __JOBS__:
+    r = {"done": False}
+    try:
+        with open(job["status"]) as f:
+            r.update(json.load(f))
+        r["done"] = True
+    except (OSError, ValueError):
+        if job.get("kill"):
+            kill(job["pid"])
+            r["killed"] = True
+        r["alive"] = alive(job["pid"])
+    try:
+        with open(job["log"], "rb") as f:
+            f.seek(0, 2)
+            f.seek(max(0, f.tell() - __TAIL_BYTES__))
+            r["log_tail"] = f.read().decode("utf-8", "replace")
+    except OSError:
+        r["log_tail"] = ""
+    results.append(r)
+print(json.dumps(results))
+"""
+
+
+def fill_script(script: str, **values) -> str:
+    """Replace each __NAME__ sentinel with repr(values[NAME]), in a single pass.
+
+    Substituted text is never rescanned, so a path or argument that happens
+    to contain another sentinel's name is left alone.
+    """
+    return re.sub(r"__([A-Z][A-Z_]*)__", lambda m: repr(values[m.group(1)]), script)
+
+
+def is_local(machine: dict) -> bool:
+    return machine.get("host") in ("localhost", "127.0.0.1")
+
+
+def machine_python(machine: dict) -> str:
+    return machine.get("python") or (LOCAL_PYTHON if is_local(machine) else REMOTE_PYTHON)
+
+
+def ssh_command(machine: dict, *extra: str) -> list[str]:
+    """Base ssh argv for a machine, with connection sharing enabled."""
+    cmd = ["ssh"]
+    key = machine.get("ssh_key", "")
+    if key:
+        cmd.extend(["-i", os.path.expanduser(key)])
+    cmd.extend([
+        "-o", f"ConnectTimeout={CONNECT_TIMEOUT}",
+        "-o", "StrictHostKeyChecking=no",
+        "-o", "BatchMode=yes",
+        "-o", "ControlMaster=auto",
+        "-o", f"ControlPath={CONTROL_PATH}",
+        "-o", f"ControlPersist={CONTROL_PERSIST}",
+        "-o", "ServerAliveInterval=30",
+    ])
+    cmd.extend(extra)
+    user = machine.get("ssh_user")
+    cmd.append(f"{user}@{machine['host']}" if user else machine["host"])
+    return cmd
+
+
+def run_command(machine: dict, command: str, timeout: int = 30, input: str | None = None) -> tuple[bool, str]:
+    """Run a shell command on a machine. Returns (exit code == 0, stdout + stderr)."""
+    if is_local(machine):
+        argv, shell = command, True
+    else:
+        argv, shell = ssh_command(machine) + [command], False
+
+    try:
+        result = subprocess.run(
+            argv, shell=shell, input=input, capture_output=True, text=True, timeout=timeout
+        )
+        return result.returncode == 0, result.stdout + result.stderr
+    except subprocess.TimeoutExpired:
+        return False, "Command timed out" if shell else "SSH command timed out"
+    except Exception as e:
+        return False, str(e)
+
+
+def run_python(machine: dict, script: str, timeout: int = 30):
+    """Pipe a Python script to the machine's interpreter and parse the JSON line it prints.
+
+    Returns (True, value) when the script ran, else (False, {"error": ...}).
+    """
+    ok, output = run_command(machine, f"{machine_python(machine)} -", timeout=timeout, input=script)
+    if not ok:
+        return False, {"error": output.strip()[-500:]}
+
+    # The JSON is the last line; anything before it is login banner noise
+    for line in reversed(output.strip().splitlines()):
+        if line.startswith(("{", "[")):
+            try:
+                return True, json.loads(line)
+            except json.JSONDecodeError:
+                break
+    return False, {"error": f"Unreadable output: {output.strip()[-200:]}"}
+
+
+def probe(machine: dict, scheduled_tasks: list[str] | None = None, timeout: int = 30) -> tuple[bool, dict]:
+    """Collect health details in one remote invocation."""
+    script = fill_script(PROBE_SCRIPT, TASK_NAMES=list(scheduled_tasks or []))
+    return run_python(machine, script, timeout=timeout)
+
+
+def spawn_job(machine: dict, argv: list[str], cwd: str, log_path: str, status_path: str,
+              timeout: int = 30) -> tuple[bool, dict]:
+    """Start a detached job on a machine. Returns (True, job handle) or (False, {"error": ...}).
+
+    The job outlives the SSH session and this process. Its output goes to
+    log_path, and when it exits its exit code and duration are written to
+    status_path, which poll_jobs reads.
+    """
+    params = {"argv": argv, "cwd": cwd, "log": log_path, "status": status_path}
+    script = fill_script(LAUNCH_SCRIPT, PARAMS=params, RUNNER=RUNNER_SCRIPT)
+    ok, result = run_python(machine, script, timeout=timeout)
+    if not ok:
+        return False, result
+    return True, {"pid": result["pid"], "log": log_path, "status": status_path}
+
+
+def poll_jobs(machine: dict, jobs: list[dict], tail_bytes: int = LOG_TAIL_BYTES,
+              timeout: int = 30) -> tuple[bool, list | dict]:
+    """Check several jobs on one machine in a single round trip.
+
+    Each job is a spawn_job handle, optionally with "kill": True to stop it.
+    Returns one dict per job: done, exit_code, duration_seconds (when done),
+    alive, killed and log_tail.
+    """
+    script = fill_script(POLL_SCRIPT, JOBS=jobs, TAIL_BYTES=tail_bytes)
+    return run_python(machine, script, timeout=timeout)
+
+
+def close_master(machine: dict):
+    """Shut down the shared connection to a machine, if one is open."""
+    if is_local(machine):
+        return
+    subprocess.run(ssh_command(machine, "-O", "exit"), capture_output=True, timeout=CONNECT_TIMEOUT)
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    if len(sys.argv) < 2:
+        print("Usage: remote_exec.py [user@]host [--close]")
+        sys.exit(1)
+
+    user, _, host = sys.argv[1].rpartition("@")
+    machine = {"host": host, "ssh_user": user or None}
+    if "--close" in sys.argv:
+        close_master(machine)
+        log.info(f"Closed master connection to {host}")
+        return
+
+    ok, info = probe(machine)
+    print(json.dumps(info, indent=2))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -15,12 +15,18 @@ Output:
   - Research notes in ~/.openclaw/workspace/second-brain/research/
   - High-value leads pushed to FlashFlow pipeline
 
+All subreddit x sort listings are fetched concurrently over one pooled
+client. Pacing comes from Reddit's X-Ratelimit-Remaining/Reset headers
+(with a token bucket as a floor), not fixed sleeps, and listings that
+answer 304 to If-None-Match/If-Modified-Since are skipped.
+
 Usage:
   python research-scanner.py              # Scan all sources once
   python research-scanner.py --daemon     # Scan every 4 hours
   python research-scanner.py --subreddit tiktokshop  # Scan specific sub
 """
 
+import asyncio
 import json
 import logging
 import re
@@ -31,10 +37,16 @@ from pathlib import Path
 
 import httpx
 
+from flashflow_api import AsyncTokenBucket
+from keyword_matcher import KeywordMatcher
+from seen_store import SeenStore
+from state_store import StateStore
+
 # --- Configuration ---
 
 CONFIG_PATH = Path(__file__).parent / "research-scanner-config.json"
 STATE_PATH = Path(__file__).parent / ".research-scanner-state.json"
+SEEN_PATH = Path(__file__).parent / ".research-scanner-seen.sqlite3"
 LOG_DIR = Path.home() / ".openclaw" / "workspace" / "second-brain" / "journals"
 RESEARCH_DIR = Path.home() / ".openclaw" / "workspace" / "second-brain" / "research"
 
@@ -91,6 +103,9 @@ PRODUCT_URL_RE = re.compile(r"https?://\S+(?:product|shop|item|listing)\S*", re.
 # --- Reddit API (no auth, public JSON) ---
 
 REDDIT_USER_AGENT = "FlashFlow-ResearchBot/1.0 (research scanner)"
+LISTING_SORTS = ["hot", "new"]
+# Requests kept in hand when Reddit reports the window is nearly spent
+RATELIMIT_RESERVE = 2
 
 
 def load_config() -> dict:
@@ -104,65 +119,164 @@ def load_config() -> dict:
         "scan_interval_hours": 4,
         "posts_per_subreddit": 25,
         "min_upvotes": 5,
+        "seen_retention_days": 90,
+        "fetch_concurrency": 4,
+        "reddit_requests_per_minute": 30,
     }
 
 
+STATE_STORE = StateStore(STATE_PATH)
+
+
 def load_state() -> dict:
-    if STATE_PATH.exists():
-        with open(STATE_PATH) as f:
-            return json.load(f)
-    return {"seen_post_ids": [], "last_scan": {}}
+    return STATE_STORE.load() or {"last_scan": {}}
 
 
 def save_state(state: dict):
-    with open(STATE_PATH, "w") as f:
-        json.dump(state, f, indent=2)
+    STATE_STORE.save(state)
+
+
+class RedditRateLimiter:
+    """Shared limiter driven by Reddit's X-Ratelimit-* headers.
+
+    Every response updates how many requests are left in the current
+    window and when it resets. Once the remainder drops to the reserve,
+    callers wait for the reset instead of sleeping a fixed time. A token
+    bucket caps the steady rate for when the headers are missing.
+    """
+
+    def __init__(self, requests_per_minute: float, concurrency: int):
+        self.bucket = AsyncTokenBucket(requests_per_minute / 60, capacity=concurrency)
+        self.slots = asyncio.Semaphore(concurrency)
+        self.remaining: float | None = None
+        self.reset_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        await self.slots.acquire()
+        async with self._lock:
+            if self.remaining is not None and self.remaining <= RATELIMIT_RESERVE:
+                wait = self.reset_at - time.monotonic()
+                if wait > 0:
+                    log.info(f"Reddit rate limit nearly spent — waiting {wait:.0f}s for reset")
+                    await asyncio.sleep(wait)
+                self.remaining = None
+            elif self.remaining is not None:
+                self.remaining -= 1
+        await self.bucket.acquire()
+
+    def release(self, headers: httpx.Headers | None = None):
+        if headers is not None:
+            try:
+                if "x-ratelimit-remaining" in headers:
+                    self.remaining = float(headers["x-ratelimit-remaining"])
+                if "x-ratelimit-reset" in headers:
+                    self.reset_at = time.monotonic() + float(headers["x-ratelimit-reset"])
+            except ValueError:
+                pass
+        self.slots.release()
 
 
-def fetch_subreddit_posts(subreddit: str, sort: str = "hot", limit: int = 25) -> list[dict]:
-    """Fetch posts from a subreddit using public JSON API."""
+def parse_listing(data: dict, subreddit: str) -> list[dict]:
+    """Flatten a Reddit listing JSON into our post dicts."""
+    posts = []
+    for child in data.get("data", {}).get("children", []):
+        post = child.get("data", {})
+        posts.append({
+            "id": post.get("id", ""),
+            "title": post.get("title", ""),
+            "selftext": post.get("selftext", ""),
+            "url": post.get("url", ""),
+            "permalink": f"https://reddit.com{post.get('permalink', '')}",
+            "score": post.get("score", 0),
+            "num_comments": post.get("num_comments", 0),
+            "created_utc": post.get("created_utc", 0),
+            "author": post.get("author", ""),
+            "subreddit": subreddit,
+            "link_flair_text": post.get("link_flair_text", ""),
+        })
+    return posts
+
+
+async def fetch_subreddit_posts(client: httpx.AsyncClient, limiter: RedditRateLimiter, subreddit: str,
+                                sort: str, limit: int, validators: dict) -> list[dict]:
+    """Fetch one listing. Returns [] if it failed or hasn't changed since the last scan.
+
+    `validators` is this listing's {"etag", "last_modified"} from state and
+    is updated in place from the response.
+    """
     url = f"https://www.reddit.com/r/{subreddit}/{sort}.json"
-    headers = {"User-Agent": REDDIT_USER_AGENT}
-
-    try:
-        resp = httpx.get(url, headers=headers, params={"limit": limit}, timeout=15, follow_redirects=True)
-        if resp.status_code != 200:
-            log.warning(f"Reddit returned {resp.status_code} for r/{subreddit}")
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+
+    for attempt in range(2):
+        await limiter.acquire()
+        resp = None
+        try:
+            resp = await client.get(url, headers=headers, params={"limit": limit})
+        except Exception as e:
+            log.error(f"Error fetching r/{subreddit}/{sort}: {e}")
             return []
+        finally:
+            limiter.release(resp.headers if resp is not None else None)
 
-        data = resp.json()
-        posts = []
-        for child in data.get("data", {}).get("children", []):
-            post = child.get("data", {})
-            posts.append({
-                "id": post.get("id", ""),
-                "title": post.get("title", ""),
-                "selftext": post.get("selftext", ""),
-                "url": post.get("url", ""),
-                "permalink": f"https://reddit.com{post.get('permalink', '')}",
-                "score": post.get("score", 0),
-                "num_comments": post.get("num_comments", 0),
-                "created_utc": post.get("created_utc", 0),
-                "author": post.get("author", ""),
-                "subreddit": subreddit,
-                "link_flair_text": post.get("link_flair_text", ""),
-            })
-        return posts
+        if resp.status_code == 429 and attempt == 0:
+            # The limiter now knows the reset time from this response's headers
+            limiter.remaining = 0
+            continue
+        break
 
-    except Exception as e:
-        log.error(f"Error fetching r/{subreddit}: {e}")
+    if resp.status_code == 304:
+        log.info(f"r/{subreddit}/{sort}: unchanged since last scan")
+        return []
+    if resp.status_code != 200:
+        log.warning(f"Reddit returned {resp.status_code} for r/{subreddit}/{sort}")
+        return []
+
+    validators["etag"] = resp.headers.get("etag")
+    validators["last_modified"] = resp.headers.get("last-modified")
+    try:
+        return parse_listing(resp.json(), subreddit)
+    except ValueError as e:
+        log.error(f"Bad JSON from r/{subreddit}/{sort}: {e}")
         return []
 
 
-def score_relevance(post: dict, keywords: list[str]) -> int:
+async def fetch_all_listings(config: dict, subreddits: list[dict], state: dict) -> dict[str, list[dict]]:
+    """Fetch every subreddit x sort listing concurrently. Returns {subreddit name: posts}."""
+    limit = config.get("posts_per_subreddit", 25)
+    concurrency = config.get("fetch_concurrency", 4)
+    limiter = RedditRateLimiter(config.get("reddit_requests_per_minute", 30), concurrency)
+    all_validators = state.setdefault("listing_validators", {})
+
+    jobs = [(sub["name"], sort) for sub in subreddits for sort in LISTING_SORTS]
+    async with httpx.AsyncClient(
+        headers={"User-Agent": REDDIT_USER_AGENT},
+        timeout=15,
+        follow_redirects=True,
+        limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+    ) as client:
+        results = await asyncio.gather(*(
+            fetch_subreddit_posts(client, limiter, name, sort, limit, all_validators.setdefault(f"{name}/{sort}", {}))
+            for name, sort in jobs
+        ))
+
+    listings: dict[str, list[dict]] = {}
+    for (name, _), posts in zip(jobs, results):
+        listings.setdefault(name, []).extend(posts)
+    return listings
+
+
+def score_relevance(post: dict, matcher: KeywordMatcher) -> int:
     """Score a post's relevance to our content strategy."""
     score = 0
     text = f"{post['title']} {post['selftext']}".lower()
 
     # Keyword matches
-    for kw in keywords:
-        if kw.lower() in text:
-            score += 10
+    score += 10 * len(matcher.keywords(text))
 
     # High engagement
     if post["score"] >= 100:
@@ -293,25 +407,15 @@ def push_lead_to_flashflow(config: dict, post: dict) -> bool:
         return False
 
 
-def scan_subreddit(config: dict, sub_config: dict, state: dict) -> list[dict]:
-    """Scan a single subreddit and return relevant posts."""
+def scan_subreddit(config: dict, sub_config: dict, posts: list[dict], seen: SeenStore) -> list[dict]:
+    """Score a subreddit's fetched hot + new posts and return the relevant ones."""
     name = sub_config["name"]
-    keywords = sub_config.get("keywords", [])
+    matcher = KeywordMatcher({"keywords": sub_config.get("keywords", [])})
     category = sub_config.get("category", "general")
     min_upvotes = config.get("min_upvotes", 5)
-    limit = config.get("posts_per_subreddit", 25)
-
-    seen_ids = set(state.get("seen_post_ids", []))
 
     log.info(f"Scanning r/{name} ({category})...")
 
-    # Fetch hot and new posts
-    posts = []
-    for sort in ["hot", "new"]:
-        fetched = fetch_subreddit_posts(name, sort=sort, limit=limit)
-        posts.extend(fetched)
-        time.sleep(1)  # Rate limit
-
     # Deduplicate
     unique_posts = {}
     for p in posts:
@@ -322,16 +426,15 @@ def scan_subreddit(config: dict, sub_config: dict, state: dict) -> list[dict]:
     # Filter and score
     relevant = []
     for post in posts:
-        if post["id"] in seen_ids:
+        if post["id"] in seen:
             continue
         if post["score"] < min_upvotes:
             continue
 
-        relevance = score_relevance(post, keywords)
+        relevance = score_relevance(post, matcher)
         if relevance >= 15:  # Minimum relevance threshold
             post["relevance_score"] = relevance
             relevant.append(post)
-            seen_ids.add(post["id"])
 
     # Sort by relevance
     relevant.sort(key=lambda p: p["relevance_score"], reverse=True)
@@ -347,6 +450,8 @@ def scan_subreddit(config: dict, sub_config: dict, state: dict) -> list[dict]:
 def run_scan(config: dict, target_subreddit: str | None = None):
     """Run a full scan of all configured subreddits."""
     state = load_state()
+    seen = SeenStore(SEEN_PATH)
+    seen.import_ids(state.pop("seen_post_ids", []))
     subreddits = config.get("subreddits", DEFAULT_SUBREDDITS)
 
     if target_subreddit:
@@ -355,12 +460,15 @@ def run_scan(config: dict, target_subreddit: str | None = None):
             log.error(f"Subreddit '{target_subreddit}' not found in config")
             return
 
+    log.info(f"Fetching {len(subreddits) * len(LISTING_SORTS)} listings...")
+    listings = asyncio.run(fetch_all_listings(config, subreddits, state))
+
     all_relevant = {}
     pipeline_leads = 0
 
     for sub_config in subreddits:
         category = sub_config.get("category", "general")
-        relevant = scan_subreddit(config, sub_config, state)
+        relevant = scan_subreddit(config, sub_config, listings.get(sub_config["name"], []), seen)
 
         if category not in all_relevant:
             all_relevant[category] = []
@@ -372,19 +480,19 @@ def run_scan(config: dict, target_subreddit: str | None = None):
                 if push_lead_to_flashflow(config, post):
                     pipeline_leads += 1
 
-        time.sleep(2)  # Rate limit between subreddits
-
     # Save research notes grouped by category
     for category, posts in all_relevant.items():
         save_research_note(category, posts)
 
     # Update state
-    # Keep last 10000 seen IDs to prevent unbounded growth
-    existing = state.get("seen_post_ids", [])
-    new_ids = []
     for posts in all_relevant.values():
-        new_ids.extend(p["id"] for p in posts)
-    state["seen_post_ids"] = (existing + new_ids)[-10000:]
+        seen.add_many(p["id"] for p in posts)
+    # Reddit listings only surface recent posts, so old IDs can go
+    expired = seen.expire(max_age_days=config.get("seen_retention_days", 90))
+    if expired:
+        log.info(f"Expired {expired} seen post IDs")
+    seen.close()
+
     state["last_scan"] = {
         "timestamp": datetime.utcnow().isoformat(),
         "total_relevant": sum(len(p) for p in all_relevant.values()),
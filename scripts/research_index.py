@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+FlashFlow Research Note Index
+
+Incremental SQLite index of the second-brain research notes written by
+research-scanner and discord-monitor. Notes are re-read only when their
+mtime/size changes and their content hash differs, so a sync over months
+of notes costs one stat() per file. Product mentions are stored with
+their source note and date, with an FTS5 table for keyword queries.
+
+Usage:
+  from research_index import ResearchIndex
+
+  index = ResearchIndex()
+  index.sync(RESEARCH_DIR)
+  for m in index.product_mentions(days=14):
+      print(m["name"], m["mentions"], m["sources"])
+
+  python research_index.py                  # Sync and show index stats
+  python research_index.py --search collagen
+  python research_index.py --rebuild        # Drop and re-index every note
+"""
+
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from keyword_matcher import KeywordMatcher
+
+# --- Configuration ---
+
+INDEX_PATH = Path(os.environ.get("FLASHFLOW_RESEARCH_INDEX_PATH", Path(__file__).parent / ".research-index.sqlite3"))
+RESEARCH_DIR = Path.home() / ".openclaw" / "workspace" / "second-brain" / "research"
+
+# Lines in research notes that look like product mentions
+MENTION_MATCHER = KeywordMatcher({"product": ["product", "trending", "viral", "best seller", "commission"]})
+MARKDOWN_RE = re.compile(r"[*#\[\]`]")
+URL_RE = re.compile(r"\(?https?://\S+\)?")
+NON_WORD_RE = re.compile(r"[^a-z0-9]+")
+NOTE_DATE_RE = re.compile(r"^(\d{4}-\d{2}-\d{2})")
+
+log = logging.getLogger("research-index")
+
+
+def normalize_name(name: str) -> str:
+    """Dedup key for a mention: lowercase words with URLs and punctuation removed."""
+    return NON_WORD_RE.sub(" ", URL_RE.sub(" ", name.lower())).strip()
+
+
+def extract_mentions(text: str) -> list[tuple[int, str]]:
+    """(line number, cleaned line) for every line that reads like a product mention."""
+    mentions = []
+    for line_no, line in enumerate(text.split("\n"), 1):
+        if not MENTION_MATCHER.search(line):
+            continue
+        clean = MARKDOWN_RE.sub("", line).strip()
+        if 10 < len(clean) < 200:
+            mentions.append((line_no, clean[:80]))
+    return mentions
+
+
+def note_date(path: Path, mtime: float) -> str:
+    """Date from the note's YYYY-MM-DD filename prefix, else its mtime."""
+    match = NOTE_DATE_RE.match(path.name)
+    if match:
+        return match.group(1)
+    return datetime.fromtimestamp(mtime).strftime("%Y-%m-%d")
+
+
+class ResearchIndex:
+    """SQLite index of research notes and the product mentions in them."""
+
+    def __init__(self, path: Path = INDEX_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS notes (
+                path TEXT PRIMARY KEY,
+                mtime REAL NOT NULL,
+                size INTEGER NOT NULL,
+                sha256 TEXT NOT NULL,
+                note_date TEXT NOT NULL,
+                indexed_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS mentions (
+                id INTEGER PRIMARY KEY,
+                path TEXT NOT NULL,
+                line_no INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                name_key TEXT NOT NULL,
+                note_date TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS mentions_path ON mentions (path);
+            CREATE INDEX IF NOT EXISTS mentions_date ON mentions (note_date, name_key);
+            CREATE VIRTUAL TABLE IF NOT EXISTS mentions_fts USING fts5(
+                name, content='mentions', content_rowid='id'
+            );
+            CREATE TRIGGER IF NOT EXISTS mentions_ai AFTER INSERT ON mentions BEGIN
+                INSERT INTO mentions_fts(rowid, name) VALUES (new.id, new.name);
+            END;
+            CREATE TRIGGER IF NOT EXISTS mentions_ad AFTER DELETE ON mentions BEGIN
+                INSERT INTO mentions_fts(mentions_fts, rowid, name) VALUES ('delete', old.id, old.name);
+            END;
+            """
+        )
+
+    def sync(self, research_dir: Path = RESEARCH_DIR) -> dict:
+        """Index new and changed notes, drop deleted ones. Returns counts."""
+        counts = {"scanned": 0, "indexed": 0, "unchanged": 0, "removed": 0}
+        known = {
+            row["path"]: (row["mtime"], row["size"], row["sha256"])
+            for row in self._db.execute("SELECT path, mtime, size, sha256 FROM notes")
+        }
+
+        on_disk = set()
+        if research_dir.exists():
+            for entry in os.scandir(research_dir):
+                if not entry.name.endswith(".md") or not entry.is_file():
+                    continue
+                counts["scanned"] += 1
+                on_disk.add(entry.path)
+                stat = entry.stat()
+                previous = known.get(entry.path)
+                if previous and previous[0] == stat.st_mtime and previous[1] == stat.st_size:
+                    counts["unchanged"] += 1
+                    continue
+                if self._index_note(Path(entry.path), stat, previous[2] if previous else None):
+                    counts["indexed"] += 1
+                else:
+                    counts["unchanged"] += 1
+
+        gone = [path for path in known if path not in on_disk]
+        if gone:
+            self._db.execute("BEGIN")
+            for path in gone:
+                self._db.execute("DELETE FROM mentions WHERE path = ?", (path,))
+                self._db.execute("DELETE FROM notes WHERE path = ?", (path,))
+            self._db.execute("COMMIT")
+            counts["removed"] = len(gone)
+
+        return counts
+
+    def _index_note(self, path: Path, stat: os.stat_result, previous_hash: str | None) -> bool:
+        """(Re)index one note. Returns False if only its mtime changed."""
+        raw = path.read_bytes()
+        digest = hashlib.sha256(raw).hexdigest()
+        date = note_date(path, stat.st_mtime)
+
+        self._db.execute("BEGIN")
+        try:
+            if digest == previous_hash:
+                self._db.execute(
+                    "UPDATE notes SET mtime = ?, size = ? WHERE path = ?",
+                    (stat.st_mtime, stat.st_size, str(path)),
+                )
+                self._db.execute("COMMIT")
+                return False
+
+            self._db.execute("DELETE FROM mentions WHERE path = ?", (str(path),))
+            self._db.execute(
+                "INSERT OR REPLACE INTO notes (path, mtime, size, sha256, note_date, indexed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (str(path), stat.st_mtime, stat.st_size, digest, date, time.time()),
+            )
+            self._db.executemany(
+                "INSERT INTO mentions (path, line_no, name, name_key, note_date) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (str(path), line_no, name, normalize_name(name), date)
+                    for line_no, name in extract_mentions(raw.decode("utf-8", errors="replace"))
+                ],
+            )
+            self._db.execute("COMMIT")
+        except Exception:
+            self._db.execute("ROLLBACK")
+            raise
+        return True
+
+    def product_mentions(self, days: int = 14, match: str | None = None, limit: int | None = None) -> list[dict]:
+        """Mentions from the last `days` days, one row per normalized name.
+
+        `match` is an FTS5 query (e.g. "collagen OR turmeric") on the mention text.
+        """
+        since = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+        where = "m.note_date >= ?"
+        params: list = [since]
+        if match:
+            where += " AND m.id IN (SELECT rowid FROM mentions_fts WHERE mentions_fts MATCH ?)"
+            params.append(match)
+        sql = (
+            "SELECT m.name_key, MAX(m.name) AS name, COUNT(*) AS mentions, "
+            "MAX(m.note_date) AS last_seen, GROUP_CONCAT(DISTINCT n.path) AS sources "
+            f"FROM mentions m JOIN notes n ON n.path = m.path WHERE {where} AND m.name_key != '' "
+            "GROUP BY m.name_key ORDER BY mentions DESC, last_seen DESC"
+        )
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        return [
+            {
+                "name": row["name"],
+                "name_key": row["name_key"],
+                "mentions": row["mentions"],
+                "last_seen": row["last_seen"],
+                "sources": [Path(p).name for p in row["sources"].split(",")],
+            }
+            for row in self._db.execute(sql, params)
+        ]
+
+    def stats(self) -> dict:
+        notes = self._db.execute("SELECT COUNT(*) FROM notes").fetchone()[0]
+        mentions = self._db.execute("SELECT COUNT(*) FROM mentions").fetchone()[0]
+        distinct = self._db.execute("SELECT COUNT(DISTINCT name_key) FROM mentions").fetchone()[0]
+        return {"notes": notes, "mentions": mentions, "distinct_mentions": distinct}
+
+    def rebuild(self):
+        self._db.execute("DELETE FROM mentions")
+        self._db.execute("DELETE FROM notes")
+        self._db.execute("INSERT INTO mentions_fts(mentions_fts) VALUES ('rebuild')")
+
+    def close(self):
+        self._db.close()
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    index = ResearchIndex()
+    if "--rebuild" in sys.argv:
+        index.rebuild()
+
+    start = time.perf_counter()
+    counts = index.sync(RESEARCH_DIR)
+    elapsed = time.perf_counter() - start
+    log.info(f"Synced {RESEARCH_DIR} in {elapsed:.2f}s: {counts}")
+
+    if "--search" in sys.argv:
+        idx = sys.argv.index("--search")
+        if idx + 1 < len(sys.argv):
+            for m in index.product_mentions(days=365, match=sys.argv[idx + 1], limit=20):
+                print(f"  {m['mentions']:>3d}x  {m['last_seen']}  {m['name']}")
+            return
+
+    stats = index.stats()
+    print(f"\n=== Research Index ({index.path}) ===\n")
+    print(f"  Notes:             {stats['notes']}")
+    print(f"  Mentions:          {stats['mentions']}")
+    print(f"  Distinct mentions: {stats['distinct_mentions']}\n")
+
+
+if __name__ == "__main__":
+    main()
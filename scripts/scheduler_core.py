@@ -0,0 +1,1038 @@
+#!/usr/bin/env python3
+"""
+FlashFlow Scheduler Core
+
+The one scheduling engine behind cron-manager and orchestrator. Both used
+to decide on their own when to run tiktok-scraper, research-scanner and
+drive-watcher, each with its own state file and loop, so the same scrape
+could run twice at once. This module owns:
+
+  - SCHEDULE: every task, when it runs and, for scripts, the machine
+    capabilities it needs, its priority and timeout
+  - A heap of next-fire times from interval or cron-expression schedules;
+    the daemon sleeps until the earliest one and runs due tasks
+    concurrently, with per-task overlap and catch-up policies
+  - An asyncio event loop beside the scheduling thread: builtin handlers
+    are coroutines that issue their HTTP requests concurrently, and SSH
+    dispatch and job polling happen there too, so the scheduling thread
+    never waits on a slow machine or endpoint
+  - Per-task mutual exclusion: a task never starts while a previous run
+    is still going, whichever front-end started it
+  - One state store (.scheduler-state.json plus its journal, see
+    state_store.py) shared by both CLIs, only changed under a file lock,
+    with task history capped at task_history_limit runs per list
+  - Machine health, load-aware placement and detached job tracking
+
+Both cron-manager.py and orchestrator.py are thin front-ends over this.
+
+Usage:
+  from scheduler_core import Scheduler
+
+  scheduler = Scheduler()
+  scheduler.run_pending()                 # Start due tasks, collect finished ones
+  scheduler.run_pending(["tiktok-scraper"], force=True)
+  scheduler.run_forever()                 # Daemon loop
+"""
+
+import asyncio
+import copy
+import fcntl
+import heapq
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+import httpx
+
+from cron_expr import CronExpr
+from remote_exec import is_local, machine_python, poll_jobs, probe, spawn_job
+from state_store import StateStore
+
+# --- Configuration ---
+
+SCRIPTS_DIR = Path(__file__).parent
+ORCHESTRATOR_CONFIG_PATH = SCRIPTS_DIR / "orchestrator-config.json"
+CRON_CONFIG_PATH = SCRIPTS_DIR / "cron-manager-config.json"
+STATE_PATH = SCRIPTS_DIR / ".scheduler-state.json"
+LOCK_PATH = SCRIPTS_DIR / ".scheduler.lock"
+LEGACY_CRON_STATE_PATH = SCRIPTS_DIR / ".cron-manager-state.json"
+LEGACY_ORCHESTRATOR_STATE_PATH = SCRIPTS_DIR / ".orchestrator-state.json"
+LOG_DIR = Path.home() / ".openclaw" / "workspace" / "second-brain" / "journals"
+
+ET = ZoneInfo("America/New_York")
+
+DEFAULT_CONFIG = {
+    "machines": {
+        "mac-mini": {
+            "host": "localhost",
+            "role": "primary",
+            "ssh_user": None,
+            "capabilities": ["api", "ai-generation", "orchestration", "cron"],
+            "scripts_dir": str(SCRIPTS_DIR),
+            "slots": 2,
+        },
+        "hp-worker": {
+            "host": "HP_WORKER_IP",
+            "role": "worker",
+            "ssh_user": "Brandon",
+            "ssh_key": "~/.ssh/id_ed25519_new",
+            "capabilities": ["scraping", "research", "video-processing"],
+            "scripts_dir": "C:\\FlashFlow\\scripts",
+            "slots": 2,
+            "python": "C:\\FlashFlow\\.venv\\Scripts\\python.exe",
+        },
+    },
+    "flashflow_api_url": "https://web-pied-delta-30.vercel.app/api",
+    "flashflow_api_key": "",
+    "health_timeout_seconds": 30,
+    "task_poll_seconds": 30,
+}
+
+# Placement: concurrent task slots per machine (override with "slots" per machine)
+DEFAULT_SLOTS = 2
+# Machines at or above this CPU take no new tasks
+MAX_CPU_PERCENT = 90
+# Assumed CPU/memory when a machine can't report them (no psutil)
+UNKNOWN_LOAD_PERCENT = 50
+# Task priorities run from 1 (most urgent) to this
+LOWEST_PRIORITY = 5
+PRIMARY_BIAS = 0.2
+# Where remote jobs write their logs, unless a machine sets logs_dir
+REMOTE_LOGS_DIR = "C:\\FlashFlow\\logs"
+# How often running tasks are polled while any are in flight
+TASK_POLL_SECONDS = 30
+# Per-machine probe deadline; override with health_timeout_seconds (global or per machine)
+HEALTH_TIMEOUT_SECONDS = 30
+# Windows scheduled tasks reported by the health probe on worker machines
+DEFAULT_SCHEDULED_TASKS = ["FlashFlow-TikTokScraper"]
+
+# Builtin tasks running at once in the scheduler process
+SCHEDULER_WORKERS = 4
+DEFAULT_OVERLAP = "skip"
+DEFAULT_CATCH_UP = "once"
+# A fire time missed by less than this still runs under catch_up "none"
+MISFIRE_GRACE_SECONDS = 300
+# Finished runs kept in completed_tasks and in failed_tasks
+TASK_HISTORY_LIMIT = 200
+
+# Orchestrator task type names from before the schedules were merged
+LEGACY_TASK_NAMES = {
+    "tiktok-scrape": "tiktok-scraper",
+    "research-scan": "research-scanner",
+    "drive-watch": "drive-watcher",
+    "discord-monitor": "discord-monitor",
+}
+
+log = logging.getLogger("scheduler")
+
+
+# --- Schedule Definition ---
+#
+# Timing: "interval_minutes", or "cron" (5-field expression in ET, see cron_expr.py).
+# The older "schedule": "daily"/"weekday" + "time_et" form is still accepted.
+#
+# "overlap" — when a run is due while the previous one is still going:
+#   skip     drop this run, wait for the next fire time (default)
+#   queue    start as soon as the previous run finishes
+#   replace  kill the previous run and start fresh (script tasks only)
+#
+# "catch_up" — when fire times were missed (scheduler down, machine full):
+#   once     run once now, then resume the normal cadence (default)
+#   all      run once for every missed fire time, back to back
+#   none     skip missed runs unless they are under misfire_grace_seconds late
+
+SCHEDULE = [
+    {
+        "name": "drive-watcher",
+        "script": "drive-watcher.py",
+        "interval_minutes": 30,
+        "requires": ["api"],
+        "priority": 3,
+        "timeout_minutes": 10,
+        "description": "Scan Google Drive for new video uploads",
+    },
+    {
+        "name": "health-check",
+        "type": "builtin",
+        "handler": "health_check",
+        "interval_minutes": 5,
+        "description": "Check all systems health",
+    },
+    {
+        "name": "tiktok-scraper",
+        "script": "tiktok-scraper.py",
+        "interval_minutes": 360,  # 6 hours
+        "requires": ["scraping"],
+        "priority": 2,
+        "timeout_minutes": 30,
+        "description": "Scrape TikTok video stats",
+    },
+    {
+        "name": "research-scanner",
+        "script": "research-scanner.py",
+        "interval_minutes": 240,  # 4 hours
+        "requires": ["research"],
+        "priority": 3,
+        "timeout_minutes": 20,
+        "description": "Scan Reddit for trending products",
+    },
+    {
+        "name": "discord-monitor",
+        "script": "discord-monitor.py",
+        "interval_minutes": 15,
+        "requires": ["api"],
+        "priority": 4,
+        "timeout_minutes": 15,
+        "overlap": "replace",
+        "description": "Scan Discord channels for trends and insights",
+    },
+    {
+        "name": "winner-detection",
+        "type": "builtin",
+        "handler": "detect_winners",
+        "cron": "0 22 * * *",  # 10 PM ET daily
+        "description": "Auto-detect winning videos",
+    },
+    {
+        "name": "pipeline-check-morning",
+        "type": "builtin",
+        "handler": "pipeline_check",
+        "cron": "0 9 * * mon-fri",
+        "catch_up": "none",
+        "description": "Morning pipeline bottleneck check",
+    },
+    {
+        "name": "pipeline-check-afternoon",
+        "type": "builtin",
+        "handler": "pipeline_check",
+        "cron": "0 14 * * mon-fri",
+        "catch_up": "none",
+        "description": "Afternoon pipeline check",
+    },
+    {
+        "name": "pipeline-check-evening",
+        "type": "builtin",
+        "handler": "pipeline_check",
+        "cron": "0 18 * * mon-fri",
+        "catch_up": "none",
+        "description": "Evening pipeline summary",
+    },
+]
+
+
+def now_et() -> datetime:
+    return datetime.now(ET)
+
+
+def task_cron(task: dict) -> str | None:
+    """The task's cron expression, translating the older daily/weekday + time_et form."""
+    if task.get("cron"):
+        return task["cron"]
+    if task.get("schedule") in ("daily", "weekday"):
+        hour, minute = map(int, task.get("time_et", "00:00").split(":"))
+        days = "mon-fri" if task["schedule"] == "weekday" else "*"
+        return f"{minute} {hour} * * {days}"
+    return None
+
+
+def _read_json(path: Path) -> dict | None:
+    if path.exists():
+        with open(path) as f:
+            return json.load(f)
+    return None
+
+
+def load_config() -> dict:
+    """orchestrator-config.json merged over cron-manager-config.json and the defaults.
+
+    Without a machines section, the worker comes from cron-manager's
+    remote_* settings.
+    """
+    cron = _read_json(CRON_CONFIG_PATH) or {}
+    orchestrator = _read_json(ORCHESTRATOR_CONFIG_PATH) or {}
+
+    config = {k: v for k, v in DEFAULT_CONFIG.items() if k != "machines"}
+    config.update(cron)
+    config.update(orchestrator)
+    if "machines" not in orchestrator:
+        machines = copy.deepcopy(DEFAULT_CONFIG["machines"])
+        if cron.get("remote_host"):
+            machines["hp-worker"].update(
+                host=cron["remote_host"],
+                ssh_user=cron.get("remote_user") or None,
+                ssh_key=cron.get("remote_ssh_key", ""),
+                scripts_dir=cron.get("remote_scripts_dir", machines["hp-worker"]["scripts_dir"]),
+                python=cron.get("remote_python", machines["hp-worker"]["python"]),
+            )
+        config["machines"] = machines
+    return config
+
+
+def empty_state() -> dict:
+    return {
+        "last_run": {},
+        "last_fire": {},
+        "run_counts": {},
+        "errors": {},
+        "machines": {},
+        "running_tasks": [],
+        "completed_tasks": [],
+        "failed_tasks": [],
+    }
+
+
+def import_legacy_state(state: dict):
+    """Fold the old per-CLI state files into a fresh shared state."""
+    cron = _read_json(LEGACY_CRON_STATE_PATH)
+    if cron:
+        for key in ("last_run", "run_counts", "errors"):
+            state[key].update(cron.get(key, {}))
+        log.info(f"Imported schedule history from {LEGACY_CRON_STATE_PATH.name}")
+
+    orchestrator = _read_json(LEGACY_ORCHESTRATOR_STATE_PATH)
+    if orchestrator:
+        state["machines"].update(orchestrator.get("machines", {}))
+        for key in ("completed_tasks", "failed_tasks"):
+            for task in orchestrator.get(key, []):
+                task.setdefault("name", LEGACY_TASK_NAMES.get(task.get("type"), task.get("type")))
+                state[key].append(task)
+        # Old running records have no job handle to follow up on
+        dropped = len(orchestrator.get("running_tasks", []))
+        log.info(f"Imported task history from {LEGACY_ORCHESTRATOR_STATE_PATH.name}"
+                 + (f" ({dropped} untracked running tasks dropped)" if dropped else ""))
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+# --- Machine health ---
+
+def health_record(name: str, machine: dict) -> dict:
+    return {
+        "name": name,
+        "host": machine["host"],
+        "role": machine["role"],
+        "status": "unknown",
+        "checked_at": datetime.utcnow().isoformat(),
+        "details": {},
+    }
+
+
+def check_machine_health(name: str, machine: dict, timeout: int = HEALTH_TIMEOUT_SECONDS) -> dict:
+    """Check health of a single machine (one batched probe, one round trip)."""
+    health = health_record(name, machine)
+
+    tasks = machine.get("scheduled_tasks", DEFAULT_SCHEDULED_TASKS)
+    if is_local(machine) or not machine.get("scripts_dir"):
+        tasks = []
+    success, details = probe(machine, scheduled_tasks=tasks, timeout=timeout)
+
+    if not success and not is_local(machine):
+        health["status"] = "offline"
+        health["details"] = {"reachable": False, "error": details.get("error", "")}
+        return health
+
+    health["status"] = "online"
+    health["details"] = details
+    health["details"]["reachable"] = True
+    if "disk_percent" in details:
+        health["details"]["disk_info"] = f"{details['disk_percent']}% used, {details.get('disk_free_gb')} GB free"
+    states = health["details"].pop("scheduled_tasks", {})
+    if tasks:
+        health["details"]["scheduled_tasks"] = (
+            "configured" if any(s in ("Ready", "Running") for s in states.values()) else "not_configured"
+        )
+        health["details"]["scheduled_task_states"] = states
+
+    return health
+
+
+async def check_api_health(config: dict) -> tuple[bool, str]:
+    """GET the FlashFlow API health endpoint."""
+    api_url = config.get("flashflow_api_url", "").rstrip("/")
+    try:
+        async with httpx.AsyncClient(timeout=10) as client:
+            resp = await client.get(f"{api_url}/observability/health")
+        if resp.status_code == 200:
+            return True, "healthy"
+        return False, f"returned {resp.status_code}"
+    except Exception as e:
+        return False, f"unreachable: {e}"
+
+
+async def check_all_health(config: dict, state: dict,
+                           include_api: bool = True) -> tuple[dict, tuple[bool, str] | None]:
+    """Probe every machine (and the API) concurrently.
+
+    Each machine gets its own deadline (`health_timeout_seconds`, per machine
+    or global), so the whole check takes as long as the slowest machine
+    instead of the sum of all of them. Results are merged into
+    state["machines"]; returns (health by machine name, API result or None).
+    """
+    machines = config.get("machines", {})
+    default_timeout = config.get("health_timeout_seconds", HEALTH_TIMEOUT_SECONDS)
+
+    async def check(name: str, machine: dict) -> dict:
+        timeout = machine.get("health_timeout_seconds", default_timeout)
+        try:
+            # The probe enforces its own timeout; this is a backstop
+            return await asyncio.wait_for(
+                asyncio.to_thread(check_machine_health, name, machine, timeout), timeout + 5
+            )
+        except Exception as e:
+            health = health_record(name, machine)
+            health["status"] = "offline"
+            health["details"] = {"reachable": False, "error": f"Health check failed: {e or 'timed out'}"}
+            return health
+
+    checks = [check(name, machine) for name, machine in machines.items()]
+    if include_api:
+        checks.append(check_api_health(config))
+    outcomes = await asyncio.gather(*checks)
+
+    results = dict(zip(machines, outcomes))
+    api_result = outcomes[-1] if include_api else None
+    state.setdefault("machines", {}).update(results)
+    return results, api_result
+
+
+# --- Placement ---
+
+def machine_load(config: dict, state: dict) -> dict[str, int]:
+    """Running tasks per configured machine."""
+    load = {name: 0 for name in config.get("machines", {})}
+    for task in state.get("running_tasks", []):
+        if task.get("machine") in load:
+            load[task["machine"]] += 1
+    return load
+
+
+def placement_score(machine: dict, health: dict, queued: int, priority: int) -> float:
+    """Lower is better. Combines slot occupancy, live CPU/memory and the task's priority.
+
+    Occupancy (queued / slots) spreads work across machines. Live load is
+    weighted up for high-priority tasks (priority 1 is highest) so urgent
+    work lands on the least busy machine, while low-priority work mostly
+    fills free slots. The primary machine gets a small bias to keep
+    headroom for the API and AI generation.
+    """
+    details = health.get("details", {})
+    cpu = details.get("cpu_percent", UNKNOWN_LOAD_PERCENT) / 100
+    mem = details.get("memory_percent", UNKNOWN_LOAD_PERCENT) / 100
+    slots = max(1, machine.get("slots", DEFAULT_SLOTS))
+    load_weight = 1 + (LOWEST_PRIORITY - min(priority, LOWEST_PRIORITY)) / LOWEST_PRIORITY
+    role_bias = PRIMARY_BIAS if machine.get("role") == "primary" else 0.0
+    return queued / slots + load_weight * (0.6 * cpu + 0.4 * mem) + role_bias
+
+
+def plan_placement(config: dict, state: dict, tasks: list[dict]) -> list[tuple[dict, str]]:
+    """Assign script tasks to machines. Returns [(task, machine name)] in dispatch order.
+
+    Tasks are placed highest priority first. Each goes to the best-scoring
+    online machine that has every capability it requires and a free slot
+    (running + already placed < slots, CPU under MAX_CPU_PERCENT). Tasks
+    that need a capability several machines share spill over to the next
+    best machine as soon as one fills up, so both stay busy. Tasks with
+    no free slot anywhere are left for the next pass.
+    """
+    machines = config.get("machines", {})
+    health = state.get("machines", {})
+    queued = machine_load(config, state)
+    placement = []
+
+    def capable(task: dict) -> int:
+        required = set(task.get("requires", []))
+        return sum(1 for m in machines.values() if required.issubset(m.get("capabilities", [])))
+
+    # Most urgent first; among equals, the task with the fewest eligible machines goes first
+    for task in sorted(tasks, key=lambda t: (t.get("priority", LOWEST_PRIORITY), capable(t))):
+        required = set(task.get("requires", []))
+        candidates = []
+        for name, machine in machines.items():
+            machine_health = health.get(name, {})
+            if not required.issubset(machine.get("capabilities", [])):
+                continue
+            if machine_health.get("status") == "offline":
+                continue
+            if queued[name] >= machine.get("slots", DEFAULT_SLOTS):
+                continue
+            if machine_health.get("details", {}).get("cpu_percent", 0) >= MAX_CPU_PERCENT:
+                continue
+            score = placement_score(machine, machine_health, queued[name], task.get("priority", LOWEST_PRIORITY))
+            candidates.append((score, name))
+
+        if not candidates:
+            log.info(f"No free slot for '{task['name']}' (needs {', '.join(sorted(required))}); queued")
+            continue
+        _, best = min(candidates)
+        queued[best] += 1
+        placement.append((task, best))
+
+    return placement
+
+
+def machine_logs_dir(machine: dict) -> str:
+    if machine.get("logs_dir"):
+        return machine["logs_dir"]
+    return str(LOG_DIR) if is_local(machine) else REMOTE_LOGS_DIR
+
+
+# --- Builtin task handlers ---
+#
+# async handler(config, updates) -> (ok, message). `updates` starts as {} and
+# is merged into the shared state after the run (health_check fills
+# "machines"). Handlers run on the scheduler's event loop alongside each
+# other, so they must not block it: use httpx.AsyncClient, gather
+# independent requests and push blocking calls through asyncio.to_thread.
+
+async def health_check(config: dict, updates: dict) -> tuple[bool, str]:
+    """Check every machine and the FlashFlow API."""
+    results, (api_ok, api_message) = await check_all_health(config, updates)
+    offline = [name for name, health in results.items() if health["status"] != "online"]
+    summary = f"API {api_message}; machines online {len(results) - len(offline)}/{len(results)}"
+    if offline:
+        summary += f" (offline: {', '.join(offline)})"
+    return api_ok and not offline, summary
+
+
+async def detect_winners(config: dict, updates: dict) -> tuple[bool, str]:
+    """Trigger batch winner detection."""
+    api_url = config.get("flashflow_api_url", "").rstrip("/")
+    api_key = config.get("flashflow_api_key", "")
+    try:
+        async with httpx.AsyncClient(headers={"Authorization": f"Bearer {api_key}"}, timeout=30) as client:
+            resp = await client.post(f"{api_url}/videos/detect-winners")
+        data = resp.json()
+        if data.get("ok"):
+            return True, f"Winners detected: {json.dumps(data.get('data', {}))[:200]}"
+        return False, f"Winner detection failed: {data}"
+    except Exception as e:
+        return False, f"Winner detection error: {e}"
+
+
+async def pipeline_check(config: dict, updates: dict) -> tuple[bool, str]:
+    """Check pipeline for stuck videos (queue summary and stuck list fetched concurrently)."""
+    api_url = config.get("flashflow_api_url", "").rstrip("/")
+    api_key = config.get("flashflow_api_key", "")
+    results = []
+
+    async with httpx.AsyncClient(headers={"Authorization": f"Bearer {api_key}"}, timeout=15) as client:
+        queue_resp, stuck_resp = await asyncio.gather(
+            client.get(f"{api_url}/observability/queue-summary"),
+            client.get(f"{api_url}/observability/stuck"),
+            return_exceptions=True,
+        )
+
+    try:
+        for resp in (queue_resp, stuck_resp):
+            if isinstance(resp, Exception):
+                raise resp
+
+        if queue_resp.status_code == 200:
+            data = queue_resp.json().get("data", {})
+            results.append(f"Queue: {json.dumps(data)[:150]}")
+
+        if stuck_resp.status_code == 200:
+            stuck = stuck_resp.json().get("data", [])
+            results.append(f"Stuck videos: {len(stuck)}")
+
+        return True, " | ".join(results)
+    except Exception as e:
+        return False, f"Pipeline check error: {e}"
+
+
+BUILTIN_HANDLERS = {
+    "health_check": health_check,
+    "detect_winners": detect_winners,
+    "pipeline_check": pipeline_check,
+}
+
+
+# --- Engine ---
+
+class Scheduler:
+    """Schedule, state and dispatch shared by cron-manager and orchestrator."""
+
+    def __init__(self, config: dict | None = None, schedule: list[dict] = SCHEDULE,
+                 state_path: Path = STATE_PATH, lock_path: Path = LOCK_PATH):
+        self.config = config if config is not None else load_config()
+        self.schedule = schedule
+        self.tasks = {task["name"]: task for task in schedule}
+        self.state_path = Path(state_path)
+        self.lock_path = Path(lock_path)
+        history = self.config.get("task_history_limit", TASK_HISTORY_LIMIT)
+        self.store = StateStore(self.state_path, history={"completed_tasks": history, "failed_tasks": history})
+        self.poll_seconds = self.config.get("task_poll_seconds", TASK_POLL_SECONDS)
+        self.grace = timedelta(seconds=self.config.get("misfire_grace_seconds", MISFIRE_GRACE_SECONDS))
+        self.owner = {"host": socket.gethostname(), "pid": os.getpid()}
+        # Parsed once; next_fire never re-parses schedule strings
+        self.crons = {task["name"]: CronExpr(task_cron(task)) for task in schedule if task_cron(task)}
+        self.builtin_slots = asyncio.Semaphore(self.config.get("scheduler_workers", SCHEDULER_WORKERS))
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_lock = threading.Lock()
+
+    def _event_loop(self) -> asyncio.AbstractEventLoop:
+        """The event loop that runs builtins and dispatch, started on first use in a daemon thread."""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="scheduler-loop", daemon=True).start()
+        return self._loop
+
+    def _submit(self, coro) -> Future:
+        return asyncio.run_coroutine_threadsafe(coro, self._event_loop())
+
+    # State
+
+    @staticmethod
+    def _with_defaults(stored: dict | None) -> dict:
+        state = empty_state()
+        if stored is None:
+            import_legacy_state(state)
+        else:
+            state.update(stored)
+        return state
+
+    def read_state(self) -> dict:
+        """Current state without taking the lock (for display)."""
+        return self._with_defaults(self.store.read())
+
+    def save_state(self, state: dict):
+        """Journal what changed; only call with the lock held (see locked_state)."""
+        self.store.save(state)
+
+    @contextmanager
+    def locked_state(self):
+        """Exclusive read-modify-write of the shared state across processes."""
+        with open(self.lock_path, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                state = self._with_defaults(self.store.load())
+                yield state
+                self.save_state(state)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    # Timing
+
+    def next_fire(self, task: dict, state: dict, now: datetime | None = None) -> datetime | None:
+        """When the task should next run (ET). In the past means due now.
+
+        Fire times follow on from the last fire time the task consumed
+        (last_fire), so runs missed while the scheduler was down show up as
+        a past fire time and are handled by the task's catch_up policy.
+        A task that has never run waits for its next cron time; interval
+        tasks start right away.
+        """
+        name = task["name"]
+        anchor = state.get("last_fire", {}).get(name) or state.get("last_run", {}).get(name)
+        anchor_dt = datetime.fromisoformat(anchor).astimezone(ET) if anchor else None
+
+        now = now or now_et()
+        expr = self.crons.get(name)
+        if expr:
+            return expr.next_after(anchor_dt or now)
+
+        if task.get("interval_minutes"):
+            if not anchor_dt:
+                return now
+            return anchor_dt + timedelta(minutes=task["interval_minutes"])
+
+        return None
+
+    def is_due(self, task: dict, state: dict, now: datetime | None = None) -> bool:
+        now = now or now_et()
+        fire = self.next_fire(task, state, now)
+        return fire is not None and fire <= now
+
+    def due_tasks(self, state: dict | None = None) -> list[dict]:
+        state = state if state is not None else self.read_state()
+        return [task for task in self.schedule if self.is_due(task, state)]
+
+    # Bookkeeping
+
+    def _finish(self, state: dict, record: dict, status: str, error: str | None = None):
+        """Move a run out of running_tasks into completed_tasks or failed_tasks."""
+        ended = datetime.utcnow()
+        record["status"] = status
+        record["ended_at"] = ended.isoformat()
+        record.setdefault(
+            "duration_seconds", round((ended - datetime.fromisoformat(record["started_at"])).total_seconds(), 1)
+        )
+        if error:
+            record["error"] = error
+        name = record["name"]
+        if status == "completed":
+            state["completed_tasks"].append(record)
+            state["errors"].pop(name, None)
+        else:
+            state["failed_tasks"].append(record)
+            if status != "replaced":
+                state["errors"][name] = state["errors"].get(name, 0) + 1
+
+    def _consume(self, state: dict, task: dict, fire: datetime, now: datetime):
+        """Advance the task past a fire time. catch_up "all" steps one fire time at a time."""
+        anchor = fire if task.get("catch_up", DEFAULT_CATCH_UP) == "all" else now
+        state["last_fire"][task["name"]] = anchor.isoformat()
+
+    def _mark_started(self, state: dict, task: dict, fire: datetime, now: datetime):
+        state["last_run"][task["name"]] = now.isoformat()
+        state["run_counts"][task["name"]] = state["run_counts"].get(task["name"], 0) + 1
+        self._consume(state, task, fire, now)
+
+    def _stop(self, state: dict, name: str) -> list[tuple[str, dict]]:
+        """Drop the running script run of a task (overlap "replace").
+
+        Returns the (machine, job) handles to kill; the kill itself happens
+        on the event loop, before the new run is spawned.
+        """
+        jobs = []
+        for record in [r for r in state["running_tasks"] if r["name"] == name and r.get("kind") == "script"]:
+            state["running_tasks"].remove(record)
+            self._finish(state, record, "replaced", "Replaced by a newer run")
+            if record.get("job"):
+                jobs.append((record["machine"], record["job"]))
+            log.info(f"Stopped running '{name}' on {record['machine']} to start a new run")
+        return jobs
+
+    @staticmethod
+    def _find_run(state: dict, record: dict) -> dict | None:
+        return next(
+            (r for r in state["running_tasks"]
+             if r["name"] == record["name"] and r["started_at"] == record["started_at"]),
+            None,
+        )
+
+    def collect_finished(self) -> int:
+        """Poll running tasks and move finished ones out. Returns how many finished.
+
+        Script jobs are polled in one round trip per machine (all machines
+        concurrently): exit code and duration once the job has written its
+        status file, else whether it is still alive, plus the tail of its
+        log. Timed-out jobs are killed. Polling works from a snapshot
+        without the state lock, so a slow machine never holds up other
+        front-ends; the results are then applied under the lock. Runs whose
+        scheduler process died before they finished (builtins, or scripts
+        still being spawned) are cleared. A task can start again as soon as
+        its run is collected here.
+        """
+        snapshot = self.read_state()["running_tasks"]
+        if not snapshot:
+            return 0
+        machines = self.config.get("machines", {})
+        now = datetime.utcnow()
+
+        def timed_out(record: dict) -> bool:
+            if not record.get("timeout_minutes"):
+                return False
+            started = datetime.fromisoformat(record["started_at"])
+            return now - started > timedelta(minutes=record["timeout_minutes"])
+
+        by_machine: dict[str, list[dict]] = {}
+        for record in snapshot:
+            if record.get("job") and record["machine"] in machines:
+                by_machine.setdefault(record["machine"], []).append(record)
+
+        polls: dict[tuple[str, str], dict] = {}
+        if by_machine:
+            with ThreadPoolExecutor(max_workers=len(by_machine)) as pool:
+                futures = {
+                    name: pool.submit(
+                        poll_jobs, machines[name], [dict(r["job"], kill=timed_out(r)) for r in records]
+                    )
+                    for name, records in by_machine.items()
+                }
+                for name, future in futures.items():
+                    success, results = future.result()
+                    if not success:
+                        log.warning(f"Could not poll tasks on {name}: {results.get('error')}")
+                        continue
+                    for record, result in zip(by_machine[name], results):
+                        polls[(record["name"], record["started_at"])] = result
+
+        with self.locked_state() as state:
+            running = state["running_tasks"]
+            still_running = []
+            for record in running:
+                label = f"'{record['name']}' on {record['machine']}"
+                if not record.get("job"):
+                    owner = record.get("owner", {})
+                    if owner.get("host") == self.owner["host"] and not _pid_alive(owner.get("pid", 0)):
+                        self._finish(state, record, "failed", "Scheduler exited mid-run")
+                        log.warning(f"Task {label} was abandoned by its scheduler process")
+                    elif record.get("kind") == "script" and timed_out(record):
+                        self._finish(state, record, "timeout", "Never started")
+                        log.warning(f"Task {label} timed out before it started")
+                    else:
+                        still_running.append(record)
+                    continue
+
+                result = polls.get((record["name"], record["started_at"]), {})
+                if result.get("log_tail") is not None:
+                    record["log_tail"] = result["log_tail"]
+
+                if result.get("done"):
+                    record["exit_code"] = result.get("exit_code")
+                    record["duration_seconds"] = result.get("duration_seconds")
+                    if record["exit_code"] == 0:
+                        self._finish(state, record, "completed")
+                        log.info(f"Task {label} completed in {record['duration_seconds']}s")
+                    else:
+                        self._finish(state, record, "failed", f"Exit code {record['exit_code']}")
+                        log.warning(f"Task {label} failed with exit code {record['exit_code']}")
+                elif timed_out(record):
+                    self._finish(state, record, "timeout")
+                    log.warning(f"Task {label} timed out" + (" and was killed" if result.get("killed") else ""))
+                elif result and not result.get("alive"):
+                    self._finish(state, record, "failed", "Process exited without reporting a status")
+                    log.warning(f"Task {label} disappeared")
+                else:
+                    still_running.append(record)
+
+            state["running_tasks"] = still_running
+            return len(running) - len(still_running)
+
+    def _claim_script(self, state: dict, task: dict, machine_name: str, fire: datetime, now: datetime) -> dict:
+        """Record a placed script run as starting; _start_script spawns it."""
+        record = {
+            "name": task["name"],
+            "kind": "script",
+            "machine": machine_name,
+            "owner": self.owner,
+            "started_at": datetime.utcnow().isoformat(),
+            "timeout_minutes": task.get("timeout_minutes", 30),
+            "status": "starting",
+        }
+        state["running_tasks"].append(record)
+        self._mark_started(state, task, fire, now)
+        return record
+
+    async def _kill_jobs(self, jobs: list[tuple[str, dict]]):
+        for machine_name, job in jobs:
+            machine = self.config.get("machines", {}).get(machine_name)
+            if machine:
+                await asyncio.to_thread(poll_jobs, machine, [dict(job, kill=True)])
+
+    async def _start_script(self, task: dict, record: dict, replaces: list[tuple[str, dict]]) -> bool:
+        """Spawn a claimed script run detached on its machine and record the job handle."""
+        await self._kill_jobs(replaces)
+
+        machine_name = record["machine"]
+        machine = self.config["machines"][machine_name]
+        name = task["name"]
+        log_dir = machine_logs_dir(machine)
+        sep = "\\" if "\\" in log_dir else "/"
+        log_path = f"{log_dir}{sep}{name}-latest.log"
+        status_path = f"{log_dir}{sep}{name}-latest.status.json"
+
+        log.info(f"Dispatching '{name}' to {machine_name} ({machine['host']})")
+        argv = [machine_python(machine), task["script"], *task.get("args", [])]
+        success, job = await asyncio.to_thread(
+            spawn_job, machine, argv, machine.get("scripts_dir", ""), log_path, status_path
+        )
+        orphaned = await asyncio.to_thread(self._record_start, record, success, job)
+        if orphaned:
+            await self._kill_jobs([(machine_name, job)])
+        return success
+
+    def _record_start(self, record: dict, success: bool, job: dict) -> bool:
+        """Attach a spawn result to its run. Returns True if the run was dropped meanwhile."""
+        label = f"'{record['name']}' on {record['machine']}"
+        with self.locked_state() as state:
+            current = self._find_run(state, record)
+            if current is None:
+                if success:
+                    log.warning(f"Run of {label} was cleared while starting; stopping it")
+                return success
+            if success:
+                current["job"] = job
+                current["status"] = "running"
+                log.info(f"  {label} started (pid {job['pid']})")
+            else:
+                state["running_tasks"].remove(current)
+                log.error(f"Failed to dispatch {label}: {job.get('error')}")
+                self._finish(state, current, "failed", job.get("error", ""))
+            return False
+
+    # Passes
+
+    def run_pending(self, names: list[str] | None = None, force: bool = False,
+                    wait: bool = True, collect: bool = True) -> int:
+        """One scheduling pass. Returns how many tasks were started.
+
+        Collects finished runs (collect=False leaves that to the daemon's
+        poller), then starts every due task (or just `names`; with
+        force=True, whether due or not), applying each task's catch_up and
+        overlap policies. Under the lock, runs are only recorded: script
+        tasks are placed on machines and marked as starting, builtins
+        marked as running, so no other front-end starts them too. The SSH
+        spawns and builtin handlers then run on the event loop; wait=False
+        returns without waiting for them.
+        """
+        if collect:
+            self.collect_finished()
+
+        launches = []
+        with self.locked_state() as state:
+            running = {record["name"] for record in state["running_tasks"]}
+            candidates = [self.tasks[n] for n in names if n in self.tasks] if names is not None else self.schedule
+            now = now_et()
+
+            scripts = {}
+            replaced: dict[str, list[tuple[str, dict]]] = {}
+            for task in candidates:
+                name = task["name"]
+                fire = now if force else self.next_fire(task, state, now)
+                if fire is None or fire > now:
+                    continue
+                if fire < now - self.grace and task.get("catch_up", DEFAULT_CATCH_UP) == "none":
+                    log.info(f"'{name}' missed its {fire:%Y-%m-%d %H:%M} run, skipping it (catch_up=none)")
+                    self._consume(state, task, fire, now)
+                    continue
+
+                if name in running:
+                    overlap = task.get("overlap", DEFAULT_OVERLAP)
+                    if overlap == "queue":
+                        log.info(f"'{name}' is still running; queued until it finishes")
+                        continue
+                    if overlap != "replace" or task.get("type") == "builtin":
+                        log.info(f"'{name}' is still running, skipping this run")
+                        self._consume(state, task, fire, now)
+                        continue
+                    replaced[name] = self._stop(state, name)
+
+                if task.get("type") == "builtin":
+                    record = {
+                        "name": name,
+                        "kind": "builtin",
+                        "machine": "scheduler",
+                        "owner": self.owner,
+                        "started_at": datetime.utcnow().isoformat(),
+                        "status": "running",
+                    }
+                    state["running_tasks"].append(record)
+                    self._mark_started(state, task, fire, now)
+                    launches.append((self._run_builtin, task, record))
+                else:
+                    scripts[name] = fire
+
+            # Unplaced tasks (no free slot) stay due and are retried on the next pass
+            for task, machine_name in plan_placement(self.config, state, [self.tasks[n] for n in scripts]):
+                record = self._claim_script(state, task, machine_name, scripts[task["name"]], now)
+                launches.append((self._start_script, task, record, replaced.pop(task["name"], [])))
+            for jobs in replaced.values():
+                launches.append((self._kill_jobs, jobs))
+
+        futures = [self._submit(func(*args)) for func, *args in launches]
+        if not wait:
+            return len(futures)
+        # Builtins return None; only a failed spawn counts as not started
+        return sum(1 for future in futures if future.result() is not False)
+
+    async def _run_builtin(self, task: dict, record: dict):
+        async with self.builtin_slots:
+            log.info(f"Running: {task['name']} — {task.get('description', '')}")
+            handler = BUILTIN_HANDLERS.get(task.get("handler", ""))
+            updates: dict = {}
+            if not handler:
+                success, output = False, f"Unknown handler: {task.get('handler')}"
+            else:
+                try:
+                    success, output = await handler(self.config, updates)
+                except Exception as e:
+                    success, output = False, f"{type(e).__name__}: {e}"
+
+        if success:
+            log.info(f"  OK: {output[:200]}")
+        else:
+            log.error(f"  FAIL: {output[:200]}")
+        await asyncio.to_thread(self._record_builtin, record, updates, success, output)
+
+    def _record_builtin(self, record: dict, updates: dict, success: bool, output: str):
+        with self.locked_state() as state:
+            for key, value in updates.items():
+                state.setdefault(key, {}).update(value)
+            current = self._find_run(state, record)
+            if current is not None:
+                state["running_tasks"].remove(current)
+            record["output"] = output[:500]
+            self._finish(state, record, "completed" if success else "failed", None if success else output[:500])
+
+    def check_health(self, include_api: bool = True) -> tuple[dict, tuple[bool, str] | None]:
+        """Probe machines (and the API) now and store the results."""
+        updates: dict = {}
+        results, api = asyncio.run(check_all_health(self.config, updates, include_api=include_api))
+        with self.locked_state() as state:
+            state["machines"].update(updates["machines"])
+        return results, api
+
+    async def _poll_running(self):
+        """Collect finished runs every poll interval (daemon only)."""
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            try:
+                await asyncio.to_thread(self.collect_finished)
+            except Exception as e:
+                log.error(f"Polling running tasks failed: {e}")
+
+    def run_forever(self):
+        """Daemon loop: sleep until the earliest next-fire time, run what is due.
+
+        The scheduling thread only decides and records; builtins, SSH
+        dispatch and job polling all run on the event loop, so a slow
+        scraper spawn or an unreachable worker never delays the next fire
+        time (the 5-minute health check starts on time regardless).
+
+        The heap holds (fire time, task name). Entries can go stale when the
+        other front-end runs a task; each popped entry is re-checked against
+        fresh state and pushed back with its real next fire time.
+        """
+        log.info(f"Starting FlashFlow scheduler ({len(self.schedule)} tasks)...")
+        self._submit(self._poll_running())
+        state = self.read_state()
+        heap = []
+        for task in self.schedule:
+            fire = self.next_fire(task, state)
+            if fire is not None:
+                heap.append((fire.timestamp(), task["name"]))
+        heapq.heapify(heap)
+
+        while True:
+            now = time.time()
+            wake = heap[0][0] if heap else now + self.poll_seconds
+            if wake > now:
+                time.sleep(wake - now)
+
+            due = set()
+            while heap and heap[0][0] <= time.time():
+                due.add(heapq.heappop(heap)[1])
+
+            try:
+                self.run_pending(sorted(due), wait=False, collect=False)
+            except Exception as e:
+                log.error(f"Scheduler pass failed: {e}")
+
+            state = self.read_state()
+            now = time.time()
+            for name in due:
+                fire = self.next_fire(self.tasks[name], state)
+                if fire is None:
+                    continue
+                # Still due means it was blocked (still running, no free slot): retry after a poll
+                fire_ts = fire.timestamp()
+                heapq.heappush(heap, (fire_ts if fire_ts > now else now + self.poll_seconds, name))
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+FlashFlow Seen-ID Store
+
+Dedup store for the watcher scripts (drive-watcher, research-scanner,
+discord-monitor). Replaces the "list of every ID ever seen" kept in each
+script's JSON state file, which was loaded into a set and rewritten in
+full on every scan.
+
+  - SQLite table (id, seen_at), one file per script, written incrementally
+  - In-memory Bloom filter in front, so most misses never touch the disk
+  - Ordered, time-based expiry (oldest first) instead of truncating a list
+
+Usage:
+  from seen_store import SeenStore
+
+  seen = SeenStore(Path(__file__).parent / ".research-scanner-seen.sqlite3")
+  seen.import_ids(state.pop("seen_post_ids", []))   # One-time migration
+  if post_id not in seen:
+      ...
+      seen.add(post_id)
+  seen.expire(max_age_days=90)
+  seen.close()
+"""
+
+import hashlib
+import math
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable
+
+# --- Configuration ---
+
+BLOOM_MIN_CAPACITY = 10_000
+BLOOM_ERROR_RATE = 0.001
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over string keys (double hashing on blake2b)."""
+
+    def __init__(self, capacity: int, error_rate: float = BLOOM_ERROR_RATE):
+        self.capacity = max(capacity, 1)
+        self.size = max(8, int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class SeenStore:
+    """Persistent set of seen IDs with a Bloom filter front and time-based expiry."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS seen (id TEXT PRIMARY KEY, seen_at REAL NOT NULL) WITHOUT ROWID"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS seen_at_idx ON seen (seen_at)")
+        self._rebuild_bloom()
+
+    def _rebuild_bloom(self):
+        count = self._db.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+        self._bloom = BloomFilter(max(BLOOM_MIN_CAPACITY, count * 2))
+        for (key,) in self._db.execute("SELECT id FROM seen"):
+            self._bloom.add(key)
+
+    def __contains__(self, key: str) -> bool:
+        key = str(key)
+        with self._lock:
+            if key not in self._bloom:
+                return False
+            return self._db.execute("SELECT 1 FROM seen WHERE id = ?", (key,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+
+    def add(self, key: str, seen_at: float | None = None):
+        self.add_many([key], seen_at)
+
+    def add_many(self, keys: Iterable[str], seen_at: float | None = None):
+        now = time.time() if seen_at is None else seen_at
+        keys = [str(k) for k in keys]
+        if not keys:
+            return
+        with self._lock:
+            self._db.execute("BEGIN")
+            self._db.executemany("INSERT OR IGNORE INTO seen (id, seen_at) VALUES (?, ?)", [(k, now) for k in keys])
+            self._db.execute("COMMIT")
+            for key in keys:
+                self._bloom.add(key)
+            if self._bloom.count > self._bloom.capacity:
+                self._rebuild_bloom()
+
+    def import_ids(self, keys: Iterable[str]):
+        """Migrate a legacy ID list (oldest first), keeping its order for expiry."""
+        keys = list(keys)
+        if not keys:
+            return
+        # Spread legacy IDs over the last len(keys) milliseconds so oldest-first order survives
+        start = time.time() - len(keys) / 1000
+        with self._lock:
+            self._db.execute("BEGIN")
+            self._db.executemany(
+                "INSERT OR IGNORE INTO seen (id, seen_at) VALUES (?, ?)",
+                [(str(k), start + i / 1000) for i, k in enumerate(keys)],
+            )
+            self._db.execute("COMMIT")
+            self._rebuild_bloom()
+
+    def expire(self, max_age_days: float | None = None, max_entries: int | None = None) -> int:
+        """Drop IDs older than max_age_days and/or beyond the newest max_entries. Returns rows removed."""
+        removed = 0
+        with self._lock:
+            if max_age_days is not None:
+                cutoff = time.time() - max_age_days * 86400
+                removed += self._db.execute("DELETE FROM seen WHERE seen_at < ?", (cutoff,)).rowcount
+            if max_entries is not None:
+                removed += self._db.execute(
+                    "DELETE FROM seen WHERE id IN "
+                    "(SELECT id FROM seen ORDER BY seen_at DESC LIMIT -1 OFFSET ?)",
+                    (max_entries,),
+                ).rowcount
+            if removed:
+                # Bloom filters can't delete; rebuild so expired IDs stop costing lookups
+                self._rebuild_bloom()
+        return removed
+
+    def close(self):
+        self._db.close()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+FlashFlow State Store
+
+Crash-safe JSON state for the daemons (scheduler, tiktok-scraper,
+research-scanner, drive-watcher, discord-monitor, va-sla-tracker,
+health-check-daily). Each used to rewrite its whole state file, indented,
+with a plain open(path, "w") on every save: the cost grew with the state
+(the scheduler's task history never shrank) and a crash mid-write left a
+truncated file that failed to load, losing the schedule with it.
+
+  - Snapshot: the full state at `path`, written to a temp file, fsynced
+    and renamed into place, so it is always a complete old or new version
+  - Journal: each save appends only what changed since the last load or
+    save to `<path>.journal`, one JSON op per line (set or delete a
+    top-level key or a key one level down, append to a list). Loading
+    replays it over the snapshot; a torn last line from a crash is dropped
+  - Compaction: once the journal holds compact_every ops or outgrows the
+    snapshot, the state is folded into a new snapshot and the journal
+    restarts. Both carry a generation number, so a crash between the two
+    steps never replays an op twice
+  - Retention: lists named in `history` keep only their newest N items
+
+Finding the change re-encodes the state in memory; what reaches the disk
+is proportional to the change.
+
+Usage:
+  from state_store import StateStore
+
+  store = StateStore(STATE_PATH, history={"completed_tasks": 200})
+  state = store.load() or {"last_scan": {}}
+  state["last_scan"]["general"] = now
+  store.save(state)                 # Appends one line to the journal
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+
+# --- Configuration ---
+
+COMPACT_EVERY = 500
+# Journals smaller than this are not compacted just for outgrowing the snapshot
+COMPACT_MIN_BYTES = 64 * 1024
+# Reserved snapshot key; never part of the state callers see
+GENERATION_KEY = "_generation"
+
+log = logging.getLogger("state-store")
+
+
+def _encode(value) -> str:
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+def _fingerprint(state: dict) -> dict:
+    """The state encoded one level down: dicts per key, lists per item."""
+    out = {}
+    for key, value in state.items():
+        if isinstance(value, dict):
+            out[key] = ("dict", {k: _encode(v) for k, v in value.items()})
+        elif isinstance(value, list):
+            out[key] = ("list", [_encode(v) for v in value])
+        else:
+            out[key] = ("value", _encode(value))
+    return out
+
+
+def _diff(old: dict, new: dict, state: dict, history: dict[str, int]) -> list[dict]:
+    """Journal ops that turn the state behind `old` into `state` (fingerprinted as `new`)."""
+    ops = [{"op": "del", "path": [key]} for key in old.keys() - new.keys()]
+    for key, (kind, encoded) in new.items():
+        prev_kind, prev = old.get(key, (None, None))
+        if (prev_kind, prev) == (kind, encoded):
+            continue
+        if prev_kind == kind == "dict":
+            ops.extend({"op": "del", "path": [key, sub]} for sub in prev.keys() - encoded.keys())
+            ops.extend(
+                {"op": "set", "path": [key, sub], "value": state[key][sub]}
+                for sub, value in encoded.items() if prev.get(sub) != value
+            )
+        elif prev_kind == kind == "list" and encoded[:len(prev)] == prev:
+            op = {"op": "append", "path": [key], "values": state[key][len(prev):]}
+            if key in history:
+                op["keep"] = history[key]
+            ops.append(op)
+        else:
+            ops.append({"op": "set", "path": [key], "value": state[key]})
+    return ops
+
+
+def _apply(state: dict, op: dict):
+    *parents, last = op["path"]
+    target = state
+    for key in parents:
+        target = target.setdefault(key, {})
+    if op["op"] == "set":
+        target[last] = op["value"]
+    elif op["op"] == "del":
+        target.pop(last, None)
+    elif op["op"] == "append":
+        items = target.setdefault(last, [])
+        items.extend(op["values"])
+        if op.get("keep"):
+            del items[:-op["keep"]]
+
+
+def _fsync_write(path: Path, text: str, mode: int | None):
+    with open(path, "w") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    if mode is not None:
+        os.chmod(path, mode)
+
+
+class StateStore:
+    """A JSON state dict persisted as a snapshot plus an append-only journal.
+
+    One writer at a time: single-instance scripts are fine as they are,
+    the scheduler calls load() and save() under its file lock. read() is
+    safe alongside a writer.
+    """
+
+    def __init__(self, path: Path, history: dict[str, int] | None = None,
+                 compact_every: int = COMPACT_EVERY, mode: int | None = None):
+        self.path = Path(path)
+        self.journal_path = self.path.with_name(self.path.name + ".journal")
+        self.history = dict(history or {})
+        self.compact_every = compact_every
+        self.mode = mode
+        self._base: dict | None = None
+        self._generation = 0
+        self._journal_ok = False
+        self._journal_ops = 0
+        self._journal_bytes = 0
+        self._snapshot_bytes = 0
+
+    def read(self) -> dict | None:
+        """The current state, or None if nothing has been saved yet. Does not affect save()."""
+        return self._read(repair=False)
+
+    def load(self) -> dict | None:
+        """Like read(), and makes this state the base the next save() is diffed against."""
+        state = self._read(repair=True)
+        self._base = _fingerprint(state) if state is not None else None
+        return state
+
+    def save(self, state: dict):
+        """Persist the state: journal the change since load()/save(), compacting when due."""
+        if self._base is None or not self._journal_ok:
+            self.compact(state)
+            return
+
+        fingerprint = _fingerprint(state)
+        ops = _diff(self._base, fingerprint, state, self.history)
+        self._trim(state, fingerprint)
+        if ops:
+            lines = "".join(json.dumps(op, default=str) + "\n" for op in ops)
+            with open(self.journal_path, "a") as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+            self._journal_ops += len(ops)
+            self._journal_bytes += len(lines)
+        self._base = fingerprint
+
+        if (self._journal_ops >= self.compact_every
+                or self._journal_bytes > max(self._snapshot_bytes, COMPACT_MIN_BYTES)):
+            self.compact(state)
+
+    def compact(self, state: dict):
+        """Write the full state as a new snapshot and start an empty journal."""
+        self._trim(state)
+        generation = self._generation + 1
+        text = json.dumps({GENERATION_KEY: generation, **state}, indent=2, default=str)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        _fsync_write(tmp, text, self.mode)
+        os.replace(tmp, self.path)
+        # A crash here leaves the old journal behind; its generation no longer matches, so it is ignored
+        header = json.dumps({"generation": generation}) + "\n"
+        tmp = self.journal_path.with_name(self.journal_path.name + ".tmp")
+        _fsync_write(tmp, header, self.mode)
+        os.replace(tmp, self.journal_path)
+
+        self._generation = generation
+        self._base = _fingerprint(state)
+        self._journal_ok = True
+        self._journal_ops = 0
+        self._journal_bytes = len(header)
+        self._snapshot_bytes = len(text)
+
+    def _trim(self, state: dict, fingerprint: dict | None = None):
+        for key, limit in self.history.items():
+            items = state.get(key)
+            if isinstance(items, list) and len(items) > limit:
+                del items[:-limit]
+                if fingerprint and key in fingerprint:
+                    del fingerprint[key][1][:-limit]
+
+    def _read(self, repair: bool) -> dict | None:
+        state = None
+        generation = 0
+        if self.path.exists():
+            with open(self.path) as f:
+                text = f.read()
+            state = json.loads(text)
+            generation = state.pop(GENERATION_KEY, 0)
+            if repair:
+                self._snapshot_bytes = len(text)
+
+        journal_ok, ops, good_bytes = False, 0, 0
+        data = b""
+        if self.journal_path.exists():
+            with open(self.journal_path, "rb") as f:
+                data = f.read()
+            for line in data.splitlines(keepends=True):
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                if not journal_ok:
+                    # Header line: a journal from another generation was already folded in
+                    if entry.get("generation") != generation:
+                        break
+                    journal_ok = True
+                else:
+                    if state is None:
+                        state = {}
+                    _apply(state, entry)
+                    ops += 1
+                good_bytes += len(line)
+
+        if repair:
+            if journal_ok and good_bytes < len(data):
+                log.warning(f"Dropping {len(data) - good_bytes} bytes of incomplete journal in {self.journal_path}")
+                with open(self.journal_path, "r+b") as f:
+                    f.truncate(good_bytes)
+            self._generation = generation
+            self._journal_ok = journal_ok
+            self._journal_ops = ops
+            self._journal_bytes = good_bytes
+
+        if state is not None:
+            self._trim(state)
+        return state
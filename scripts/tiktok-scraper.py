@@ -9,28 +9,50 @@ Then triggers winner detection.
 Flow:
   1. GET /api/videos/lookup?account_id=<id> → list of posted videos with tiktok_url
   2. For each video, scrape TikTok page for stats
-  3. POST /api/videos/{id}/stats with scraped data
+  3. Buffer stats (write-ahead spooled) and flush in batches to the bulk
+     stats endpoint, or POST /api/videos/{id}/stats concurrently if it's unavailable
   4. POST /api/videos/detect-winners to evaluate all
 
+Re-scrapes are scheduled per video: hot videos are revisited every
+`min_rescrape_hours`, plateaued or old ones back off exponentially up to
+`max_rescrape_hours`, and repeatedly failing videos are quarantined.
+
 Uses Playwright for browser automation since TikTok requires JS rendering.
+Videos are scraped by a pool of `scrape_concurrency` browser contexts fed
+from a work queue, throttled per domain by `domain_rate_per_minute`.
+
+Extraction modes (`extraction_mode` in config):
+  intercept  Block images/media/fonts/CSS and read stats from the hydration
+             JSON or item-detail XHR; DOM selectors only as a fallback (default)
+  dom        Render the page and read stats from DOM selectors
 
 Usage:
   python tiktok-scraper.py                    # Scrape all accounts
   python tiktok-scraper.py --account ACC_ID   # Scrape specific account
   python tiktok-scraper.py --daemon           # Run every 6 hours
+  python tiktok-scraper.py --all              # Ignore the re-scrape schedule
 """
 
 import asyncio
 import json
 import logging
-import re
+import os
 import sys
 import time
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
+from urllib.parse import urlsplit
 
 import httpx
 
+from flashflow_api import AsyncFlashFlowClient, AsyncTokenBucket
+from state_store import StateStore
+from tiktok_extract import (
+    extract_stats_dom,
+    stats_from_hydration,
+    stats_from_item_detail,
+)
+
 try:
     from playwright.async_api import async_playwright
 except ImportError:
@@ -41,6 +63,7 @@ except ImportError:
 
 CONFIG_PATH = Path(__file__).parent / "tiktok-scraper-config.json"
 STATE_PATH = Path(__file__).parent / ".tiktok-scraper-state.json"
+SPOOL_PATH = Path(__file__).parent / ".tiktok-stats-spool.jsonl"
 LOG_DIR = Path.home() / ".openclaw" / "workspace" / "second-brain" / "journals"
 
 logging.basicConfig(
@@ -53,6 +76,28 @@ logging.basicConfig(
 )
 log = logging.getLogger("tiktok-scraper")
 
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# Any of these means the stats bar has rendered
+STATS_READY_SELECTOR = ", ".join([
+    '[data-e2e="video-views"]',
+    '[data-e2e="like-count"]',
+    '[data-e2e="browse-like-count"]',
+])
+
+# Intercept mode: skip everything that isn't needed to read the stats
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font", "stylesheet"}
+ITEM_DETAIL_PATH = "/api/item/detail"
+
+# Adaptive re-scrape defaults (overridable in config)
+MIN_RESCRAPE_HOURS = 6
+MAX_RESCRAPE_HOURS = 7 * 24
+HOT_VIEWS_PER_HOUR = 500       # at or above this, keep scraping at the minimum interval
+PLATEAU_GROWTH_PCT = 2.0       # below this growth between scrapes, double the interval
+AGE_BACKOFF_DAYS = 14          # tracked longer than this → at most daily
+QUARANTINE_AFTER_ERRORS = 3
+HISTORY_LIMIT = 20
+
 
 def load_config() -> dict:
     if not CONFIG_PATH.exists():
@@ -62,34 +107,15 @@ def load_config() -> dict:
         return json.load(f)
 
 
+STATE_STORE = StateStore(STATE_PATH)
+
+
 def load_state() -> dict:
-    if STATE_PATH.exists():
-        with open(STATE_PATH) as f:
-            return json.load(f)
-    return {"last_scrape": {}, "error_counts": {}}
+    return STATE_STORE.load() or {"last_scrape": {}, "error_counts": {}, "videos": {}}
 
 
 def save_state(state: dict):
-    with open(STATE_PATH, "w") as f:
-        json.dump(state, f, indent=2)
-
-
-def parse_count(text: str) -> int:
-    """Parse TikTok's abbreviated counts (e.g., '1.2M', '45.3K', '892')."""
-    if not text:
-        return 0
-    text = text.strip().replace(",", "")
-    multipliers = {"K": 1_000, "M": 1_000_000, "B": 1_000_000_000}
-    for suffix, mult in multipliers.items():
-        if text.upper().endswith(suffix):
-            try:
-                return int(float(text[:-1]) * mult)
-            except ValueError:
-                return 0
-    try:
-        return int(text)
-    except ValueError:
-        return 0
+    STATE_STORE.save(state)
 
 
 def get_posted_videos(config: dict, account_id: str | None = None) -> list[dict]:
@@ -142,110 +168,228 @@ def get_posted_videos(config: dict, account_id: str | None = None) -> list[dict]
     return result
 
 
+async def wait_for_stats(page, timeout_ms: int = 8000):
+    """Wait until the stats render instead of sleeping a fixed amount."""
+    try:
+        await page.wait_for_selector(STATS_READY_SELECTOR, state="attached", timeout=timeout_ms)
+        return
+    except Exception:
+        pass
+    # Layout we don't recognise — settle for the network going quiet
+    try:
+        await page.wait_for_load_state("networkidle", timeout=5000)
+    except Exception:
+        pass
+
+
+def checked_stats(url: str, stats: dict | None, source: str) -> dict | None:
+    if not stats or sum(stats.values()) == 0:
+        log.warning(f"Could not extract any stats from {url}")
+        return None
+    log.info(f"Stats for {url} ({source}): views={stats['views']}, likes={stats['likes']}, comments={stats['comments']}, shares={stats['shares']}")
+    return stats
+
+
 async def scrape_tiktok_stats(page, url: str) -> dict | None:
-    """Scrape stats from a single TikTok video page."""
+    """Scrape stats from a single TikTok video page (DOM mode)."""
     try:
         await page.goto(url, wait_until="domcontentloaded", timeout=30000)
-        # Wait for stats to render
-        await page.wait_for_timeout(3000)
-
-        stats = {"views": 0, "likes": 0, "comments": 0, "shares": 0, "saves": 0}
-
-        # Try multiple selector strategies since TikTok changes their DOM frequently
-
-        # Strategy 1: Look for strong tags with data attributes
-        try:
-            # Views are often in the video description area
-            view_el = await page.query_selector('[data-e2e="video-views"]')
-            if view_el:
-                stats["views"] = parse_count(await view_el.inner_text())
-        except Exception:
-            pass
-
-        # Strategy 2: Look for action bar buttons
-        selectors = {
-            "likes": ['[data-e2e="like-count"]', '[data-e2e="browse-like-count"]'],
-            "comments": ['[data-e2e="comment-count"]', '[data-e2e="browse-comment-count"]'],
-            "shares": ['[data-e2e="share-count"]', '[data-e2e="browse-share-count"]'],
-            "saves": ['[data-e2e="undefined-count"]', '[data-e2e="browse-save-count"]'],
-        }
-
-        for stat_name, sel_list in selectors.items():
-            for sel in sel_list:
-                try:
-                    el = await page.query_selector(sel)
-                    if el:
-                        text = await el.inner_text()
-                        stats[stat_name] = parse_count(text)
-                        break
-                except Exception:
-                    continue
-
-        # Strategy 3: If views still 0, try parsing from page content
-        if stats["views"] == 0:
+        await wait_for_stats(page)
+        return checked_stats(url, await extract_stats_dom(page), "dom")
+
+    except Exception as e:
+        log.error(f"Failed to scrape {url}: {e}")
+        return None
+
+
+async def block_heavy_resources(route):
+    """Context route handler: drop images, video, fonts and CSS."""
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+async def scrape_tiktok_stats_intercept(page, url: str) -> dict | None:
+    """Scrape stats without rendering (intercept mode).
+
+    Reads the hydration JSON from the raw document response, then any
+    /api/item/detail/ XHR the page fired, and only falls back to the DOM
+    strategies if both come up empty. Heavy resources are blocked by the
+    context route installed in scrape_worker.
+    """
+    # Item-detail responses seen so far; the XHR may land before goto() returns
+    detail_responses = []
+
+    def on_response(response):
+        if ITEM_DETAIL_PATH in response.url:
+            detail_responses.append(response)
+
+    page.on("response", on_response)
+    try:
+        resp = await page.goto(url, wait_until="domcontentloaded", timeout=30000)
+        if resp:
+            stats = stats_from_hydration(await resp.text())
+            if stats and any(stats.values()):
+                return checked_stats(url, stats, "hydration")
+
+        if not detail_responses:
             try:
-                content = await page.content()
-                # Look for playCount in JSON-LD or embedded data
-                match = re.search(r'"playCount"\s*:\s*(\d+)', content)
-                if match:
-                    stats["views"] = int(match.group(1))
-                # Also try interactionCount
-                match = re.search(r'"interactionCount"\s*:\s*(\d+)', content)
-                if match and stats["views"] == 0:
-                    stats["views"] = int(match.group(1))
+                response = await page.wait_for_response(lambda r: ITEM_DETAIL_PATH in r.url, timeout=5000)
+                if response not in detail_responses:
+                    detail_responses.append(response)
             except Exception:
                 pass
-
-        # Strategy 4: Parse from meta tags
-        if stats["views"] == 0:
+        for response in detail_responses:
             try:
-                meta = await page.query_selector('meta[property="og:description"]')
-                if meta:
-                    desc = await meta.get_attribute("content")
-                    if desc:
-                        # Format: "123 Likes, 45 Comments. TikTok video from @user"
-                        likes_match = re.search(r"([\d.]+[KMB]?)\s*Likes", desc, re.IGNORECASE)
-                        if likes_match and stats["likes"] == 0:
-                            stats["likes"] = parse_count(likes_match.group(1))
+                stats = stats_from_item_detail(await response.json())
             except Exception:
-                pass
-
-        total = sum(stats.values())
-        if total == 0:
-            log.warning(f"Could not extract any stats from {url}")
-            return None
+                continue
+            if stats and any(stats.values()):
+                return checked_stats(url, stats, "xhr")
 
-        log.info(f"Stats for {url}: views={stats['views']}, likes={stats['likes']}, comments={stats['comments']}, shares={stats['shares']}")
-        return stats
+        await wait_for_stats(page)
+        return checked_stats(url, await extract_stats_dom(page), "dom")
 
     except Exception as e:
         log.error(f"Failed to scrape {url}: {e}")
         return None
-
-
-def push_stats(config: dict, video_id: str, stats: dict) -> bool:
-    """Push scraped stats to FlashFlow API."""
-    api_url = config["flashflow_api_url"].rstrip("/")
-    api_key = config["flashflow_api_key"]
-
-    try:
-        resp = httpx.post(
-            f"{api_url}/videos/{video_id}/stats",
-            json=stats,
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            },
-            timeout=15,
-        )
-        data = resp.json()
-        if resp.status_code < 300 and data.get("ok"):
+    finally:
+        page.remove_listener("response", on_response)
+
+
+class StatsWriter:
+    """Buffered stats writer with a write-ahead spool.
+
+    Every scraped result is appended (and fsynced) to SPOOL_PATH before it
+    is buffered. The buffer is flushed to the bulk stats endpoint when it
+    reaches `stats_batch_size` or every `stats_flush_seconds`. If the bulk
+    endpoint isn't deployed (404/405/501) or a batch fails, the batch is sent
+    as concurrent single POSTs instead. Acknowledged results are marked in the
+    spool, so anything left unacked after a crash is replayed next run.
+    """
+
+    def __init__(self, config: dict, spool_path: Path = SPOOL_PATH):
+        self.batch_size = max(1, config.get("stats_batch_size", 25))
+        self.flush_seconds = config.get("stats_flush_seconds", 30)
+        self.bulk_endpoint = config.get("bulk_stats_endpoint", "/videos/stats/bulk")
+        self.bulk_available = bool(self.bulk_endpoint)
+        self.spool_path = spool_path
+        self.client = AsyncFlashFlowClient(base_url=config["flashflow_api_url"], api_key=config["flashflow_api_key"])
+        self.single_slots = asyncio.Semaphore(config.get("stats_push_concurrency", 5))
+        self.buffer: list[dict] = []
+        self.pushed: set[str] = set()
+        self._lock = asyncio.Lock()
+        self._ticker: asyncio.Task | None = None
+        self._spool = None
+
+    # --- Spool ---
+
+    def _spool_write(self, record: dict):
+        self._spool.write(json.dumps(record) + "\n")
+        self._spool.flush()
+        os.fsync(self._spool.fileno())
+
+    def _unacked(self) -> list[dict]:
+        if not self.spool_path.exists():
+            return []
+        pending: dict[str, dict] = {}
+        with open(self.spool_path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # torn write from a crash
+                if "ack" in record:
+                    pending.pop(record["ack"], None)
+                else:
+                    pending[record["video_id"]] = record
+        return list(pending.values())
+
+    # --- Lifecycle ---
+
+    def _compact(self) -> list[dict]:
+        """Rewrite the spool with only unacked records (drops acks and torn lines)."""
+        leftovers = self._unacked()
+        with open(self.spool_path, "w") as f:
+            for record in leftovers:
+                f.write(json.dumps(record) + "\n")
+        return leftovers
+
+    async def start(self):
+        """Replay unacked results from a previous run and start the flush timer."""
+        leftovers = self._compact()
+        self._spool = open(self.spool_path, "a")
+        if leftovers:
+            log.info(f"Replaying {len(leftovers)} unpushed stats from spool")
+            self.buffer.extend(leftovers)
+            await self.flush()
+        self._ticker = asyncio.create_task(self._tick())
+
+    async def _tick(self):
+        while True:
+            await asyncio.sleep(self.flush_seconds)
+            if self.buffer:
+                try:
+                    await self.flush()
+                except Exception as e:
+                    # The batch is still in the spool; keep the timer going
+                    log.error(f"Timed stats flush failed: {e}")
+
+    async def add(self, video_id: str, stats: dict):
+        record = {"video_id": video_id, **stats, "scraped_at": datetime.utcnow().isoformat() + "Z"}
+        self._spool_write(record)
+        self.buffer.append(record)
+        if len(self.buffer) >= self.batch_size:
+            await self.flush()
+
+    async def close(self):
+        if self._ticker:
+            self._ticker.cancel()
+        await self.flush()
+        await self.client.aclose()
+        self._spool.close()
+        leftovers = self._compact()
+        if leftovers:
+            log.warning(f"{len(leftovers)} stats left in spool for next run")
+
+    # --- Pushing ---
+
+    async def flush(self):
+        async with self._lock:
+            batch, self.buffer = self.buffer, []
+            if not batch:
+                return
+            done = await self._push_bulk(batch) if self.bulk_available else None
+            if done is None:
+                results = await asyncio.gather(*(self._push_one(r) for r in batch))
+                done = {r["video_id"] for r, ok in zip(batch, results) if ok}
+            for video_id in done:
+                self.pushed.add(video_id)
+                self._spool_write({"ack": video_id})
+            log.info(f"Flushed {len(done)}/{len(batch)} stats")
+
+    async def _push_bulk(self, batch: list[dict]) -> set[str] | None:
+        """POST a batch to the bulk endpoint. None means fall back to single posts."""
+        r = await self.client.request("POST", self.bulk_endpoint, {"items": batch})
+        if r.get("status") in (404, 405, 501):
+            log.info(f"Bulk stats endpoint unavailable ({r['status']}) — using single posts")
+            self.bulk_available = False
+            return None
+        if not r["ok"] or not r["data"].get("ok"):
+            log.warning(f"Bulk stats push failed: {r.get('error') or r.get('data')}")
+            return None
+        failed = {item.get("video_id") for item in (r["data"].get("data") or {}).get("failed", [])}
+        return {rec["video_id"] for rec in batch if rec["video_id"] not in failed}
+
+    async def _push_one(self, record: dict) -> bool:
+        video_id = record["video_id"]
+        payload = {k: v for k, v in record.items() if k != "video_id"}
+        async with self.single_slots:
+            r = await self.client.request("POST", f"/videos/{video_id}/stats", payload)
+        if r["ok"] and r["data"].get("ok"):
             return True
-        else:
-            log.warning(f"Stats push failed for {video_id}: {data}")
-            return False
-    except Exception as e:
-        log.error(f"Stats push error for {video_id}: {e}")
+        log.warning(f"Stats push failed for {video_id}: {r.get('error') or r.get('data')}")
         return False
 
 
@@ -275,52 +419,247 @@ def trigger_winner_detection(config: dict) -> dict | None:
         return None
 
 
-async def run_scrape(config: dict, account_id: str | None = None):
-    """Main scraping loop."""
-    videos = get_posted_videos(config, account_id)
-    if not videos:
-        log.info("No posted videos with TikTok URLs found.")
+class DomainRateLimiter:
+    """One token bucket per domain, shared by every scrape worker."""
+
+    def __init__(self, rate_per_minute: float, burst: int):
+        self.rate = rate_per_minute / 60
+        self.burst = burst
+        self._buckets: dict[str, AsyncTokenBucket] = {}
+
+    async def acquire(self, url: str):
+        domain = urlsplit(url).netloc
+        if domain not in self._buckets:
+            self._buckets[domain] = AsyncTokenBucket(self.rate, capacity=self.burst)
+        await self._buckets[domain].acquire()
+
+
+async def scrape_worker(worker_id: int, config: dict, browser, queue: asyncio.Queue, limiter: DomainRateLimiter,
+                        results: dict[str, dict | None], writer: StatsWriter | None = None):
+    """Pull videos off the queue and scrape them on this worker's own context/page.
+
+    Returns without taking work if its context or page can't be set up; the
+    other workers, or scrape_all once the whole pool is gone, take the queue.
+    """
+    intercept = config.get("extraction_mode", "intercept") == "intercept"
+    scrape = scrape_tiktok_stats_intercept if intercept else scrape_tiktok_stats
+    context = None
+    try:
+        context = await browser.new_context(user_agent=USER_AGENT, viewport={"width": 1280, "height": 720})
+        if intercept:
+            await context.route("**/*", block_heavy_resources)
+        page = await context.new_page()
+    except Exception as e:
+        log.error(f"[w{worker_id}] Worker failed to start: {e}")
+        if context:
+            await context.close()
         return
 
-    state = load_state()
-    success_count = 0
-    fail_count = 0
+    try:
+        while True:
+            video = await queue.get()
+            try:
+                await limiter.acquire(video["tiktok_url"])
+                log.info(f"[w{worker_id}] Scraping: {video['title'][:50]}... ({video['tiktok_url']})")
+                results[video["id"]] = await scrape(page, video["tiktok_url"])
+                if writer and results[video["id"]]:
+                    await writer.add(video["id"], results[video["id"]])
+            except Exception as e:
+                log.error(f"[w{worker_id}] Worker error on {video['tiktok_url']}: {e}")
+                results[video["id"]] = None
+            finally:
+                queue.task_done()
+    finally:
+        await context.close()
+
+
+async def scrape_all(config: dict, videos: list[dict], writer: StatsWriter | None = None) -> dict[str, dict | None]:
+    """Scrape every video with a pool of K browser contexts fed by a work queue.
 
+    Results are handed to `writer` as they arrive so stats are pushed while
+    the rest of the run is still scraping.
+    """
+    workers = max(1, min(config.get("scrape_concurrency", 3), len(videos)))
+    rate = config.get("domain_rate_per_minute") or 60 / max(config.get("delay_between_scrapes", 3), 0.1)
+    limiter = DomainRateLimiter(rate, burst=workers)
+
+    queue: asyncio.Queue = asyncio.Queue()
+    for video in videos:
+        queue.put_nowait(video)
+
+    results: dict[str, dict | None] = {}
     async with async_playwright() as p:
         browser = await p.chromium.launch(
             headless=True,
             args=["--disable-blink-features=AutomationControlled"],
         )
-        context = await browser.new_context(
-            user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            viewport={"width": 1280, "height": 720},
-        )
-        page = await context.new_page()
+        tasks = [asyncio.create_task(scrape_worker(i, config, browser, queue, limiter, results, writer)) for i in range(workers)]
+        # Wait for the queue to drain, or for every worker to be gone (none could start)
+        joined = asyncio.create_task(queue.join())
+        pool = asyncio.gather(*tasks, return_exceptions=True)
+        await asyncio.wait([joined, pool], return_when=asyncio.FIRST_COMPLETED)
+        if not joined.done():
+            log.error(f"No scrape workers running — {queue.qsize()} videos left unscraped")
+            while not queue.empty():
+                video = queue.get_nowait()
+                results[video["id"]] = None
+                queue.task_done()
+        await joined
+        for t in tasks:
+            t.cancel()
+        await pool
+        await browser.close()
 
-        for video in videos:
-            video_id = video["id"]
-            url = video["tiktok_url"]
+    return results
 
-            log.info(f"Scraping: {video['title'][:50]}... ({url})")
-            stats = await scrape_tiktok_stats(page, url)
 
-            if stats:
-                if push_stats(config, video_id, stats):
-                    success_count += 1
-                    state["error_counts"].pop(video_id, None)
-                else:
-                    fail_count += 1
-            else:
-                fail_count += 1
-                error_count = state["error_counts"].get(video_id, 0) + 1
-                state["error_counts"][video_id] = error_count
-                if error_count >= 3:
-                    log.warning(f"Video {video_id} has failed {error_count} times")
+# --- Adaptive re-scrape scheduling ---
 
-            # Rate limit: wait between requests
-            await asyncio.sleep(config.get("delay_between_scrapes", 3))
+def video_entry(state: dict, video_id: str) -> dict:
+    return state.setdefault("videos", {}).setdefault(video_id, {
+        "first_seen": None,
+        "history": [],
+        "interval_hours": None,
+        "next_scrape": None,
+    })
 
-        await browser.close()
+
+def is_due(entry: dict, now: datetime) -> bool:
+    return not entry.get("next_scrape") or datetime.fromisoformat(entry["next_scrape"]) <= now
+
+
+def next_interval_hours(entry: dict, config: dict, now: datetime) -> float:
+    """Pick the next re-scrape interval from the video's view history.
+
+    Hot videos (high view velocity or growth) stay on the minimum interval,
+    plateaued ones double their interval up to the maximum, and anything
+    older than `age_backoff_days` is scraped at most daily.
+    """
+    min_h = config.get("min_rescrape_hours", MIN_RESCRAPE_HOURS)
+    max_h = config.get("max_rescrape_hours", MAX_RESCRAPE_HOURS)
+    history = entry["history"]
+    current = entry.get("interval_hours") or min_h
+
+    if len(history) < 2:
+        interval = min_h
+    else:
+        (t0, v0), (t1, v1) = history[-2], history[-1]
+        hours = max((datetime.fromisoformat(t1) - datetime.fromisoformat(t0)).total_seconds() / 3600, 0.01)
+        gained = max(v1 - v0, 0)
+        velocity = gained / hours
+        growth_pct = gained / max(v0, 1) * 100
+
+        if velocity >= config.get("hot_views_per_hour", HOT_VIEWS_PER_HOUR):
+            interval = min_h
+        elif growth_pct < config.get("plateau_growth_pct", PLATEAU_GROWTH_PCT):
+            interval = current * 2
+        else:
+            interval = current
+
+    first_seen = datetime.fromisoformat(entry["first_seen"]) if entry.get("first_seen") else now
+    if (now - first_seen).days >= config.get("age_backoff_days", AGE_BACKOFF_DAYS):
+        interval = max(interval, 24)
+
+    return max(min_h, min(interval, max_h))
+
+
+def record_scrape(entry: dict, stats: dict, config: dict, now: datetime):
+    # Kept apart from the history, which is trimmed to HISTORY_LIMIT samples;
+    # entries from before first_seen existed start from their oldest sample
+    if not entry.get("first_seen"):
+        entry["first_seen"] = entry["history"][0][0] if entry["history"] else now.isoformat()
+    entry["history"].append([now.isoformat(), stats.get("views", 0)])
+    del entry["history"][:-HISTORY_LIMIT]
+    entry["interval_hours"] = next_interval_hours(entry, config, now)
+    entry["next_scrape"] = (now + timedelta(hours=entry["interval_hours"])).isoformat()
+    entry.pop("quarantined", None)
+
+
+def record_failure(state: dict, entry: dict, video_id: str, config: dict, now: datetime):
+    """Count the failure; after QUARANTINE_AFTER_ERRORS, back off exponentially."""
+    error_count = state["error_counts"].get(video_id, 0) + 1
+    state["error_counts"][video_id] = error_count
+    if error_count < QUARANTINE_AFTER_ERRORS:
+        entry["next_scrape"] = None  # retry next run
+        return
+
+    min_h = config.get("min_rescrape_hours", MIN_RESCRAPE_HOURS)
+    max_h = config.get("max_rescrape_hours", MAX_RESCRAPE_HOURS)
+    hours = min(min_h * 2 ** (error_count - QUARANTINE_AFTER_ERRORS + 1), max_h)
+    entry["quarantined"] = True
+    entry["next_scrape"] = (now + timedelta(hours=hours)).isoformat()
+    log.warning(f"Video {video_id} has failed {error_count} times — quarantined for {hours:.0f}h")
+
+
+def select_due_videos(videos: list[dict], state: dict, config: dict, now: datetime,
+                      force: bool = False) -> list[dict]:
+    """Videos whose next_scrape has passed, most overdue first."""
+    if force:
+        return videos
+
+    due = [v for v in videos if is_due(video_entry(state, v["id"]), now)]
+    due.sort(key=lambda v: video_entry(state, v["id"]).get("next_scrape") or "")
+
+    cap = config.get("max_videos_per_run", 0)
+    if cap and len(due) > cap:
+        log.info(f"Capping run at {cap} of {len(due)} due videos")
+        due = due[:cap]
+    return due
+
+
+def prune_state(state: dict, videos: list[dict]):
+    """Drop history for videos that are no longer posted."""
+    live = {v["id"] for v in videos}
+    for video_id in list(state.get("videos", {})):
+        if video_id not in live:
+            del state["videos"][video_id]
+            state["error_counts"].pop(video_id, None)
+
+
+async def run_scrape(config: dict, account_id: str | None = None, force: bool = False):
+    """Main scraping loop. Only videos that are due for a re-scrape are visited."""
+    videos = get_posted_videos(config, account_id)
+    if not videos:
+        log.info("No posted videos with TikTok URLs found.")
+        return
+
+    state = load_state()
+    state.setdefault("videos", {})
+    if not account_id:
+        prune_state(state, videos)
+
+    now = datetime.utcnow()
+    due = select_due_videos(videos, state, config, now, force=force)
+    log.info(f"{len(due)}/{len(videos)} videos due for scraping")
+
+    success_count = 0
+    fail_count = 0
+
+    writer = StatsWriter(config)
+    await writer.start()
+    try:
+        results = await scrape_all(config, due, writer) if due else {}
+    finally:
+        await writer.close()
+    # Stats replayed from a previous run's spool
+    success_count += len(writer.pushed - {v["id"] for v in due})
+
+    now = datetime.utcnow()
+    for video in due:
+        video_id = video["id"]
+        stats = results.get(video_id)
+        entry = video_entry(state, video_id)
+
+        if stats:
+            record_scrape(entry, stats, config, now)
+            if video_id in writer.pushed:
+                success_count += 1
+                state["error_counts"].pop(video_id, None)
+            else:
+                fail_count += 1
+        else:
+            fail_count += 1
+            record_failure(state, entry, video_id, config, now)
 
     # Trigger winner detection after all stats updated
     if success_count > 0:
@@ -344,18 +683,19 @@ def main():
         idx = sys.argv.index("--account")
         if idx + 1 < len(sys.argv):
             account_id = sys.argv[idx + 1]
+    force = "--all" in sys.argv
 
     if "--daemon" in sys.argv:
         interval = config.get("scrape_interval_hours", 6) * 3600
         log.info(f"Starting daemon mode. Scraping every {interval // 3600} hours.")
         while True:
             try:
-                asyncio.run(run_scrape(config, account_id))
+                asyncio.run(run_scrape(config, account_id, force))
             except Exception as e:
                 log.error(f"Scrape cycle failed: {e}")
             time.sleep(interval)
     else:
-        asyncio.run(run_scrape(config, account_id))
+        asyncio.run(run_scrape(config, account_id, force))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+TikTok Stats Extraction
+
+Browser-free parsers for TikTok video stats, shared by tiktok-scraper.py
+and the extraction benchmark.
+
+Strategies:
+  - hydration: read the embedded __UNIVERSAL_DATA_FOR_REHYDRATION__ /
+               SIGI_STATE JSON that TikTok ships in the initial HTML
+  - xhr:       read /api/item/detail/ JSON responses
+  - regex:     scan raw HTML for "playCount": N style fields (last resort)
+  - dom:       query data-e2e selectors on a rendered Playwright page
+
+All strategies return the same shape as the DOM scraper:
+  {"views", "likes", "comments", "shares", "saves"} or None.
+"""
+
+import json
+import re
+
+STAT_FIELDS = {
+    "playCount": "views",
+    "diggCount": "likes",
+    "commentCount": "comments",
+    "shareCount": "shares",
+    "collectCount": "saves",
+}
+
+HYDRATION_SCRIPT_RE = re.compile(
+    r'<script[^>]+id="(__UNIVERSAL_DATA_FOR_REHYDRATION__|SIGI_STATE)"[^>]*>(.*?)</script>',
+    re.DOTALL,
+)
+STAT_FIELD_RE = {
+    field: re.compile(rf'"{field}"\s*:\s*"?(\d+)') for field in STAT_FIELDS
+}
+INTERACTION_COUNT_RE = re.compile(r'"interactionCount"\s*:\s*"?(\d+)')
+
+
+def parse_count(text: str) -> int:
+    """Parse TikTok's abbreviated counts (e.g., '1.2M', '45.3K', '892')."""
+    if not text:
+        return 0
+    text = text.strip().replace(",", "")
+    multipliers = {"K": 1_000, "M": 1_000_000, "B": 1_000_000_000}
+    for suffix, mult in multipliers.items():
+        if text.upper().endswith(suffix):
+            try:
+                return int(float(text[:-1]) * mult)
+            except ValueError:
+                return 0
+    try:
+        return int(text)
+    except ValueError:
+        return 0
+
+
+def empty_stats() -> dict:
+    return {"views": 0, "likes": 0, "comments": 0, "shares": 0, "saves": 0}
+
+
+def stats_from_struct(raw: dict | None) -> dict | None:
+    """Map a TikTok `stats`/`statsV2` object to our stats dict."""
+    if not isinstance(raw, dict):
+        return None
+    stats = empty_stats()
+    found = False
+    for field, name in STAT_FIELDS.items():
+        if field in raw:
+            stats[name] = parse_count(str(raw[field]))
+            found = True
+    return stats if found else None
+
+
+def _item_stats(item: dict | None) -> dict | None:
+    if not isinstance(item, dict):
+        return None
+    # statsV2 carries exact string counts; stats can be rounded on big videos
+    return stats_from_struct(item.get("statsV2")) or stats_from_struct(item.get("stats"))
+
+
+def stats_from_hydration(html: str) -> dict | None:
+    """Extract stats from the hydration JSON embedded in the page HTML."""
+    for script_id, payload in HYDRATION_SCRIPT_RE.findall(html):
+        try:
+            data = json.loads(payload)
+        except ValueError:
+            continue
+
+        if script_id == "__UNIVERSAL_DATA_FOR_REHYDRATION__":
+            detail = data.get("__DEFAULT_SCOPE__", {}).get("webapp.video-detail", {})
+            stats = _item_stats(detail.get("itemInfo", {}).get("itemStruct"))
+        else:
+            items = data.get("ItemModule", {})
+            stats = next((s for s in map(_item_stats, items.values()) if s), None)
+
+        if stats:
+            return stats
+    return None
+
+
+def stats_from_item_detail(data: dict) -> dict | None:
+    """Extract stats from an /api/item/detail/ XHR response body."""
+    if not isinstance(data, dict):
+        return None
+    return _item_stats(data.get("itemInfo", {}).get("itemStruct"))
+
+
+def stats_from_regex(html: str) -> dict | None:
+    """Scan raw HTML for stat fields. Slow and ambiguous on pages with related videos."""
+    stats = empty_stats()
+    found = False
+    for field, name in STAT_FIELDS.items():
+        match = STAT_FIELD_RE[field].search(html)
+        if match:
+            stats[name] = int(match.group(1))
+            found = True
+    if not stats["views"]:
+        match = INTERACTION_COUNT_RE.search(html)
+        if match:
+            stats["views"] = int(match.group(1))
+            found = True
+    return stats if found else None
+
+
+async def extract_stats_dom(page) -> dict:
+    """Read stats from the rendered page: selectors, then embedded-data regex, then meta tags."""
+    stats = empty_stats()
+
+    # Try multiple selector strategies since TikTok changes their DOM frequently
+
+    # Strategy 1: Look for strong tags with data attributes
+    try:
+        # Views are often in the video description area
+        view_el = await page.query_selector('[data-e2e="video-views"]')
+        if view_el:
+            stats["views"] = parse_count(await view_el.inner_text())
+    except Exception:
+        pass
+
+    # Strategy 2: Look for action bar buttons
+    selectors = {
+        "likes": ['[data-e2e="like-count"]', '[data-e2e="browse-like-count"]'],
+        "comments": ['[data-e2e="comment-count"]', '[data-e2e="browse-comment-count"]'],
+        "shares": ['[data-e2e="share-count"]', '[data-e2e="browse-share-count"]'],
+        "saves": ['[data-e2e="undefined-count"]', '[data-e2e="browse-save-count"]'],
+    }
+
+    for stat_name, sel_list in selectors.items():
+        for sel in sel_list:
+            try:
+                el = await page.query_selector(sel)
+                if el:
+                    text = await el.inner_text()
+                    stats[stat_name] = parse_count(text)
+                    break
+            except Exception:
+                continue
+
+    # Strategy 3: If views still 0, try parsing from page content
+    if stats["views"] == 0:
+        try:
+            # Look for playCount / interactionCount in JSON-LD or embedded data
+            found = stats_from_regex(await page.content())
+            if found:
+                stats["views"] = found["views"]
+        except Exception:
+            pass
+
+    # Strategy 4: Parse from meta tags
+    if stats["views"] == 0:
+        try:
+            meta = await page.query_selector('meta[property="og:description"]')
+            if meta:
+                desc = await meta.get_attribute("content")
+                if desc:
+                    # Format: "123 Likes, 45 Comments. TikTok video from @user"
+                    likes_match = re.search(r"([\d.]+[KMB]?)\s*Likes", desc, re.IGNORECASE)
+                    if likes_match and stats["likes"] == 0:
+                        stats["likes"] = parse_count(likes_match.group(1))
+        except Exception:
+            pass
+
+    return stats
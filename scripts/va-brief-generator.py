@@ -15,18 +15,15 @@ Usage:
 
 import json
 import logging
-import os
-import re
 import sys
 import time
 from datetime import datetime, timedelta
 from pathlib import Path
 
-import httpx
+from flashflow_api import API_KEY, api_call
 
 # --- Configuration ---
 
-API_URL = "https://web-pied-delta-30.vercel.app/api"
 JOURNALS_DIR = Path.home() / ".openclaw" / "workspace" / "second-brain" / "journals"
 BRIEFS_DIR = Path.home() / ".openclaw" / "workspace" / "second-brain" / "va-briefs"
 
@@ -37,31 +34,6 @@ logging.basicConfig(
 )
 log = logging.getLogger("va-brief-generator")
 
-API_KEY = os.environ.get("FLASHFLOW_API_KEY", "")
-if not API_KEY:
-    skill_file = Path.home() / ".openclaw" / "agents" / "flashflow-work" / "workspace" / "skills" / "flashflow" / "skill.md"
-    if skill_file.exists():
-        match = re.search(r"ff_ak_[a-f0-9]{40}", skill_file.read_text())
-        if match:
-            API_KEY = match.group(0)
-
-
-def api_call(method: str, endpoint: str, json_body: dict = None, params: dict = None) -> dict:
-    headers = {"Authorization": f"Bearer {API_KEY}", "Content-Type": "application/json"}
-    url = f"{API_URL}{endpoint}"
-    try:
-        if method == "GET":
-            resp = httpx.get(url, headers=headers, params=params, timeout=30)
-        elif method == "POST":
-            resp = httpx.post(url, headers=headers, json=json_body or {}, timeout=30)
-        elif method == "PATCH":
-            resp = httpx.patch(url, headers=headers, json=json_body or {}, timeout=30)
-        else:
-            return {"ok": False}
-        return {"ok": resp.status_code < 300, "data": resp.json()}
-    except Exception as e:
-        return {"ok": False, "error": str(e)}
-
 
 def get_scripted_videos() -> list[dict]:
     """Fetch videos with status SCRIPTED from pipeline."""
@@ -13,20 +13,17 @@ Usage:
   python va-sla-tracker.py --daemon        # Monitor continuously
 """
 
-import json
 import logging
-import os
-import re
 import sys
 import time
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
-import httpx
+from flashflow_api import API_KEY, api_call
+from state_store import StateStore
 
 # --- Configuration ---
 
-API_URL = "https://web-pied-delta-30.vercel.app/api"
 JOURNALS_DIR = Path.home() / ".openclaw" / "workspace" / "second-brain" / "journals"
 BUSINESS_DIR = Path.home() / ".openclaw" / "workspace" / "second-brain" / "business"
 STATE_PATH = Path(__file__).parent / ".va-sla-state.json"
@@ -45,37 +42,16 @@ logging.basicConfig(
 )
 log = logging.getLogger("va-sla-tracker")
 
-API_KEY = os.environ.get("FLASHFLOW_API_KEY", "")
-if not API_KEY:
-    skill_file = Path.home() / ".openclaw" / "agents" / "flashflow-work" / "workspace" / "skills" / "flashflow" / "skill.md"
-    if skill_file.exists():
-        match = re.search(r"ff_ak_[a-f0-9]{40}", skill_file.read_text())
-        if match:
-            API_KEY = match.group(0)
 
-
-def api_call(method: str, endpoint: str, params: dict = None) -> dict:
-    headers = {"Authorization": f"Bearer {API_KEY}"}
-    url = f"{API_URL}{endpoint}"
-    try:
-        resp = httpx.get(url, headers=headers, params=params, timeout=30) if method == "GET" else None
-        if resp and resp.status_code < 300:
-            return {"ok": True, "data": resp.json()}
-        return {"ok": False, "status": resp.status_code if resp else 0}
-    except Exception as e:
-        return {"ok": False, "error": str(e)}
+STATE_STORE = StateStore(STATE_PATH)
 
 
 def load_state() -> dict:
-    if STATE_PATH.exists():
-        with open(STATE_PATH) as f:
-            return json.load(f)
-    return {"tracking": {}, "alerts_sent": {}}
+    return STATE_STORE.load() or {"tracking": {}, "alerts_sent": {}}
 
 
 def save_state(state: dict):
-    with open(STATE_PATH, "w") as f:
-        json.dump(state, f, indent=2, default=str)
+    STATE_STORE.save(state)
 
 
 def get_pipeline_videos() -> list[dict]:
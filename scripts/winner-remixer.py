@@ -15,8 +15,6 @@ Usage:
 
 import json
 import logging
-import os
-import re
 import sys
 import time
 from datetime import datetime
@@ -24,10 +22,13 @@ from pathlib import Path
 
 import httpx
 
+from flashflow_api import API_KEY, api_call
+from llm_cache import cached_completion
+
 # --- Configuration ---
 
 LM_STUDIO_URL = "http://127.0.0.1:1234/v1"
-API_URL = "https://web-pied-delta-30.vercel.app/api"
+LM_MODEL = "llama-3.1-8b-instruct"
 JOURNALS_DIR = Path.home() / ".openclaw" / "workspace" / "second-brain" / "journals"
 
 logging.basicConfig(
@@ -37,14 +38,6 @@ logging.basicConfig(
 )
 log = logging.getLogger("winner-remixer")
 
-API_KEY = os.environ.get("FLASHFLOW_API_KEY", "")
-if not API_KEY:
-    skill_file = Path.home() / ".openclaw" / "agents" / "flashflow-work" / "workspace" / "skills" / "flashflow" / "skill.md"
-    if skill_file.exists():
-        match = re.search(r"ff_ak_[a-f0-9]{40}", skill_file.read_text())
-        if match:
-            API_KEY = match.group(0)
-
 VARIATION_TYPES = [
     {
         "name": "emotion_shift",
@@ -97,30 +90,20 @@ For longer: add more detail, social proof, multiple benefits""",
 ]
 
 
-def api_call(method: str, endpoint: str, json_body: dict = None, params: dict = None) -> dict:
-    headers = {"Authorization": f"Bearer {API_KEY}", "Content-Type": "application/json"}
-    url = f"{API_URL}{endpoint}"
-    try:
-        if method == "GET":
-            resp = httpx.get(url, headers=headers, params=params, timeout=30)
-        elif method == "POST":
-            resp = httpx.post(url, headers=headers, json=json_body or {}, timeout=60)
-        else:
-            return {"ok": False}
-        return {"ok": resp.status_code < 300, "data": resp.json()}
-    except Exception as e:
-        return {"ok": False, "error": str(e)}
+def lm_generate(prompt: str, max_tokens: int = 800, temperature: float = 0.8, cache: bool | None = None) -> str:
+    """Generate text using local LM Studio. Low-temperature calls are served from the LLM cache."""
+    params = {"max_tokens": max_tokens, "temperature": temperature}
+    return cached_completion(LM_MODEL, prompt, params, lambda: _lm_request(prompt, params), cache=cache)
 
 
-def lm_generate(prompt: str, max_tokens: int = 800, temperature: float = 0.8) -> str:
+def _lm_request(prompt: str, params: dict) -> str:
     try:
         resp = httpx.post(
             f"{LM_STUDIO_URL}/chat/completions",
             json={
-                "model": "llama-3.1-8b-instruct",
+                "model": LM_MODEL,
                 "messages": [{"role": "user", "content": prompt}],
-                "max_tokens": max_tokens,
-                "temperature": temperature,
+                **params,
             },
             timeout=120,
         )
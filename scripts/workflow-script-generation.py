@@ -14,6 +14,8 @@ import requests
 from datetime import datetime
 from pathlib import Path
 
+from llm_cache import cached_completion
+
 # API Keys (from env variables)
 ANTHROPIC_KEY = os.getenv("ANTHROPIC_API_KEY")
 ELEVENLABS_KEY = os.getenv("ELEVENLABS_API_KEY")
@@ -27,6 +29,9 @@ FLASHFLOW_API = "https://web-pied-delta-30.vercel.app/api"
 ELEVENLABS_API = "https://api.elevenlabs.io/v1"
 CANVA_API = "https://api.canva.com/v1"
 
+CLAUDE_MODEL = "claude-3-5-sonnet-20241022"
+TRENDS_CACHE_TTL = 6 * 3600  # trends are shared across every video in a category
+
 def log_message(msg):
     """Print timestamped log"""
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -42,31 +47,40 @@ def get_video(video_id):
     resp.raise_for_status()
     return resp.json().get("data", resp.json())
 
+def claude_complete(prompt, max_tokens, cache=None, ttl=None):
+    """Single-turn Claude completion, served from the LLM cache when allowed"""
+    def request():
+        resp = requests.post(
+            ANTHROPIC_URL,
+            headers={
+                "x-api-key": ANTHROPIC_KEY,
+                "anthropic-version": "2023-06-01",
+                "content-type": "application/json"
+            },
+            json={
+                "model": CLAUDE_MODEL,
+                "max_tokens": max_tokens,
+                "messages": [
+                    {"role": "user", "content": prompt}
+                ]
+            }
+        )
+        resp.raise_for_status()
+        return resp.json()["content"][0]["text"]
+
+    return cached_completion(CLAUDE_MODEL, prompt, {"max_tokens": max_tokens}, request, cache=cache, ttl=ttl)
+
 def get_trends(category):
     """Research trends using Perplexity (or Claude with web search)"""
     log_message(f"Researching trends for: {category}")
     
     # For now, use Claude with a prompt (requires Perplexity integration later)
-    resp = requests.post(
-        ANTHROPIC_URL,
-        headers={
-            "x-api-key": ANTHROPIC_KEY,
-            "anthropic-version": "2023-06-01",
-            "content-type": "application/json"
-        },
-        json={
-            "model": "claude-3-5-sonnet-20241022",
-            "max_tokens": 500,
-            "messages": [
-                {
-                    "role": "user",
-                    "content": f"What are the top 3 trending hooks/angles for {category} on TikTok right now? Be specific and actionable. Format as: 1. [hook] 2. [hook] 3. [hook]"
-                }
-            ]
-        }
+    trends = claude_complete(
+        f"What are the top 3 trending hooks/angles for {category} on TikTok right now? Be specific and actionable. Format as: 1. [hook] 2. [hook] 3. [hook]",
+        max_tokens=500,
+        cache=True,
+        ttl=TRENDS_CACHE_TTL,
     )
-    resp.raise_for_status()
-    trends = resp.json()["content"][0]["text"]
     log_message(f"Trends: {trends[:100]}...")
     return trends
 
@@ -97,23 +111,7 @@ Output ONLY valid JSON (no markdown) with this structure:
 
 Generate exactly this structure. No explanations."""
 
-    resp = requests.post(
-        ANTHROPIC_URL,
-        headers={
-            "x-api-key": ANTHROPIC_KEY,
-            "anthropic-version": "2023-06-01",
-            "content-type": "application/json"
-        },
-        json={
-            "model": "claude-3-5-sonnet-20241022",
-            "max_tokens": 800,
-            "messages": [
-                {"role": "user", "content": prompt}
-            ]
-        }
-    )
-    resp.raise_for_status()
-    script_text = resp.json()["content"][0]["text"]
+    script_text = claude_complete(prompt, max_tokens=800)
     
     # Parse JSON
     try: